@@ -0,0 +1,215 @@
+"""Pre-aggregated data cube behind the EDA dashboard's Overview and cross-tab widgets.
+
+``build_cube`` groups the loaded dataset once by every low-cardinality column
+(the categoricals plus small integer codes such as ``loan_status``). For each
+cell of that grouping it keeps the row count, the missing-value count, and the
+count, sum, sum of squares, minimum and maximum of every numeric column. It
+also keeps a ``HIST_BINS``-bin histogram of every numeric column.
+Row counts, value counts, group means, summary statistics, cross-tabs and
+histograms under the sidebar filters are then reductions over a few thousand
+cells instead of passes over the raw rows. Only filters on continuous columns
+narrower than their full range need the rows; ``DataCube.mask`` returns None
+for those and the page falls back to the filtered frame.
+
+Numeric bins hold row counts only. Sums of the other columns per bin are left
+out: they would take cells x bins x columns values, more than the raw rows of
+a small dataset, and no widget groups by a binned column.
+"""
+import numpy as np
+import pandas as pd
+
+MAX_DIM_CARDINALITY = 50  # non-numeric columns with more values are not dimensions
+MAX_DISCRETE_VALUES = 12  # integer columns with at most this many values are dimensions too
+HIST_BINS = 30
+
+
+class DataCube:
+    """Cells of one dataset grouped by its dimension columns; build with ``build_cube``."""
+
+    def __init__(self, columns, dims, measures, values, codes, counts, missing,
+                 stats, extrema, bounds, has_nan, hists):
+        self.columns = columns    # every column of the source frame
+        self.dims = dims          # dimension columns
+        self.measures = measures  # numeric columns
+        self.values = values      # dim -> Index of its distinct values
+        self.codes = codes        # dim -> per-cell position in values (-1 for missing)
+        self.counts = counts      # rows per cell
+        self.missing = missing    # missing values per cell, all columns
+        self.stats = stats        # measure -> (count, sum, sum of squares) per cell
+        self.extrema = extrema    # measure -> (min, max) per cell, NaN where it has no values
+        self.bounds = bounds      # measure -> (min, max) over the whole dataset
+        self.has_nan = has_nan    # measure -> whether it has missing values
+        self.hists = hists        # measure -> (bin edges, cells x bins counts)
+
+    @property
+    def n_cells(self):
+        return len(self.counts)
+
+    def mask(self, filters=None):
+        """Cells kept by the sidebar ``filters``; None when the raw rows are needed.
+
+        ``filters`` maps a column to a list of kept values (an empty list
+        keeps everything) or to an inclusive ``(low, high)`` range, with the
+        same semantics as the page's pandas filters.
+        """
+        keep = np.ones(self.n_cells, dtype=bool)
+        for col, val in (filters or {}).items():
+            if col not in self.columns:
+                continue
+            if isinstance(val, list):
+                if not val:
+                    continue
+                if col not in self.dims:
+                    return None
+                keep &= self._lookup(col, self.values[col].isin(val))
+            elif isinstance(val, tuple) and len(val) == 2:
+                low, high = val
+                if col in self.dims:
+                    values = self.values[col]
+                    keep &= self._lookup(col, (values >= low) & (values <= high))
+                elif col in self.measures:
+                    col_min, col_max = self.bounds[col]
+                    # a full range only drops missing values, which the cube can't tell apart
+                    if low > col_min or high < col_max or self.has_nan[col]:
+                        return None
+                else:
+                    return None
+        return keep
+
+    def _lookup(self, dim, selected):
+        # missing values (code -1) never match a filter, like isin/between in pandas
+        table = np.concatenate([[False], np.asarray(selected, dtype=bool)])
+        return table[self.codes[dim] + 1]
+
+    def _by(self, dim, weights, cells):
+        n = len(self.values[dim])
+        return np.bincount(self.codes[dim][cells] + 1, weights=weights[cells], minlength=n + 1)[1:]
+
+    def rows(self, cells):
+        return int(self.counts[cells].sum())
+
+    def missing_values(self, cells):
+        return int(self.missing[cells].sum())
+
+    def value_counts(self, dim, cells) -> pd.Series:
+        """``df[dim].value_counts()`` of the selected rows."""
+        counts = pd.Series(self._by(dim, self.counts, cells).astype(np.int64),
+                           index=self.values[dim], name="count")
+        counts.index.name = dim
+        return counts[counts > 0].sort_values(ascending=False, kind="stable")
+
+    def nunique(self, dim, cells):
+        return int((self._by(dim, self.counts, cells) > 0).sum())
+
+    def group_mean(self, dim, measure, cells) -> pd.Series:
+        """``df.groupby(dim)[measure].mean()`` of the selected rows."""
+        count, total, _ = self.stats[measure]
+        n = self._by(dim, count, cells)
+        present = self._by(dim, self.counts, cells) > 0
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = self._by(dim, total, cells) / n
+        mean = pd.Series(mean, index=self.values[dim], name=measure)[present]
+        mean.index.name = dim
+        return mean
+
+    def summary(self, measure, cells):
+        """Count, mean, sample standard deviation, min and max of ``measure`` over the selected rows."""
+        count, total, squares = (s[cells].sum() for s in self.stats[measure])
+        if count == 0:
+            return {"count": 0, "mean": np.nan, "std": np.nan, "min": np.nan, "max": np.nan}
+        mean = total / count
+        var = max(squares - count * mean * mean, 0.0) / (count - 1) if count > 1 else np.nan
+        low, high = self.extrema[measure]
+        return {"count": int(count), "mean": mean, "std": np.sqrt(var),
+                "min": np.nanmin(low[cells]), "max": np.nanmax(high[cells])}
+
+    def describe(self, cells, measures=None) -> pd.DataFrame:
+        """``summary`` of every measure, one row each, like ``df.describe().T`` without quartiles."""
+        measures = self.measures if measures is None else measures
+        return pd.DataFrame([self.summary(m, cells) for m in measures], index=measures)
+
+    def crosstab(self, a, b, cells, normalize=False) -> pd.DataFrame:
+        """``pd.crosstab(df[a], df[b], normalize=...)`` of the selected rows."""
+        na, nb = len(self.values[a]), len(self.values[b])
+        key = (self.codes[a][cells] + 1) * (nb + 1) + self.codes[b][cells] + 1
+        table = np.bincount(key, weights=self.counts[cells], minlength=(na + 1) * (nb + 1))
+        table = pd.DataFrame(table.reshape(na + 1, nb + 1)[1:, 1:].astype(np.int64),
+                             index=self.values[a].rename(a), columns=self.values[b].rename(b))
+        table = table.loc[table.sum(axis=1) > 0, table.sum(axis=0) > 0]
+        if normalize == "index":
+            return table.div(table.sum(axis=1), axis=0)
+        if normalize == "columns":
+            return table / table.sum(axis=0)
+        if normalize:
+            return table / table.to_numpy().sum()
+        return table
+
+    def histogram(self, measure, cells):
+        """``(bin edges, counts)`` of ``measure`` over the selected rows."""
+        edges, counts = self.hists[measure]
+        return edges, counts[cells].sum(axis=0)
+
+
+def _dimension(series, max_cardinality, max_discrete):
+    if pd.api.types.is_bool_dtype(series):
+        return True
+    if pd.api.types.is_numeric_dtype(series):
+        return pd.api.types.is_integer_dtype(series) and series.nunique() <= max_discrete
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return False
+    return series.nunique() <= max_cardinality
+
+
+def build_cube(df: pd.DataFrame, max_cardinality=MAX_DIM_CARDINALITY,
+               max_discrete=MAX_DISCRETE_VALUES, bins=HIST_BINS) -> DataCube:
+    """Aggregate ``df`` into a DataCube in one pass per column."""
+    measures = df.select_dtypes(include=[np.number]).columns.tolist()
+    dims = [col for col in df.columns if _dimension(df[col], max_cardinality, max_discrete)]
+
+    # cell id of every row: the dims' codes combined and re-factorized one
+    # dim at a time, so the combined key never exceeds the number of rows
+    row_cell = np.zeros(len(df), dtype=np.int64)
+    row_codes, values = {}, {}
+    for dim in dims:
+        codes, uniques = pd.factorize(df[dim], sort=True)
+        row_codes[dim], values[dim] = codes, pd.Index(uniques)
+        row_cell = pd.factorize(row_cell * (len(uniques) + 1) + codes + 1)[0]
+    n_cells = int(row_cell.max()) + 1 if len(df) else 0
+    first_row = np.zeros(n_cells, dtype=np.int64)
+    first_row[row_cell[::-1]] = np.arange(len(df))[::-1]
+
+    def per_cell(weights=None):
+        return np.bincount(row_cell, weights=weights, minlength=n_cells)
+
+    stats, extrema, bounds, has_nan, hists = {}, {}, {}, {}, {}
+    for col in measures:
+        x = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        valid = ~np.isnan(x)
+        x0 = np.where(valid, x, 0.0)
+        stats[col] = (per_cell(valid.astype(np.float64)), per_cell(x0), per_cell(x0 * x0))
+        by_cell = pd.Series(x).groupby(row_cell)
+        extrema[col] = (by_cell.min().reindex(range(n_cells)).to_numpy(),
+                        by_cell.max().reindex(range(n_cells)).to_numpy())
+        has_nan[col] = not valid.all()
+        low, high = (float(x[valid].min()), float(x[valid].max())) if valid.any() else (np.nan, np.nan)
+        bounds[col] = (low, high)
+        edges = np.linspace(low, high, bins + 1) if valid.any() else np.zeros(bins + 1)
+        width = (high - low) / bins if high > low else 1.0
+        bin_idx = np.clip(((x0 - low) / width).astype(np.int64), 0, bins - 1) if valid.any() else x0.astype(np.int64)
+        counts = np.bincount(row_cell[valid] * bins + bin_idx[valid], minlength=n_cells * bins)
+        hists[col] = (edges, counts.reshape(n_cells, bins))
+
+    return DataCube(
+        columns=list(df.columns),
+        dims=dims,
+        measures=measures,
+        values=values,
+        codes={dim: codes[first_row] for dim, codes in row_codes.items()},
+        counts=per_cell().astype(np.int64),
+        missing=per_cell(df.isna().sum(axis=1).to_numpy(dtype=np.float64)).astype(np.int64),
+        stats=stats,
+        extrema=extrema,
+        bounds=bounds,
+        has_nan=has_nan,
+        hists=hists,
+    )
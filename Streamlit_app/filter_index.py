@@ -0,0 +1,151 @@
+"""Indexed sidebar filtering for the EDA dashboard.
+
+``build_filter_index`` indexes the loaded dataset once. Each value of a
+low-cardinality non-numeric column gets a packed bitmap of its rows. Numeric
+columns keep their bounds, and a sorted permutation built the first time a
+range filter narrows them. ``FilterIndex.select`` turns a sidebar filter
+state into row ids: a range becomes the bitmap of one slice of the
+permutation, and filters combine by ANDing bitmaps. Filters that keep every
+row are skipped. The row ids of the last ``MEMO_SIZE`` filter states are
+memoized, so a rerun with unchanged filters does no work at all.
+"""
+import math
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+MAX_OPTIONS = 30  # non-numeric columns with more values get no multiselect
+MEMO_SIZE = 16
+
+
+class FilterIndex:
+    """Bitmaps and sorted permutations of one dataset; build with ``build_filter_index``."""
+
+    def __init__(self, n_rows, options, bitmaps, has_nan, numeric, bounds, memo_size=MEMO_SIZE):
+        self.n_rows = n_rows
+        self.options = options  # column -> sorted distinct values (multiselects)
+        self.bitmaps = bitmaps  # column -> {value: packed bitmap of its rows}
+        self.has_nan = has_nan  # column -> whether it has missing values
+        self.numeric = numeric  # column -> numpy values (sliders)
+        self.bounds = bounds    # column -> (min, max)
+        self.memo_size = memo_size
+        self._sorted = {}       # column -> (permutation, non-missing values in that order)
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, filters):
+        """Canonical, hashable form of the filters that actually drop rows."""
+        active = []
+        for col, val in (filters or {}).items():
+            if isinstance(val, list) and col in self.options:
+                if not val or (set(self.options[col]) <= set(val) and not self.has_nan[col]):
+                    continue
+                active.append((col, frozenset(val)))
+            elif isinstance(val, tuple) and len(val) == 2 and col in self.bounds:
+                low, high = float(val[0]), float(val[1])
+                col_min, col_max = self.bounds[col]
+                if low <= col_min and high >= col_max and not self.has_nan[col]:
+                    continue
+                active.append((col, (low, high)))
+        return frozenset(active)
+
+    def select(self, filters=None):
+        """Row ids kept by the sidebar ``filters``; None when every row is kept.
+
+        Same semantics as chaining ``isin`` masks for lists (an empty list
+        keeps everything) and inclusive comparisons for ``(low, high)`` ranges.
+        """
+        key = self._key(filters)
+        if not key:
+            return None
+        with self._lock:
+            rows = self._memo.get(key)
+            if rows is not None:
+                self._memo.move_to_end(key)
+                return rows
+
+        bitmap = None
+        for col, val in key:
+            bits = self._range_bits(col, *val) if isinstance(val, tuple) else self._value_bits(col, val)
+            bitmap = bits if bitmap is None else np.bitwise_and(bitmap, bits, out=bitmap)
+        rows = np.flatnonzero(np.unpackbits(bitmap, count=self.n_rows)).astype(_row_dtype(self.n_rows))
+        rows.flags.writeable = False
+
+        with self._lock:
+            self._memo[key] = rows
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+        return rows
+
+    def _value_bits(self, col, values):
+        bits = np.zeros((self.n_rows + 7) // 8, dtype=np.uint8)
+        for value in values:
+            if value in self.bitmaps[col]:
+                np.bitwise_or(bits, self.bitmaps[col][value], out=bits)
+        return bits
+
+    def _range_bits(self, col, low, high):
+        order, values = self._sorted_column(col)
+        start = np.searchsorted(values, _bound(values.dtype, low, "left"), side="left")
+        stop = np.searchsorted(values, _bound(values.dtype, high, "right"), side="right")
+        # scatter whichever side of the slice is shorter; missing values sort last
+        if stop - start <= self.n_rows // 2:
+            keep = np.zeros(self.n_rows, dtype=bool)
+            keep[order[start:stop]] = True
+        else:
+            keep = np.ones(self.n_rows, dtype=bool)
+            keep[order[:start]] = False
+            keep[order[stop:]] = False
+        return np.packbits(keep)
+
+    def _sorted_column(self, col):
+        entry = self._sorted.get(col)
+        if entry is None:
+            x = self.numeric[col]
+            order = np.argsort(x, kind="stable").astype(_row_dtype(self.n_rows))
+            values = x[order]
+            valid = len(values) - int(np.isnan(values).sum()) if values.dtype.kind == "f" else len(values)
+            entry = self._sorted[col] = (order, values[:valid])
+        return entry
+
+
+def _row_dtype(n_rows):
+    return np.int32 if n_rows < 2**31 else np.int64
+
+
+def _bound(dtype, value, side):
+    """``value`` compared the way ``column >= value`` compares it in pandas.
+
+    Float columns compare in their own precision (the scalar is rounded to
+    float32 for a float32 column); integer columns compare exactly.
+    """
+    if dtype.kind in "iu":
+        info = np.iinfo(dtype)
+        value = math.ceil(value) if side == "left" else math.floor(value)
+        return dtype.type(min(max(value, info.min), info.max))
+    return dtype.type(value)
+
+
+def build_filter_index(df: pd.DataFrame, max_options=MAX_OPTIONS, memo_size=MEMO_SIZE) -> FilterIndex:
+    """Index the sidebar filters of ``df``: one multiselect or slider per column."""
+    options, bitmaps, has_nan, numeric, bounds = {}, {}, {}, {}, {}
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_numeric_dtype(series):
+            x = series.to_numpy()
+            if x.dtype.kind not in "iuf":
+                x = series.to_numpy(dtype=np.float64, na_value=np.nan)
+            valid = ~np.isnan(x) if x.dtype.kind == "f" else np.ones(len(x), dtype=bool)
+            if not valid.any():
+                continue
+            numeric[col] = x
+            bounds[col] = (float(x[valid].min()), float(x[valid].max()))
+            has_nan[col] = not valid.all()
+        elif series.nunique() <= max_options:
+            codes, uniques = pd.factorize(series, sort=True)
+            options[col] = sorted(uniques)
+            bitmaps[col] = {value: np.packbits(codes == i) for i, value in enumerate(uniques)}
+            has_nan[col] = bool((codes < 0).any())
+    return FilterIndex(len(df), options, bitmaps, has_nan, numeric, bounds, memo_size)
@@ -1,3 +1,4 @@
+import os
 import streamlit as st
 import pandas as pd
 import numpy as np
@@ -9,6 +10,10 @@ from sklearn.decomposition import PCA
 from sklearn.preprocessing import StandardScaler
 from io import BytesIO
 
+# Streamlit_app/ is on sys.path: streamlit adds the main script's directory
+from data_cube import build_cube
+from filter_index import build_filter_index
+
 st.set_page_config(layout="wide", page_title="Loan Approval — Optimized Dashboard", page_icon="💳")
 
 # -----------------------
@@ -20,12 +25,29 @@ PCA_SAMPLE = 5000        # rows to use for PCA
 SCATTER_MAX = 10000      # max rows for scatter
 HIGH_CARD_THRESHOLD = 50 # don't allow categorical charts above this many unique values
 
+# compactly typed Parquet dataset written by `cd api && python -m src.ingest`
+PROCESSED_PATH = os.environ.get(
+    "PROCESSED_DATA_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "api", "data", "processed", "loans"),
+)
+# columns read from the processed dataset (customer_id is unique per row and never charted)
+DASHBOARD_COLUMNS = [
+    "age", "occupation_status", "years_employed", "annual_income", "credit_score",
+    "credit_history_years", "savings_assets", "current_debt", "defaults_on_file",
+    "delinquencies_last_2yrs", "derogatory_marks", "product_type", "loan_intent",
+    "loan_amount", "interest_rate", "debt_to_income_ratio", "loan_to_income_ratio",
+    "payment_to_income_ratio", "loan_status",
+]
+
 # -----------------------
 # Caching helpers
 # -----------------------
 @st.cache_data
 def load_data(path_or_buf):
     try:
+        if isinstance(path_or_buf, str) and os.path.isdir(path_or_buf):
+            # only the charted columns are decoded, already in compact dtypes
+            return pd.read_parquet(path_or_buf, columns=DASHBOARD_COLUMNS)
         df = pd.read_csv(path_or_buf)
         # small cleaning: strip names
         df.columns = [c.strip() for c in df.columns]
@@ -33,6 +55,18 @@ def load_data(path_or_buf):
     except Exception as e:
         return None
 
+@st.cache_resource(show_spinner="Aggregating dataset...")
+def load_cube(path_or_buf):
+    # built once per dataset and shared read-only by every session and rerun
+    df = load_data(path_or_buf)
+    return None if df is None else build_cube(df)
+
+@st.cache_resource(show_spinner="Indexing dataset...")
+def load_filter_index(path_or_buf):
+    # bitmaps and sorted permutations shared by every session; select() memoizes row ids
+    df = load_data(path_or_buf)
+    return None if df is None else build_filter_index(df)
+
 @st.cache_data
 def numeric_columns(df):
     return df.select_dtypes(include=[np.number]).columns.tolist()
@@ -74,10 +108,14 @@ def download_link(df):
 st.sidebar.title("Data & Settings")
 uploaded=None
 if uploaded is None:
-    DEFAULT_PATH = "data/Loan_approval_data_2025.csv"
+    DEFAULT_PATH = PROCESSED_PATH if os.path.isdir(PROCESSED_PATH) else "data/Loan_approval_data_2025.csv"
     df = load_data(DEFAULT_PATH)
+    cube = load_cube(DEFAULT_PATH)
+    index = load_filter_index(DEFAULT_PATH)
 else:
     df = load_data(uploaded)
+    cube = load_cube(uploaded)
+    index = load_filter_index(uploaded)
 
 if df is None:
     st.sidebar.error("No data found. Please upload a CSV or place it at /mnt/data/Loan_approval_data_2025.csv")
@@ -96,32 +134,36 @@ st.sidebar.markdown(f"**Rows:** {df.shape[0]}  —  **Cols:** {df.shape[1]}")
 # Performance mode toggle (recommended)
 perf_mode = st.sidebar.checkbox("Performance mode (fast, uses sampling)", value=True)
 
-# Build light weight filters (only for low-cardinality columns)
+# Build light weight filters (only for low-cardinality columns); options and
+# bounds come from the filter index instead of scanning the frame every rerun
 st.sidebar.subheader("Quick filters")
 filters = {}
 for col in df.columns:
-    if df[col].dtype == 'object' and df[col].nunique() <= 30:
-        vals = st.sidebar.multiselect(f"{col}", options=sorted(df[col].dropna().unique()), default=list(sorted(df[col].dropna().unique())))
+    if col in index.options:
+        vals = st.sidebar.multiselect(f"{col}", options=index.options[col], default=list(index.options[col]))
         filters[col] = vals
-    elif np.issubdtype(df[col].dtype, np.number):
-        minv, maxv = float(df[col].min()), float(df[col].max())
+    elif col in index.bounds:
+        minv, maxv = index.bounds[col]
         rng = st.sidebar.slider(f"{col}", min_value=minv, max_value=maxv, value=(minv, maxv))
         filters[col] = rng
 
-# Apply filters (safely)
-df_filtered = df.copy()
-for col, val in filters.items():
-    if col in df.columns:
-        if isinstance(val, list):
-            if len(val) > 0:
-                df_filtered = df_filtered[df_filtered[col].isin(val)]
-        elif isinstance(val, tuple) and len(val) == 2:
-            df_filtered = df_filtered[(df_filtered[col] >= val[0]) & (df_filtered[col] <= val[1])]
+# Apply filters: row ids from bitmap intersections, memoized per filter state
+rows = index.select(filters)
+df_filtered = df if rows is None else df.take(rows)
 
 # Derived lists
 num_cols = numeric_columns(df_filtered)
 cat_cols = categorical_columns(df_filtered)
 
+# cube cells selected by the filters; None when a filter needs the raw rows
+cells = cube.mask(filters) if cube is not None else None
+
+def from_cube(*cols):
+    return cells is not None and all(c in cube.dims for c in cols)
+
+def nunique(col):
+    return cube.nunique(col, cells) if from_cube(col) else df_filtered[col].nunique()
+
 # -----------------------
 # Main layout with tabs (lazy content inside each tab)
 # -----------------------
@@ -138,7 +180,7 @@ with tabs[0]:
         if 'LoanAmount' in df_filtered.columns and pd.api.types.is_numeric_dtype(df_filtered['LoanAmount']):
             st.metric("Avg Loan Amount", f"{df_filtered['LoanAmount'].mean():.2f}")
         else:
-            st.metric("Rows", df_filtered.shape[0])
+            st.metric("Rows", cube.rows(cells) if cells is not None else df_filtered.shape[0])
     with col2:
         if 'ApplicantIncome' in df_filtered.columns and pd.api.types.is_numeric_dtype(df_filtered['ApplicantIncome']):
             st.metric("Avg Applicant Income", f"{df_filtered['ApplicantIncome'].mean():.2f}")
@@ -146,33 +188,47 @@ with tabs[0]:
             st.metric("Columns", df_filtered.shape[1])
     with col3:
         if 'Loan_Status' in df_filtered.columns:
-            vc = df_filtered['Loan_Status'].value_counts()
+            vc = cube.value_counts('Loan_Status', cells) if from_cube('Loan_Status') else df_filtered['Loan_Status'].value_counts()
             top_label = vc.idxmax() if not vc.empty else "N/A"
             st.metric("Top Loan Status", f"{top_label}")
         else:
             st.metric("Unique Categories", len(cat_cols))
     with col4:
-        st.metric("Missing values", int(df_filtered.isna().sum().sum()))
+        missing = cube.missing_values(cells) if cells is not None else int(df_filtered.isna().sum().sum())
+        st.metric("Missing values", missing)
 
     st.markdown("---")
     colA, colB = st.columns([2,3])
     with colA:
         # Safe categorical pie: skip high-cardinality
-        safe_cats = [c for c in cat_cols if df_filtered[c].nunique() <= HIGH_CARD_THRESHOLD]
+        safe_cats = [c for c in cat_cols if nunique(c) <= HIGH_CARD_THRESHOLD]
         if len(safe_cats) == 0:
             st.info("No low-cardinality categorical column available for pie. Avoid columns like customer_id.")
         else:
             pick_cat = st.selectbox("Pick categorical for pie", options=safe_cats)
-            fig = px.pie(df_filtered, names=pick_cat, title=f'{pick_cat} Breakdown', hole=0.3)
+            if from_cube(pick_cat):
+                vc = cube.value_counts(pick_cat, cells)
+                fig = px.pie(names=vc.index.astype(str), values=vc.values, title=f'{pick_cat} Breakdown', hole=0.3)
+            else:
+                fig = px.pie(df_filtered, names=pick_cat, title=f'{pick_cat} Breakdown', hole=0.3)
             st.plotly_chart(fig, width="stretch")
     with colB:
         if len(num_cols) >= 1:
             pick_num = st.selectbox("Metric for bar", options=num_cols, index=0)
             # Aggregate by a safe categorical if available, otherwise show histogram
-            if 'Loan_Status' in df_filtered.columns and df_filtered['Loan_Status'].nunique() <= HIGH_CARD_THRESHOLD:
-                agg = df_filtered.groupby('Loan_Status')[pick_num].mean().reset_index()
+            if 'Loan_Status' in df_filtered.columns and nunique('Loan_Status') <= HIGH_CARD_THRESHOLD:
+                if from_cube('Loan_Status'):
+                    agg = cube.group_mean('Loan_Status', pick_num, cells).reset_index()
+                else:
+                    agg = df_filtered.groupby('Loan_Status')[pick_num].mean().reset_index()
                 fig = px.bar(agg, x='Loan_Status', y=pick_num, title=f'Average {pick_num} by Loan Status')
                 st.plotly_chart(fig, width="stretch")
+            elif cells is not None:
+                edges, counts = cube.histogram(pick_num, cells)
+                fig = px.bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, labels={"x": pick_num, "y": "count"},
+                             title=f'Distribution: {pick_num}')
+                fig.update_layout(bargap=0)
+                st.plotly_chart(fig, width="stretch")
             else:
                 fig = px.histogram(df_filtered, x=pick_num, nbins=30, title=f'Distribution: {pick_num}')
                 st.plotly_chart(fig, width="stretch")
@@ -182,7 +238,7 @@ with tabs[0]:
 # --- Tab 2: Time / Trends ---
 with tabs[1]:
     st.header("Time series & trend analysis")
-    date_cols = [c for c in df.columns if np.issubdtype(df[c].dtype, np.datetime64)]
+    date_cols = [c for c in df.columns if pd.api.types.is_datetime64_any_dtype(df[c])]
     if len(date_cols) == 0:
         st.info("No date-like columns detected. Upload data with a date column or convert one to datetime.")
     else:
@@ -234,7 +290,10 @@ with tabs[2]:
 
         st.markdown("---")
         st.subheader("Summary statistics")
-        st.dataframe(df_filtered[num_cols].describe().T)
+        if cells is not None:
+            st.dataframe(cube.describe(cells, num_cols))
+        else:
+            st.dataframe(df_filtered[num_cols].describe().T[["count", "mean", "std", "min", "max"]])
 
         st.markdown("---")
         st.subheader("Outliers (IQR method)")
@@ -283,11 +342,14 @@ with tabs[3]:
 
     st.markdown("---")
     st.subheader("Categorical cross-tabs & stacked bars (safe)")
-    safe_cat_cols = [c for c in cat_cols if df_filtered[c].nunique() <= HIGH_CARD_THRESHOLD]
+    safe_cat_cols = [c for c in cat_cols if nunique(c) <= HIGH_CARD_THRESHOLD]
     if len(safe_cat_cols) >= 2:
         a = st.selectbox("Category A", options=safe_cat_cols, index=0)
         b = st.selectbox("Category B", options=safe_cat_cols, index=1)
-        ct = pd.crosstab(df_filtered[a], df_filtered[b], normalize='index')
+        if from_cube(a, b):
+            ct = cube.crosstab(a, b, cells, normalize='index')
+        else:
+            ct = pd.crosstab(df_filtered[a], df_filtered[b], normalize='index')
         fig = px.bar(ct, barmode='stack', title=f'Stacked bar: {a} by {b}')
         st.plotly_chart(fig, width="stretch")
     else:
@@ -1,10 +1,67 @@
 # api/main.py
-from fastapi import FastAPI
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from tempfile import SpooledTemporaryFile
+from typing import Any, Dict, List
+from fastapi import Body, FastAPI, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import ValidationError
 from src.schemas.input_schema import LoanInput
-from src.predict import predict_from_dict
+from src.predict import predict_payloads_versioned, predict_records
+from src.model_store import model_store
+from src.batching import MICROBATCH_ENABLED, MicroBatcher
+from src.executor import get_executor, run_inference, shutdown_executor
+from src.cache import cache_key, prediction_cache
+from src.metrics import MetricsMiddleware, record_error, render_metrics, stage_timer
+from src.shadow import create_shadow_scorer
+from src.utils.exception import CustomException
+from src.utils.logger import logger
 
-app = FastAPI(title="Loan Approval Prediction API")
+MAX_BATCH_SIZE = int(os.environ.get("MAX_BATCH_SIZE", "10000"))
+
+
+def load_model(app: FastAPI):
+    """Startup phase: load + warm up the model, then watch the artifact for changes."""
+    try:
+        model_store.start()
+    except CustomException as e:
+        # requests still retry the load on demand; /ready reports the failure
+        app.state.load_error = e.error_detail
+        logger.error(f"Startup model load failed: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # the port opens right away (/health answers); the model loads in the
+    # background and /ready turns 200 once it is resident and warm
+    app.state.loader = asyncio.create_task(asyncio.to_thread(load_model, app))
+    executor = get_executor()
+    if MICROBATCH_ENABLED:
+        app.state.batcher = MicroBatcher(predict_payloads_versioned, executor=executor)
+        app.state.batcher.start()
+    # the candidate loads in the shadow thread, not on the startup path
+    app.state.shadow = create_shadow_scorer()
+    if app.state.shadow is not None:
+        app.state.shadow.start()
+    yield
+    await app.state.loader
+    if app.state.batcher is not None:
+        await app.state.batcher.stop()
+    if app.state.shadow is not None:
+        app.state.shadow.stop()
+    shutdown_executor()
+    if prediction_cache is not None:
+        prediction_cache.close()
+    model_store.stop()
+
+
+app = FastAPI(title="Loan Approval Prediction API", lifespan=lifespan)
+app.state.batcher = None
+app.state.shadow = None
+app.state.load_error = None
 
 app.add_middleware(
     CORSMiddleware,
@@ -13,19 +70,139 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
+
 
+@app.exception_handler(CustomException)
+async def prediction_error(request: Request, exc: CustomException):
+    record_error(exc)
+    logger.error(f"{request.url.path} failed: {exc}")
+    return JSONResponse(status_code=500, content={"success": False, "detail": exc.error_detail})
 
-@app.post("/predict")
-def predict(application: LoanInput):
-    payload = application.model_dump()
-    result = predict_from_dict(payload)
+
+@app.post("/predict", openapi_extra={"requestBody": {"required": True, "content": {
+    "application/json": {"schema": LoanInput.model_json_schema()}}}})
+async def predict(request: Request):
+    # validated here instead of by FastAPI, so the validation stage is timed
+    try:
+        application = await request.json()
+    except ValueError as e:
+        raise RequestValidationError([{"type": "json_invalid", "loc": ("body",), "msg": "JSON decode error",
+                                       "input": {}, "ctx": {"error": str(e)}}])
+    with stage_timer("validation"):
+        try:
+            payload = LoanInput.model_validate(application).model_dump()
+        except ValidationError as e:
+            raise RequestValidationError([{**error, "loc": ("body", *error["loc"])}
+                                          for error in e.errors(include_url=False)])
+    return await predict_payload(payload)
+
+
+async def predict_payload(payload: dict):
+    """Score one validated ``/predict`` payload, through the prediction cache when enabled."""
+    # the key includes the model version, so a hot reload invalidates entries
+    version = model_store.version
+    cache = prediction_cache if version is not None else None
+    key = cache_key(payload, version) if cache is not None else None
+    result = cache.lookup_local(key) if cache is not None else None
+    if result is None and cache is not None and cache.shared is not None:
+        # sqlite may wait on another worker's lock; never on the event loop
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(cache.io_executor(), cache.lookup_shared, key)
+    if result is None:
+        if app.state.batcher is not None:
+            result, scored_version = await app.state.batcher.submit(payload)
+        else:
+            [(result, scored_version)] = await run_inference(predict_payloads_versioned, [payload])
+        if cache is not None:
+            if scored_version != version:
+                # hot-swapped since the lookup: file the result under the model that produced it
+                key = cache_key(payload, scored_version)
+            cache.local.set(key, result)
+            if cache.shared is not None:
+                # fire and forget: store_shared logs its own failures
+                asyncio.get_running_loop().run_in_executor(cache.io_executor(), cache.store_shared, key, result)
+    if app.state.shadow is not None:
+        # non-blocking: dropped when the shadow queue is full
+        app.state.shadow.offer(payload, result)
     return {"success": True, "result": result}
 
 
+@app.post("/predict/batch")
+async def predict_many(applications: List[Dict[str, Any]] = Body(...)):
+    if len(applications) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"Batch larger than {MAX_BATCH_SIZE} applications")
+
+    results = await run_inference(predict_records, applications)
+    return {"success": True, "results": results}
+
+
+@app.post("/predict/stream")
+async def predict_stream(request: Request):
+    # pandas-based, so imported on first use rather than on the startup path
+    from src.streaming import MEDIA_TYPES, STREAM_SPOOL_MAX_BYTES, stream_format, stream_scores
+
+    fmt = stream_format(request.headers.get("content-type"))
+    if fmt is None:
+        raise HTTPException(status_code=415, detail="Send text/csv or application/x-ndjson")
+
+    # Spool the upload (memory up to a limit, then disk) before responding:
+    # the streaming response can't read the request body while it writes.
+    body = SpooledTemporaryFile(max_size=STREAM_SPOOL_MAX_BYTES)
+    async for chunk in request.stream():
+        body.write(chunk)
+    body.seek(0)
+
+    # an async generator: chunks are parsed in the threadpool and scored on the inference executor
+    return StreamingResponse(stream_scores(body, fmt), media_type=MEDIA_TYPES[fmt])
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    extra = [
+        "# HELP loan_model_info Version of the resident prediction model.",
+        "# TYPE loan_model_info gauge",
+        f'loan_model_info{{version="{model_store.version or "none"}"}} 1',
+    ]
+    if prediction_cache is not None:
+        stats = prediction_cache.stats()
+        extra += [
+            "# HELP loan_prediction_cache_lookups_total Prediction cache lookups by result.",
+            "# TYPE loan_prediction_cache_lookups_total counter",
+            f'loan_prediction_cache_lookups_total{{result="hit"}} {stats["hits"]}',
+            f'loan_prediction_cache_lookups_total{{result="miss"}} {stats["misses"]}',
+        ]
+    if app.state.shadow is not None:
+        extra += app.state.shadow.render()
+    return PlainTextResponse(render_metrics(extra), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/cache/stats")
+def cache_stats():
+    return prediction_cache.stats() if prediction_cache else {"enabled": False}
+
+
+@app.get("/shadow/stats")
+def shadow_stats():
+    return app.state.shadow.stats() if app.state.shadow else {"enabled": False}
+
+
 @app.get("/health")
 def health():
+    """Liveness: the process is up and serving HTTP."""
     return {"status": "ok"}
 
+
+@app.get("/ready")
+def ready():
+    """Readiness: the model is loaded and warmed up."""
+    if model_store.loaded:
+        return {"status": "ready", "model_version": model_store.version}
+    if app.state.load_error is not None:
+        return JSONResponse(status_code=503, content={"status": "failed", "detail": app.state.load_error})
+    return JSONResponse(status_code=503, content={"status": "loading"})
+
+
 @app.get("/")
 def home():
     return {'message':'Loan approval prediction API'}
\ No newline at end of file
@@ -0,0 +1,66 @@
+# api/serve.py
+"""Multi-worker launcher that shares one copy of the model between workers.
+
+``uvicorn --workers N`` spawns fresh interpreters, so every worker unpickles
+its own model. This launcher loads and warms up the model once, then forks
+the workers: the model's NumPy arrays are memory-mapped from the artifact and
+the native tree/booster buffers are shared copy-on-write, so N workers cost
+roughly one model's worth of memory.
+
+    python serve.py --workers 4 --port 8000
+"""
+import argparse
+import gc
+import multiprocessing
+import os
+import signal
+import socket
+
+import uvicorn
+
+
+def _run_worker(sock, host, port):
+    from main import app
+    config = uvicorn.Config(app, host=host, port=port, log_level="info")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("WEB_CONCURRENCY", "1")))
+    args = parser.parse_args()
+
+    # load + warm up in the parent, before any worker exists
+    from src.model_store import model_store
+    model_store.get()
+    # keep the garbage collector from touching (and un-sharing) inherited objects
+    gc.freeze()
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.set_inheritable(True)
+
+    ctx = multiprocessing.get_context("fork")
+    workers = [
+        ctx.Process(target=_run_worker, args=(sock, args.host, args.port), name=f"worker-{i}")
+        for i in range(max(1, args.workers))
+    ]
+    for worker in workers:
+        worker.start()
+
+    def _shutdown(signum, frame):
+        for worker in workers:
+            if worker.is_alive():
+                os.kill(worker.pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, _shutdown)
+    signal.signal(signal.SIGINT, _shutdown)
+    for worker in workers:
+        worker.join()
+
+
+if __name__ == "__main__":
+    main()
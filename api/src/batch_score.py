@@ -0,0 +1,168 @@
+"""Offline batch scoring of large CSV/Parquet files.
+
+    python -m src.batch_score data/raw/Loan_approval_data_2025.csv \
+        --output-dir data/processed/scores --workers 8
+
+The input is split into row chunks that are scored in a process pool (each
+worker loads the pipeline once). Every chunk becomes one output partition,
+written atomically, so an interrupted run resumes by skipping the partitions
+that already exist. The manifest records the model digest, and a run with a
+different model refuses to resume into the same directory.
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import pandas as pd
+from src.model_store import MODEL_PATH, ModelStore, artifact_file, file_digest
+from src.streaming import score_chunk
+from src.utils.logger import logger
+from src.utils.exception import CustomException
+
+MANIFEST = "_manifest.json"
+
+_pipeline = None
+
+
+def _init_worker(model_path, model_digest):
+    global _pipeline
+    store = ModelStore(path=model_path, reload_interval=0, fallback=None)
+    _pipeline = store.get()
+    # the artifact may have been swapped since the manifest was checked
+    if store.version != model_digest[:12]:
+        raise RuntimeError(f"{model_path} changed during the run ({model_digest[:12]} -> {store.version})")
+
+
+def _score_partition(index, df, out_path, fmt):
+    out = score_chunk(_pipeline, df)
+    tmp_path = f"{out_path}.tmp"
+    if fmt == "parquet":
+        out.to_parquet(tmp_path, index=False)
+    else:
+        out.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, out_path)
+    return index, len(out)
+
+
+def iter_chunks(path, chunk_rows, dtype=None):
+    """Yield DataFrame chunks of ``chunk_rows`` rows from a CSV or Parquet file.
+
+    With ``dtype`` (column -> dtype) only those columns are read, already cast.
+    """
+    columns = list(dtype) if dtype else None
+    if path.endswith(".parquet") or os.path.isdir(path):
+        try:
+            import pyarrow.dataset as ds
+        except ImportError as e:
+            raise CustomException(e, "Reading Parquet requires pyarrow")
+        dataset = ds.dataset(path, format="parquet")
+        for batch in dataset.to_batches(batch_size=chunk_rows, columns=columns):
+            df = batch.to_pandas()
+            yield df.astype(dtype) if dtype else df
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_rows, usecols=columns, dtype=dtype)
+
+
+def _check_manifest(output_dir, manifest):
+    path = os.path.join(output_dir, MANIFEST)
+    if os.path.exists(path):
+        with open(path) as f:
+            previous = json.load(f)
+        if previous != manifest:
+            changed = sorted(k for k in manifest if previous.get(k) != manifest[k])
+            raise CustomException(
+                ValueError(f"output directory holds a different run ({', '.join(changed)} changed)"),
+                f"{path} was written for {previous}; use a new --output-dir",
+            )
+    else:
+        with open(path, "w") as f:
+            json.dump(manifest, f)
+
+
+def score_file(input_path, output_dir, model_path=MODEL_PATH, chunk_rows=100_000,
+               workers=None, output_format="csv", progress=None):
+    """Score ``input_path`` into ``output_dir/part-NNNNN.<fmt>``. Returns rows scored.
+
+    ``progress(scored, skipped, rows_per_s)`` is called after each partition and once at the end.
+    """
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(output_dir, exist_ok=True)
+    model_digest = file_digest(artifact_file(model_path))
+    # resuming with another model would mix two models' scores in one output
+    _check_manifest(output_dir, {
+        "input": os.path.abspath(input_path),
+        "chunk_rows": chunk_rows,
+        "output_format": output_format,
+        "model_digest": model_digest,
+    })
+
+    start = time.perf_counter()
+    scored = skipped = offset = 0
+    pending = set()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(model_path, model_digest)) as pool:
+
+        def drain(block):
+            nonlocal scored
+            if block:
+                done = wait(pending, return_when=FIRST_COMPLETED).done
+            else:
+                done = {f for f in pending if f.done()}
+            for future in done:
+                pending.discard(future)
+                index, rows = future.result()
+                scored += rows
+                rate = scored / (time.perf_counter() - start)
+                logger.info(f"Partition {index} done: {scored} rows scored ({rate:,.0f} rows/s).")
+                if progress is not None:
+                    progress(scored, skipped, rate)
+
+        for index, chunk in enumerate(iter_chunks(input_path, chunk_rows)):
+            out_path = os.path.join(output_dir, f"part-{index:05d}.{output_format}")
+            chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+            offset += len(chunk)
+            if os.path.exists(out_path):
+                skipped += len(chunk)
+                continue
+            # keep a bounded number of chunks in flight so memory stays flat
+            while len(pending) >= 2 * workers:
+                drain(block=True)
+            pending.add(pool.submit(_score_partition, index, chunk, out_path, output_format))
+            drain(block=False)
+        while pending:
+            drain(block=True)
+
+    elapsed = time.perf_counter() - start
+    if progress is not None:
+        progress(scored, skipped, scored / elapsed)
+    logger.info(f"Batch scoring of {input_path} finished: {scored} rows in {elapsed:.1f}s, "
+                f"skipped {skipped} already scored.")
+    return scored
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="CSV file, Parquet file or Parquet dataset directory")
+    parser.add_argument("--output-dir", required=True)
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--chunk-rows", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output-format", choices=["csv", "parquet"], default="csv")
+    args = parser.parse_args(argv)
+    start = time.perf_counter()
+    skipped = 0
+
+    def progress(scored, skipped_rows, rate):
+        nonlocal skipped
+        skipped = skipped_rows
+        print(f"\rscored {scored:,} rows, skipped {skipped:,} ({rate:,.0f} rows/s)", end="", flush=True)
+
+    scored = score_file(args.input, args.output_dir, args.model, args.chunk_rows,
+                        args.workers, args.output_format, progress)
+    print(f"\nscored {scored:,} rows in {time.perf_counter() - start:.1f}s, skipped {skipped:,} already scored")
+    return scored
+
+
+if __name__ == "__main__":
+    main()
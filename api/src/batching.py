@@ -0,0 +1,129 @@
+import asyncio
+import os
+
+from src.executor import INFERENCE_WORKERS, run_inference
+from src.utils.logger import logger
+
+MICROBATCH_ENABLED = os.environ.get("PREDICT_MICROBATCH", "0") == "1"
+MICROBATCH_MAX_SIZE = int(os.environ.get("MICROBATCH_MAX_SIZE", "32"))
+MICROBATCH_MAX_WAIT_MS = float(os.environ.get("MICROBATCH_MAX_WAIT_MS", "2"))
+
+
+class MicroBatcher:
+    """Coalesce concurrent single-item requests into one vectorized call.
+
+    ``score_fn`` takes a list of payloads and returns a list of results in the
+    same order; it runs in ``executor`` (default: the inference executor) so
+    the event loop stays free. Batching
+    is adaptive: a lone request is scored immediately, and the batcher only
+    waits (up to ``max_wait_ms``) for company when the previous batch showed
+    that requests are arriving concurrently.
+
+    Up to ``max_concurrent`` batches (default: the inference executor's
+    workers) are scored at once; while they are all busy, new requests queue
+    up and form the next, larger batch.
+    """
+
+    def __init__(self, score_fn, max_batch_size=MICROBATCH_MAX_SIZE,
+                 max_wait_ms=MICROBATCH_MAX_WAIT_MS, executor=None, max_concurrent=INFERENCE_WORKERS):
+        self.score_fn = score_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self.executor = executor
+        self.max_concurrent = max(1, max_concurrent)
+        self.batches = 0
+        self.items = 0
+        self._queue = None
+        self._slots = None
+        self._task = None
+        self._inflight = set()
+
+    def start(self):
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.max_concurrent)
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stop batching: batches already scoring finish, queued requests fail."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+        queued = []
+        while self._queue is not None and not self._queue.empty():
+            queued.append(self._queue.get_nowait())
+        _fail(queued, RuntimeError("Micro-batcher stopped"))
+
+    async def submit(self, payload):
+        """Queue one payload and wait for its own result."""
+        if self._task is None:
+            raise RuntimeError("Micro-batcher is not running")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((payload, future))
+        return await future
+
+    async def _collect(self, concurrent):
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        try:
+            while len(batch) < self.max_batch_size:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if not concurrent or timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+        except asyncio.CancelledError:
+            # stopped while waiting for company; these requests are already dequeued
+            _fail(batch, RuntimeError("Micro-batcher stopped"))
+            raise
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        concurrent = False
+        while True:
+            # wait for a free slot first, so requests pile up into bigger batches meanwhile
+            await self._slots.acquire()
+            try:
+                batch = await self._collect(concurrent)
+            except BaseException:
+                self._slots.release()
+                raise
+            concurrent = len(batch) > 1
+            self.batches += 1
+            self.items += len(batch)
+            task = loop.create_task(self._score(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _score(self, batch):
+        payloads = [payload for payload, _ in batch]
+        try:
+            results = await run_inference(self.score_fn, payloads, executor=self.executor)
+        except Exception as e:
+            logger.error(f"Micro-batch of {len(batch)} failed: {e}")
+            _fail(batch, e)
+            return
+        finally:
+            self._slots.release()
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+
+def _fail(batch, exc):
+    for _, future in batch:
+        if not future.done():
+            future.set_exception(exc)
@@ -0,0 +1,212 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from src.utils.logger import logger
+
+CACHE_SIZE = int(os.environ.get("PREDICTION_CACHE_SIZE", "10000"))
+CACHE_TTL = float(os.environ.get("PREDICTION_CACHE_TTL", "300"))
+# sqlite file shared by all workers on the host; empty disables the shared tier
+CACHE_SHARED_PATH = os.environ.get("PREDICTION_CACHE_SHARED_PATH", "")
+# threads doing shared-tier reads and writes off the event loop
+CACHE_IO_WORKERS = int(os.environ.get("PREDICTION_CACHE_IO_WORKERS", "2"))
+
+
+def cache_key(payload: dict, model_version) -> str:
+    """Canonical hash of a validated payload plus the model version."""
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(f"{model_version}|{canonical}".encode()).hexdigest()
+
+
+class MemoryBackend:
+    """In-process LRU with per-entry TTL."""
+
+    def __init__(self, max_entries=CACHE_SIZE, ttl=CACHE_TTL, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires < self.clock():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, self.clock() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SqliteBackend:
+    """Local sqlite file that several worker processes can share."""
+
+    def __init__(self, path, max_entries=CACHE_SIZE, ttl=CACHE_TTL, clock=time.time):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self._local = threading.local()
+        self._writes = 0
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS predictions "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)"
+            )
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = self._conn().execute(
+            "SELECT value FROM predictions WHERE key = ? AND expires >= ?", (key, self.clock())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key, value):
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO predictions (key, value, expires) VALUES (?, ?, ?)",
+            (key, json.dumps(value), self.clock() + self.ttl),
+        )
+        self._writes += 1
+        if self._writes % 1000 == 0:
+            self._prune(conn)
+
+    def _prune(self, conn):
+        conn.execute("DELETE FROM predictions WHERE expires < ?", (self.clock(),))
+        conn.execute(
+            "DELETE FROM predictions WHERE key NOT IN "
+            "(SELECT key FROM predictions ORDER BY expires DESC LIMIT ?)",
+            (self.max_entries,),
+        )
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+
+
+class PredictionCache:
+    """Two-tier prediction cache: in-process LRU in front of an optional shared backend.
+
+    The in-process tier is cheap enough for the event loop. The shared sqlite
+    tier may wait up to its busy timeout on lock contention, so async callers
+    look it up with ``lookup_shared`` and write it with ``store_shared`` on
+    ``io_executor()`` rather than on the loop. The counters are updated from
+    both, so they are guarded by a lock.
+    """
+
+    def __init__(self, local=None, shared=None):
+        self.local = local if local is not None else MemoryBackend()
+        self.shared = shared
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self._io = None
+        self._lock = threading.Lock()
+
+    def _count(self, hits=0, shared_hits=0, misses=0):
+        with self._lock:
+            self.hits += hits
+            self.shared_hits += shared_hits
+            self.misses += misses
+
+    def lookup_local(self, key):
+        """In-process lookup; a miss is only counted when there is no shared tier."""
+        value = self.local.get(key)
+        if value is not None:
+            self._count(hits=1)
+        elif self.shared is None:
+            self._count(misses=1)
+        return value
+
+    def lookup_shared(self, key):
+        """Blocking shared-tier lookup after a local miss; hits are copied into the local tier."""
+        try:
+            value = self.shared.get(key)
+        except sqlite3.Error as e:
+            logger.warning(f"Shared prediction cache read failed: {e}")
+            value = None
+        if value is None:
+            self._count(misses=1)
+            return None
+        self._count(hits=1, shared_hits=1)
+        self.local.set(key, value)
+        return value
+
+    def store_shared(self, key, value):
+        """Blocking shared-tier write; failures are logged, never raised."""
+        try:
+            self.shared.set(key, value)
+        except sqlite3.Error as e:
+            logger.warning(f"Shared prediction cache write failed: {e}")
+
+    def get(self, payload: dict, model_version):
+        key = cache_key(payload, model_version)
+        value = self.lookup_local(key)
+        if value is None and self.shared is not None:
+            value = self.lookup_shared(key)
+        return value
+
+    def set(self, payload: dict, model_version, value):
+        key = cache_key(payload, model_version)
+        self.local.set(key, value)
+        if self.shared is not None:
+            self.store_shared(key, value)
+
+    def io_executor(self):
+        """Thread pool for shared-tier I/O, separate from the inference executor."""
+        if self._io is None:
+            self._io = ThreadPoolExecutor(max_workers=CACHE_IO_WORKERS, thread_name_prefix="cache-io")
+        return self._io
+
+    def close(self):
+        if self._io is not None:
+            self._io.shutdown(wait=True)
+            self._io = None
+
+    def stats(self):
+        with self._lock:
+            hits, shared_hits, misses = self.hits, self.shared_hits, self.misses
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "shared_hits": shared_hits,
+            "misses": misses,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+            "entries": len(self.local),
+        }
+
+
+def create_prediction_cache():
+    """Build the cache from environment settings; None when disabled."""
+    if CACHE_SIZE <= 0:
+        return None
+    shared = SqliteBackend(CACHE_SHARED_PATH) if CACHE_SHARED_PATH else None
+    return PredictionCache(MemoryBackend(), shared)
+
+
+prediction_cache = create_prediction_cache()
@@ -1,27 +1,132 @@
-import pandas as pd
+from typing import TYPE_CHECKING
+
 import numpy as np
-import joblib
-from sklearn.compose import ColumnTransformer
-from sklearn.preprocessing import OneHotEncoder,StandardScaler
+from src.utils.config import read_config
+
+if TYPE_CHECKING:  # pandas is imported by callers; keep it off the API import path
+    import pandas as pd
+
+
+def _ratio(numerator, denominator, eps=1e-9):
+    # eps guards against division by zero
+    return numerator / (denominator + eps)
+
+
+# Derived-feature ops. Each takes its input columns as positional arguments
+# and works the same on Python scalars (single rows) and NumPy arrays (batches).
+OPS = {
+    "ratio": _ratio,
+    "difference": lambda a, b: a - b,
+    "product": lambda a, b: a * b,
+    "log1p": np.log1p,
+}
+
+SCHEMA = read_config("schema")
+if not SCHEMA:
+    raise FileNotFoundError("config/schema.yaml is missing or empty; set CONFIG_DIR to the config directory")
+
+CATEGORICAL_COLS = list(SCHEMA["features"]["categorical"])
+NUMERIC_COLS = list(SCHEMA["features"]["numeric"])
+TARGET = SCHEMA["target"]["name"]
+
+# compact dtypes for the raw columns the model uses, read exactly: float32
+# only holds whole-dollar money (< 2**24), fractional columns stay float64
+RAW_DTYPES = {
+    **{col: spec["dtype"] for col, spec in SCHEMA["columns"].items()},
+    TARGET: SCHEMA["target"]["dtype"],
+}
+
+
+class FeaturePlan:
+    """Ordered derived-feature steps needed for a set of model input columns.
+
+    ``apply`` adds the derived columns to a DataFrame one by one (no copy of
+    the other columns) and ``apply_row`` does the same for a dict; both call
+    the same OPS functions.
+    """
+
+    def __init__(self, outputs, registry=None):
+        registry = SCHEMA["derived"] if registry is None else registry
+        self.outputs = list(outputs)
+        self.steps = []  # (name, op function, input columns, kwargs)
+        visiting = set()
+
+        def visit(col):
+            spec = registry.get(col)
+            if spec is None or any(step[0] == col for step in self.steps):
+                return
+            if col in visiting:
+                raise ValueError(f"Derived feature '{col}' depends on itself")
+            if spec["op"] not in OPS:
+                raise ValueError(f"Unknown op '{spec['op']}' for derived feature '{col}'")
+            visiting.add(col)
+            for dep in spec["inputs"]:
+                visit(dep)
+            visiting.discard(col)
+            kwargs = {k: v for k, v in spec.items() if k not in ("op", "inputs")}
+            self.steps.append((col, OPS[spec["op"]], list(spec["inputs"]), kwargs))
 
-NUMERIC_COLS=['age','years_employed','annual_income',
-  'credit_score','credit_history_years','savings_assets',
-  'current_debt','defaults_on_file','delinquencies_last_2yrs',
-  'derogatory_marks','loan_amount','interest_rate',
-  'debt_to_income_ratio','loan_to_income_ratio']
+        for col in self.outputs:
+            visit(col)
+        derived = {step[0] for step in self.steps}
+        # raw inputs every step and output relies on
+        self.inputs = sorted({c for step in self.steps for c in step[2] if c not in derived}
+                             | {c for c in self.outputs if c not in derived})
+        self.widen = [c for c in self.outputs if c not in derived and c not in CATEGORICAL_COLS]
 
-CATEGORICAL_COLS = ["occupation_status", "loan_intent", "product_type"]
+    def apply(self, df: "pd.DataFrame") -> "pd.DataFrame":
+        """Add the derived columns to ``df`` in place and return it.
 
-def engineer_features(df: pd.DataFrame) -> pd.DataFrame:
-    # Guard against division by zero
-    df = df.copy()
-    df["debt_to_income_ratio"] = df["current_debt"] / (df["annual_income"] + 1e-9)
-    df["loan_to_income_ratio"] = df["loan_amount"] / (df["annual_income"] + 1e-9)
+        Compact numeric inputs (int8, float32, ...) are widened to float64 so
+        features are computed like for API requests.
+        """
+        for col in self.widen:
+            dtype = df[col].dtype if col in df else None
+            if dtype is not None and dtype.kind in "iuf" and dtype.itemsize < 8:
+                df[col] = df[col].astype(np.float64)
+        for name, op, inputs, kwargs in self.steps:
+            df[name] = op(*(df[c].to_numpy(dtype=np.float64) for c in inputs), **kwargs)
+        return df
 
-    return df
+    def apply_row(self, row: dict) -> dict:
+        """Dict counterpart of ``apply``; returns a new dict."""
+        row = dict(row)
+        for name, op, inputs, kwargs in self.steps:
+            row[name] = op(*(row[c] for c in inputs), **kwargs)
+        return row
 
-def create_preprocessor() -> ColumnTransformer:
+
+_plans = {}
+
+
+def feature_plan(columns=None) -> FeaturePlan:
+    """Cached plan for the model input ``columns`` (default: every registry feature)."""
+    key = tuple(columns) if columns is not None else tuple(CATEGORICAL_COLS + NUMERIC_COLS)
+    plan = _plans.get(key)
+    if plan is None:
+        plan = _plans[key] = FeaturePlan(key)
+    return plan
+
+
+def engineer_features(df: "pd.DataFrame", columns=None) -> "pd.DataFrame":
+    """Return ``df`` with the derived features added, leaving ``df`` itself unchanged.
+
+    The result is a shallow copy: the original columns are shared, not copied.
+    """
+    return feature_plan(columns).apply(df.copy(deep=False))
+
+
+def engineer_features_row(row: dict, columns=None) -> dict:
+    """Dict counterpart of engineer_features for single-row inference."""
+    return feature_plan(columns).apply_row(row)
+
+
+def create_preprocessor():
     """Return a ColumnTransformer that encodes categorical cols and scales numeric cols."""
+    # imported here so serving processes only pay for sklearn when they need it
+    from sklearn.compose import ColumnTransformer
+    from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
     preprocessor = ColumnTransformer(
         transformers=[
             ("cat", OneHotEncoder(handle_unknown="ignore", sparse_output=False), CATEGORICAL_COLS),
@@ -32,7 +137,11 @@ def create_preprocessor() -> ColumnTransformer:
     return preprocessor
 
 def save_preprocessor(preprocessor, path="models/preprocessor.joblib"):
+    import joblib
+
     joblib.dump(preprocessor, path)
 
 def load_preprocessor(path="models/preprocessor.joblib"):
+    import joblib
+
     return joblib.load(path)    
\ No newline at end of file
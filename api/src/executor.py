@@ -0,0 +1,85 @@
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+from src.metrics import STAGE_SECONDS
+from src.utils.logger import logger
+
+CPU_COUNT = os.cpu_count() or 1
+
+# "thread" keeps one resident model per process and relies on XGBoost/NumPy
+# releasing the GIL; "process" sidesteps the GIL at the cost of one model copy
+# per pool process.
+INFERENCE_POOL = os.environ.get("INFERENCE_POOL", "thread")
+INFERENCE_WORKERS = int(os.environ.get("INFERENCE_WORKERS", str(CPU_COUNT)))
+# intra-op threads per model call; workers * nthread should not exceed the cores
+MODEL_NTHREAD = int(os.environ.get("MODEL_NTHREAD", "1"))
+
+_executor = None
+
+
+def configure_model_threads(pipeline, nthread=MODEL_NTHREAD):
+    """Cap the classifier's own thread pool so it doesn't oversubscribe ours."""
+    clf = pipeline.steps[-1][1] if hasattr(pipeline, "steps") else pipeline
+    if "n_jobs" in clf.get_params():
+        clf.set_params(n_jobs=nthread)
+    if hasattr(clf, "get_booster"):
+        try:
+            clf.get_booster().set_param("nthread", nthread)
+        except Exception as e:
+            logger.warning(f"Could not set booster nthread: {e}")
+    return pipeline
+
+
+def _init_process_worker():
+    # each pool process keeps its own resident model
+    from src.model_store import model_store
+    model_store.get()
+
+
+def create_executor(kind=INFERENCE_POOL, workers=INFERENCE_WORKERS):
+    workers = max(1, workers)
+    if kind == "process":
+        return ProcessPoolExecutor(max_workers=workers, initializer=_init_process_worker)
+    if kind != "thread":
+        raise ValueError(f"Unknown INFERENCE_POOL '{kind}', expected 'thread' or 'process'")
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="inference")
+
+
+def get_executor():
+    """Return the dedicated inference executor, creating it on first use."""
+    global _executor
+    if _executor is None:
+        _executor = create_executor()
+        logger.info(f"Inference executor: {INFERENCE_POOL} x {INFERENCE_WORKERS}, model nthread {MODEL_NTHREAD}.")
+    return _executor
+
+
+def shutdown_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+
+
+def _call_with_stages(fn, *args):
+    # runs in a pool process: its stage timings go back to /metrics with the result
+    STAGE_SECONDS.drain()  # anything recorded outside a call, e.g. warm-up
+    result = fn(*args)
+    return result, STAGE_SECONDS.drain()
+
+
+async def run_inference(fn, *args, executor=None):
+    """Run CPU-bound inference on ``executor`` (default: the dedicated pool) without blocking the loop.
+
+    Stage timings recorded in a process pool are merged into this process's
+    ``STAGE_SECONDS``, so ``/metrics`` shows them for either pool kind.
+    """
+    loop = asyncio.get_running_loop()
+    executor = executor or get_executor()
+    if isinstance(executor, ProcessPoolExecutor):
+        result, stages = await loop.run_in_executor(executor, partial(_call_with_stages, fn, *args))
+        STAGE_SECONDS.merge(stages)
+        return result
+    return await loop.run_in_executor(executor, partial(fn, *args))
@@ -0,0 +1,182 @@
+import numpy as np
+from src.data_preprocessing import feature_plan
+from src.metrics import stage_timer
+
+
+class CompiledPreprocessor:
+    """A fitted ColumnTransformer flattened into NumPy lookup tables.
+
+    Only the layout produced by ``create_preprocessor`` is supported:
+    OneHotEncoder(handle_unknown="ignore") and StandardScaler blocks, with
+    everything else dropped. The arithmetic mirrors sklearn's so the output
+    is identical to ``preprocessor.transform`` for the same row.
+    """
+
+    def __init__(self, preprocessor):
+        # sklearn is already loaded whenever there is a fitted preprocessor to compile
+        from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+        if not hasattr(preprocessor, "transformers_"):
+            raise ValueError("Preprocessor is not fitted")
+        if getattr(preprocessor, "sparse_output_", False):
+            raise ValueError("Sparse ColumnTransformer output is not supported")
+
+        self.categorical = []  # (column, {category: output index})
+        numeric_cols, means, scales, offsets = [], [], [], []
+        offset = 0
+        for name, transformer, columns in preprocessor.transformers_:
+            if transformer == "drop" or len(columns) == 0:
+                continue
+            if isinstance(transformer, OneHotEncoder):
+                if transformer.handle_unknown != "ignore" or transformer.drop_idx_ is not None:
+                    raise ValueError(f"Unsupported OneHotEncoder settings in '{name}'")
+                if getattr(transformer, "_infrequent_enabled", False):
+                    raise ValueError(f"Infrequent categories are not supported in '{name}'")
+                for col, cats in zip(columns, transformer.categories_):
+                    self.categorical.append((col, {c: offset + i for i, c in enumerate(cats)}))
+                    offset += len(cats)
+            elif isinstance(transformer, StandardScaler):
+                n = len(columns)
+                numeric_cols.extend(columns)
+                means.append(transformer.mean_ if transformer.with_mean else np.zeros(n))
+                scales.append(transformer.scale_ if transformer.with_std else np.ones(n))
+                offsets.extend(range(offset, offset + n))
+                offset += n
+            else:
+                raise ValueError(f"Unsupported transformer '{name}': {type(transformer).__name__}")
+
+        self.numeric_cols = numeric_cols
+        self.mean = np.concatenate(means) if means else np.zeros(0)
+        self.scale = np.concatenate(scales) if scales else np.ones(0)
+        self.numeric_index = np.asarray(offsets, dtype=np.intp)
+        self.n_features = offset
+
+    @property
+    def input_columns(self):
+        """Engineered columns the preprocessor reads."""
+        return [col for col, _ in self.categorical] + list(self.numeric_cols)
+
+    def to_dict(self) -> dict:
+        """JSON-serialisable lookup tables; see ``from_dict``."""
+        return {
+            "categorical": [[col, list(lookup), list(lookup.values())] for col, lookup in self.categorical],
+            "numeric_cols": list(self.numeric_cols),
+            "mean": self.mean.tolist(),
+            "scale": self.scale.tolist(),
+            "numeric_index": self.numeric_index.tolist(),
+            "n_features": self.n_features,
+        }
+
+    @classmethod
+    def from_dict(cls, tables: dict) -> "CompiledPreprocessor":
+        """Rebuild a preprocessor from ``to_dict`` output without sklearn objects."""
+        self = cls.__new__(cls)
+        self.categorical = [(col, dict(zip(cats, idx))) for col, cats, idx in tables["categorical"]]
+        self.numeric_cols = list(tables["numeric_cols"])
+        self.mean = np.asarray(tables["mean"], dtype=np.float64)
+        self.scale = np.asarray(tables["scale"], dtype=np.float64)
+        self.numeric_index = np.asarray(tables["numeric_index"], dtype=np.intp)
+        self.n_features = tables["n_features"]
+        return self
+
+    def transform_one(self, row: dict) -> np.ndarray:
+        """Turn one engineered row into a (1, n_features) float64 matrix."""
+        x = np.zeros((1, self.n_features), dtype=np.float64)
+        for col, lookup in self.categorical:
+            idx = lookup.get(row[col])
+            if idx is not None:
+                x[0, idx] = 1.0
+        num = np.array([row[c] for c in self.numeric_cols], dtype=np.float64)
+        num -= self.mean
+        num /= self.scale
+        x[0, self.numeric_index] = num
+        return x
+
+    def transform_many(self, rows: list) -> np.ndarray:
+        """Turn a list of engineered rows into an (n, n_features) matrix."""
+        x = np.zeros((len(rows), self.n_features), dtype=np.float64)
+        for col, lookup in self.categorical:
+            for i, row in enumerate(rows):
+                idx = lookup.get(row[col])
+                if idx is not None:
+                    x[i, idx] = 1.0
+        num = np.array([[row[c] for c in self.numeric_cols] for row in rows], dtype=np.float64)
+        num -= self.mean
+        num /= self.scale
+        x[:, self.numeric_index] = num
+        return x
+
+    def transform_frame(self, df) -> np.ndarray:
+        """Vectorized transform of an engineered DataFrame."""
+        n = len(df)
+        x = np.zeros((n, self.n_features), dtype=np.float64)
+        rows = np.arange(n)
+        for col, lookup in self.categorical:
+            idx = df[col].map(lookup).to_numpy(dtype=np.float64, na_value=np.nan)
+            known = ~np.isnan(idx)
+            x[rows[known], idx[known].astype(np.intp)] = 1.0
+        num = df[self.numeric_cols].to_numpy(dtype=np.float64, copy=True)
+        num -= self.mean
+        num /= self.scale
+        x[:, self.numeric_index] = num
+        return x
+
+
+class CompiledPipeline:
+    """Pandas-free scorer for a fitted ``Pipeline([preprocessor, clf])``."""
+
+    def __init__(self, pipeline):
+        from sklearn.compose import ColumnTransformer
+        from sklearn.pipeline import Pipeline
+
+        if not isinstance(pipeline, Pipeline) or len(pipeline.steps) != 2:
+            raise ValueError("Expected a two-step (preprocessor, clf) Pipeline")
+        preprocessor, self.clf = pipeline.steps[0][1], pipeline.steps[1][1]
+        if not isinstance(preprocessor, ColumnTransformer):
+            raise ValueError("First pipeline step must be a ColumnTransformer")
+        self.preprocessor = CompiledPreprocessor(preprocessor)
+        # derived features this model doesn't read are not computed
+        self.plan = feature_plan(self.preprocessor.input_columns)
+        self.has_proba = hasattr(self.clf, "predict_proba")
+
+    def predict_one(self, payload: dict) -> dict:
+        """Score one validated LoanInput payload without building a DataFrame."""
+        with stage_timer("engineer_features"):
+            row = self.plan.apply_row(payload)
+        with stage_timer("preprocessing"):
+            x = self.preprocessor.transform_one(row)
+        if not self.has_proba:
+            with stage_timer("predict"):
+                return {"prediction": int(self.clf.predict(x)[0]), "probability": None}
+        with stage_timer("predict_proba"):
+            proba = self.clf.predict_proba(x)
+        return {
+            "prediction": int(self.clf.classes_[proba[0].argmax()]),
+            "probability": float(proba[0, 1]),
+        }
+
+    def predict_many(self, payloads: list) -> list:
+        """Score a list of payloads with one vectorized model call."""
+        with stage_timer("engineer_features"):
+            rows = [self.plan.apply_row(p) for p in payloads]
+        with stage_timer("preprocessing"):
+            x = self.preprocessor.transform_many(rows)
+        if not self.has_proba:
+            with stage_timer("predict"):
+                preds = self.clf.predict(x)
+            return [{"prediction": int(p), "probability": None} for p in preds]
+        with stage_timer("predict_proba"):
+            proba = self.clf.predict_proba(x)
+        preds = self.clf.classes_[proba.argmax(axis=1)]
+        return [
+            {"prediction": int(pred), "probability": float(prob)}
+            for pred, prob in zip(preds, proba[:, 1])
+        ]
+
+
+def compile_pipeline(pipeline):
+    """Return a CompiledPipeline, or None when the layout isn't supported."""
+    try:
+        return CompiledPipeline(pipeline)
+    except (ValueError, AttributeError):
+        return None
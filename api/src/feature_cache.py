@@ -0,0 +1,174 @@
+"""Content-addressed cache of the engineered and preprocessed training matrices.
+
+An entry lives in ``data/processed/features/<key>/`` where the key hashes the
+raw data file (or ingested dataset; the loaded frame itself when no file
+exists at the path), the split seed and test size, and the
+preprocessing configuration (the config/schema.yaml feature registry, the
+feature-engineering source and the ColumnTransformer spec).
+It holds:
+
+- ``X_train.npy`` / ``X_test.npy``: transformed float64 matrices, memory-mapped on load;
+- ``y_train.npy`` / ``y_test.npy``: labels;
+- ``train.parquet`` / ``test.parquet``: the engineered frames before transformation;
+- ``preprocessor.joblib``: the ColumnTransformer fitted on the training split;
+- ``meta.json``: written last, so an entry without it is incomplete.
+
+Reruns with the same inputs skip reading the CSV, feature engineering and
+the preprocessor fit entirely.
+"""
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import time
+from collections import namedtuple
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.model_selection import train_test_split
+from src import data_preprocessing
+from src.data_preprocessing import TARGET, create_preprocessor, engineer_features
+from src.ingest import MANIFEST
+from src.model_store import file_digest
+from src.utils.logger import logger
+
+FEATURE_CACHE_DIR = os.environ.get("FEATURE_CACHE_DIR", "data/processed/features")
+# entries kept per cache directory, oldest are pruned after a build
+FEATURE_CACHE_KEEP = int(os.environ.get("FEATURE_CACHE_KEEP", "3"))
+# bump when the entry layout changes
+CACHE_FORMAT = 1
+
+FeatureSet = namedtuple(
+    "FeatureSet", ["path", "X_train", "X_test", "y_train", "y_test", "preprocessor", "test_frame"])
+
+
+def preprocessing_fingerprint():
+    """Hash of everything that shapes the matrices besides the data and split."""
+    spec = "\n".join([
+        str(CACHE_FORMAT),
+        sklearn.__version__,
+        json.dumps(data_preprocessing.SCHEMA, sort_keys=True),
+        inspect.getsource(data_preprocessing),
+        repr(create_preprocessor()),
+        TARGET,
+    ])
+    return hashlib.sha256(spec.encode()).hexdigest()
+
+
+def data_digest(path):
+    """Digest of a raw file, or of the manifest of an ingested dataset directory."""
+    if os.path.isdir(path):
+        path = os.path.join(path, MANIFEST)
+    return file_digest(path)
+
+
+def frame_digest(df):
+    """Digest of a DataFrame's columns and values."""
+    h = hashlib.sha256(json.dumps([str(c) for c in df.columns]).encode())
+    h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def cache_key(raw_path, seed, test_size, digest=None):
+    """``digest`` stands in for the digest of ``raw_path`` when given."""
+    parts = [digest or data_digest(raw_path), str(seed), repr(test_size), preprocessing_fingerprint()]
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()[:16]
+
+
+def open_features(path, mmap_mode="r") -> FeatureSet:
+    """Open a complete cache entry; matrices are memory-mapped unless ``mmap_mode`` is None."""
+    def array(name):
+        return np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode)
+
+    return FeatureSet(
+        path=path,
+        X_train=array("X_train"),
+        X_test=array("X_test"),
+        y_train=array("y_train"),
+        y_test=array("y_test"),
+        preprocessor=joblib.load(os.path.join(path, "preprocessor.joblib")),
+        test_frame=pd.read_parquet(os.path.join(path, "test.parquet")),
+    )
+
+
+def build_features(df, path, seed=42, test_size=0.2, meta=None) -> FeatureSet:
+    """Engineer, split and preprocess raw ``df`` into a new cache entry at ``path``."""
+    df = engineer_features(df)
+    y = df[TARGET]
+    # split positions, then gather each side once instead of copying the frame first
+    train_idx, test_idx = train_test_split(
+        np.arange(len(df)), test_size=test_size, random_state=seed, stratify=y)
+    features = [i for i, col in enumerate(df.columns) if col != TARGET]
+    X_train, X_test = df.iloc[train_idx, features], df.iloc[test_idx, features]
+    y_train, y_test = y.iloc[train_idx], y.iloc[test_idx]
+
+    preprocessor = create_preprocessor()
+    arrays = {
+        "X_train": preprocessor.fit_transform(X_train),
+        "X_test": preprocessor.transform(X_test),
+        "y_train": y_train.to_numpy(),
+        "y_test": y_test.to_numpy(),
+    }
+
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    for name, array in arrays.items():
+        np.save(os.path.join(tmp_path, f"{name}.npy"), np.ascontiguousarray(array))
+    X_train.to_parquet(os.path.join(tmp_path, "train.parquet"))
+    X_test.to_parquet(os.path.join(tmp_path, "test.parquet"))
+    joblib.dump(preprocessor, os.path.join(tmp_path, "preprocessor.joblib"))
+    with open(os.path.join(tmp_path, "meta.json"), "w") as f:
+        json.dump({
+            **(meta or {}),
+            "seed": seed,
+            "test_size": test_size,
+            "shapes": {name: list(array.shape) for name, array in arrays.items()},
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }, f, indent=2)
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp_path, path)
+    return open_features(path)
+
+
+def prune(cache_dir=None, keep=FEATURE_CACHE_KEEP):
+    """Delete all but the ``keep`` most recently used complete entries."""
+    cache_dir = cache_dir or FEATURE_CACHE_DIR
+    entries = [os.path.join(cache_dir, name) for name in os.listdir(cache_dir)]
+    entries = [e for e in entries if os.path.exists(os.path.join(e, "meta.json"))]
+    entries.sort(key=lambda e: os.path.getmtime(os.path.join(e, "meta.json")), reverse=True)
+    for entry in entries[keep:]:
+        shutil.rmtree(entry, ignore_errors=True)
+        logger.info(f"Pruned feature cache entry {entry}.")
+
+
+def load_or_build(raw_path, load_fn, seed=42, test_size=0.2, cache_dir=None) -> FeatureSet:
+    """Return the cached FeatureSet for these inputs, building it on a miss.
+
+    ``load_fn(raw_path)`` reads the raw DataFrame and is only called on a miss,
+    unless nothing exists at ``raw_path``: then the frame is loaded first and
+    keyed by its contents.
+    """
+    cache_dir = cache_dir or FEATURE_CACHE_DIR
+    df, digest = None, None
+    if not os.path.exists(raw_path):
+        df = load_fn(raw_path)
+        digest = frame_digest(df)
+    key = cache_key(raw_path, seed, test_size, digest)
+    path = os.path.join(cache_dir, key)
+    meta_path = os.path.join(path, "meta.json")
+    if os.path.exists(meta_path):
+        os.utime(meta_path)  # marks the entry as recently used for prune()
+        logger.info(f"Feature cache hit {key}, skipping feature engineering.")
+        return open_features(path)
+
+    start = time.perf_counter()
+    os.makedirs(cache_dir, exist_ok=True)
+    features = build_features(load_fn(raw_path) if df is None else df, path, seed, test_size,
+                              meta={"key": key, "raw_path": os.path.abspath(raw_path)})
+    logger.info(f"Feature cache miss {key}, built in {time.perf_counter() - start:.1f}s.")
+    prune(cache_dir)
+    return features
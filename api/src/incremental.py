@@ -0,0 +1,195 @@
+"""Incremental model updates from a batch of newly labelled loans.
+
+    cd api && python -m src.incremental data/raw/new_outcomes.csv [--rounds 50]
+
+The current ``models/loan_model.pkl`` is updated on the new batch only:
+
+- XGBoost keeps its trees and boosts ``rounds`` more on the new rows;
+- a random forest warm-starts ``rounds`` extra trees fitted on the new rows;
+- other warm-startable classifiers (e.g. LogisticRegression) are refitted on
+  the new rows alone; their fitted coefficients only seed the solver.
+
+The fitted preprocessor is kept as is, so the existing trees see the same
+features. Both models are scored on two holdouts: a stratified ``holdout``
+share of the batch, kept out of the update, and the fixed reference holdout
+that training saved to ``models/reference.parquet``. The batch holdout shows
+whether the update learned the new rows, the reference whether it still
+scores the historical distribution. The update is promoted only if its AUC
+on each is at most ``tolerance`` below the previous model's. A promoted
+model is written to ``models/versions/loan_model-<version>.pkl``, swapped in
+as ``loan_model.pkl`` (the API reloads it) and exported to the tree engine;
+if the export fails, the stale engine is removed and the pickle is served.
+Every attempt is appended to ``models/versions/history.jsonl``.
+"""
+import argparse
+import copy
+import json
+import os
+import shutil
+import time
+from collections import namedtuple
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import train_test_split
+from src.data_preprocessing import TARGET, engineer_features
+from src.model_store import ENGINE_PATH, MODEL_PATH, file_digest, save_pipeline
+from src.tree_engine import export_engine
+from src.utils.exception import CustomException
+from src.utils.logger import logger
+
+VERSIONS_DIR = os.environ.get("MODEL_VERSIONS_DIR", "models/versions")
+# boosting rounds (XGBoost) or trees (random forest) added per update
+UPDATE_ROUNDS = int(os.environ.get("UPDATE_ROUNDS", "50"))
+# largest holdout AUC drop accepted against the previous model
+UPDATE_AUC_TOLERANCE = float(os.environ.get("UPDATE_AUC_TOLERANCE", "0.001"))
+# labelled holdout of the training run, written by src.train
+REFERENCE_PATH = os.environ.get("UPDATE_REFERENCE_PATH", "models/reference.parquet")
+
+UpdateResult = namedtuple(
+    "UpdateResult", ["promoted", "version", "parent", "auc", "parent_auc", "reference_auc",
+                     "parent_reference_auc", "rows", "seconds", "pipeline"])
+
+
+def save_reference(frame, path=REFERENCE_PATH):
+    """Save the engineered, labelled holdout ``frame`` that gates later updates."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    frame.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def continue_fit(clf, X, y, rounds=UPDATE_ROUNDS):
+    """Return a copy of fitted ``clf`` trained further on (X, y); ``clf`` is left unchanged."""
+    if hasattr(clf, "get_booster"):
+        params = {**clf.get_params(), "n_estimators": rounds, "early_stopping_rounds": None}
+        updated = type(clf)(**params)
+        updated.fit(X, y, xgb_model=clf.get_booster(), verbose=False)
+        # n_estimators counts the rounds of this fit only; report the model's total
+        updated.set_params(n_estimators=updated.get_booster().num_boosted_rounds())
+        return updated
+    updated = copy.deepcopy(clf)
+    if "warm_start" not in updated.get_params():
+        raise ValueError(f"{type(clf).__name__} cannot be updated incrementally")
+    if hasattr(updated, "estimators_"):
+        # forests: the extra trees are fitted on the new rows only
+        updated.set_params(warm_start=True, n_estimators=len(updated.estimators_) + rounds)
+    else:
+        updated.set_params(warm_start=True)
+    updated.fit(X, y)
+    return updated
+
+
+def _record(entry, versions_dir):
+    os.makedirs(versions_dir, exist_ok=True)
+    with open(os.path.join(versions_dir, "history.jsonl"), "a") as f:
+        f.write(json.dumps(entry) + "\n")
+
+
+def update_model(df, model_path=MODEL_PATH, rounds=UPDATE_ROUNDS, holdout=0.2,
+                 tolerance=UPDATE_AUC_TOLERANCE, versions_dir=VERSIONS_DIR,
+                 engine_path=ENGINE_PATH, seed=42, reference_path=REFERENCE_PATH) -> UpdateResult:
+    """Update the model at ``model_path`` with the labelled raw rows in ``df``.
+
+    Without a reference holdout at ``reference_path`` only the batch holdout gates the update.
+    """
+    start = time.perf_counter()
+    reference_auc = parent_reference_auc = None
+    try:
+        parent = file_digest(model_path)[:12]
+        pipeline = joblib.load(model_path)
+        preprocessor, clf = pipeline.steps[0][1], pipeline.steps[-1][1]
+
+        df = engineer_features(df)
+        y = df[TARGET].to_numpy()
+        fit_idx, eval_idx = train_test_split(
+            np.arange(len(df)), test_size=holdout, random_state=seed, stratify=y)
+        features = [i for i, col in enumerate(df.columns) if col != TARGET]
+        eval_frame = df.iloc[eval_idx, features]
+        X_fit = preprocessor.transform(df.iloc[fit_idx, features])
+        X_eval = preprocessor.transform(eval_frame)
+
+        updated = continue_fit(clf, X_fit, y[fit_idx], rounds)
+        parent_auc = roc_auc_score(y[eval_idx], clf.predict_proba(X_eval)[:, 1])
+        auc = roc_auc_score(y[eval_idx], updated.predict_proba(X_eval)[:, 1])
+        if os.path.exists(reference_path):
+            reference = pd.read_parquet(reference_path)
+            y_ref = reference[TARGET].to_numpy()
+            X_ref = preprocessor.transform(reference.drop(columns=[TARGET]))
+            parent_reference_auc = roc_auc_score(y_ref, clf.predict_proba(X_ref)[:, 1])
+            reference_auc = roc_auc_score(y_ref, updated.predict_proba(X_ref)[:, 1])
+        else:
+            logger.warning(f"No reference holdout at {reference_path}; gating on the batch holdout only.")
+    except Exception as e:
+        raise CustomException(e, f"Incremental update of {model_path} failed")
+
+    new_pipeline = copy.copy(pipeline)
+    new_pipeline.steps = pipeline.steps[:-1] + [(pipeline.steps[-1][0], updated)]
+    promoted = auc >= parent_auc - tolerance and (
+        reference_auc is None or reference_auc >= parent_reference_auc - tolerance)
+    version = None
+    if promoted:
+        os.makedirs(versions_dir, exist_ok=True)
+        tmp_path = os.path.join(versions_dir, f"loan_model-{os.getpid()}.tmp")
+        save_pipeline(new_pipeline, tmp_path)
+        version = file_digest(tmp_path)[:12]
+        versioned = os.path.join(versions_dir, f"loan_model-{version}.pkl")
+        os.replace(tmp_path, versioned)
+        # copy, then swap in atomically, so the API watcher sees the new version
+        shutil.copyfile(versioned, f"{model_path}.tmp-{os.getpid()}")
+        os.replace(f"{model_path}.tmp-{os.getpid()}", model_path)
+        try:
+            export_engine(new_pipeline, engine_path, eval_frame)
+        except CustomException as e:
+            # export_engine removed the previous model's engine, so the pickle is served
+            logger.warning(f"Tree engine not exported, serving the pickle: {e}")
+
+    seconds = time.perf_counter() - start
+    _record({
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "parent": parent,
+        "version": version,
+        "promoted": promoted,
+        "rows": len(df),
+        "rounds": rounds,
+        "auc": auc,
+        "parent_auc": parent_auc,
+        "reference_auc": reference_auc,
+        "parent_reference_auc": parent_reference_auc,
+        "seconds": round(seconds, 3),
+    }, versions_dir)
+    aucs = f"holdout AUC {parent_auc:.4f} -> {auc:.4f}"
+    if reference_auc is not None:
+        aucs += f", reference AUC {parent_reference_auc:.4f} -> {reference_auc:.4f}"
+    if promoted:
+        logger.info(f"Promoted model {parent} -> {version} after {len(df)} new rows in {seconds:.1f}s ({aucs}).")
+    else:
+        logger.warning(f"Update of {parent} rejected: {aucs} (tolerance {tolerance}).")
+    return UpdateResult(promoted, version, parent, auc, parent_auc, reference_auc, parent_reference_auc,
+                        len(df), seconds, new_pipeline)
+
+
+def main(argv=None):
+    from src.train import load_data
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("data", help="CSV/Parquet file or ingested dataset of new labelled loans")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--rounds", type=int, default=UPDATE_ROUNDS)
+    parser.add_argument("--holdout", type=float, default=0.2, help="share of the batch used to compare models")
+    parser.add_argument("--tolerance", type=float, default=UPDATE_AUC_TOLERANCE)
+    parser.add_argument("--reference", default=REFERENCE_PATH, help="labelled holdout saved by training")
+    args = parser.parse_args(argv)
+    result = update_model(load_data(args.data), args.model, args.rounds, args.holdout, args.tolerance,
+                          reference_path=args.reference)
+    reference = ("" if result.reference_auc is None else
+                 f", reference AUC {result.parent_reference_auc:.4f} -> {result.reference_auc:.4f}")
+    print(f"{'promoted' if result.promoted else 'rejected'}: AUC {result.parent_auc:.4f} -> {result.auc:.4f}"
+          f"{reference} on {result.rows:,} new rows in {result.seconds:.1f}s")
+    return 0 if result.promoted else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,165 @@
+import bisect
+import os
+import threading
+import time
+
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") == "1"
+
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values):
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+class Counter:
+    """Monotonic counter with optional labels."""
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        return self._values.get(labels, 0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels."""
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            series[idx] += 1
+            series[-1] += value
+
+    def count(self, *labels):
+        series = self._series.get(labels)
+        return sum(series[:-1]) if series else 0
+
+    def drain(self):
+        """Return the recorded series and start over; see ``merge``."""
+        with self._lock:
+            series, self._series = self._series, {}
+        return series
+
+    def merge(self, series):
+        """Add series drained from the same histogram in another process."""
+        with self._lock:
+            for labels, values in series.items():
+                mine = self._series.setdefault(labels, [0] * (len(self.buckets) + 2))
+                for i, value in enumerate(values):
+                    mine[i] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        names = self.labelnames + ("le",)
+        for labels, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets + ("+Inf",), series[:-1]):
+                cumulative += n
+                lines.append(f"{self.name}_bucket{_format_labels(names, labels + (bound,))} {cumulative}")
+            label_str = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_str} {series[-1]}")
+            lines.append(f"{self.name}_count{label_str} {cumulative}")
+        return lines
+
+
+STAGE_SECONDS = Histogram(
+    "loan_stage_duration_seconds", "Time spent in each prediction stage.", ("stage",))
+REQUEST_SECONDS = Histogram(
+    "loan_http_request_duration_seconds", "HTTP request latency.", ("method", "path"))
+REQUESTS = Counter(
+    "loan_http_requests_total", "HTTP requests handled.", ("method", "path", "status"))
+ERRORS = Counter(
+    "loan_prediction_errors_total", "Prediction failures by underlying cause.", ("cause",))
+
+
+class stage_timer:
+    """``with stage_timer("engineer_features"):`` records the block's duration."""
+
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if METRICS_ENABLED:
+            STAGE_SECONDS.observe(time.perf_counter() - self.start, self.stage)
+        return False
+
+
+def record_error(exc):
+    """Count a failure, labelled by the exception wrapped in a CustomException."""
+    cause = getattr(exc, "error", exc)
+    ERRORS.inc(type(cause).__name__)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware counting requests and timing them per route path."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            REQUEST_SECONDS.observe(time.perf_counter() - start, scope["method"], path)
+            REQUESTS.inc(scope["method"], path, str(status[0]))
+
+
+def render_metrics(extra_lines=()):
+    """Return every metric in the Prometheus text exposition format."""
+    lines = []
+    for metric in (REQUESTS, REQUEST_SECONDS, STAGE_SECONDS, ERRORS):
+        lines.extend(metric.render())
+    lines.extend(extra_lines)
+    return "\n".join(lines) + "\n"
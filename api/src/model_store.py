@@ -0,0 +1,204 @@
+import hashlib
+import os
+import threading
+from collections import namedtuple
+
+from src.data_preprocessing import engineer_features
+from src.executor import configure_model_threads
+from src.metrics import stage_timer
+from src.fast_inference import compile_pipeline
+from src.schemas.input_schema import EXAMPLE_INPUT
+from src.utils.logger import logger
+from src.utils.exception import CustomException
+
+MODEL_PATH = "models/loan_model.pkl"
+# directory written by src.tree_engine (flattened ensemble as .npy arrays)
+ENGINE_PATH = os.environ.get("MODEL_ENGINE_PATH", "models/loan_model_engine")
+# "sklearn" serves the pickled pipeline, "numpy" the flattened tree engine
+MODEL_BACKEND = os.environ.get("MODEL_BACKEND", "sklearn")
+SERVING_PATH = ENGINE_PATH if MODEL_BACKEND == "numpy" else MODEL_PATH
+# served while the engine directory is missing (its export failed or was removed)
+FALLBACK_PATH = MODEL_PATH if MODEL_BACKEND == "numpy" else None
+RELOAD_INTERVAL = float(os.environ.get("MODEL_RELOAD_INTERVAL", "30"))
+# "r" memory-maps NumPy arrays from the (uncompressed) artifact instead of
+# copying them into each process; set to "" to load everything into memory.
+MMAP_MODE = os.environ.get("MODEL_MMAP_MODE", "r") or None
+
+LoadedModel = namedtuple("LoadedModel", ["pipeline", "compiled", "version", "mtime"])
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """Return the sha256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def artifact_file(path):
+    """File whose mtime/digest identify the artifact (meta.json for engine directories)."""
+    if os.path.isdir(path):
+        from src.tree_engine import ENGINE_META
+
+        return os.path.join(path, ENGINE_META)
+    return path
+
+
+def save_pipeline(pipeline, path=MODEL_PATH):
+    """Write an uncompressed, mmap-able artifact and swap it in atomically.
+
+    Writing to a temporary file and renaming gives readers a new inode, so
+    processes that still have the old artifact memory-mapped keep a valid
+    mapping while the watcher picks up the new version.
+    """
+    import joblib
+
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    try:
+        joblib.dump(pipeline, tmp_path, compress=0)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def warm_up(pipeline, compiled=None):
+    """Run one prediction so lazy initialisation happens before real traffic."""
+    import pandas as pd
+
+    df = engineer_features(pd.DataFrame([EXAMPLE_INPUT]))
+    pipeline.predict(df)
+    if hasattr(pipeline, "predict_proba"):
+        pipeline.predict_proba(df)
+    if compiled is not None:
+        compiled.predict_one(EXAMPLE_INPUT)
+
+
+class ModelStore:
+    """Process-wide holder that keeps the prediction pipeline resident.
+
+    The pipeline is loaded once, warmed up, and then swapped atomically in the
+    background whenever the artifact's content changes on disk. ``path`` is
+    either a pickled pipeline or a tree-engine directory, whose EnginePipeline
+    then stands in for the pipeline. While ``path`` does not exist the store
+    serves ``fallback`` instead, and switches back once it reappears.
+    """
+
+    def __init__(self, path=SERVING_PATH, reload_interval=RELOAD_INTERVAL, mmap_mode=MMAP_MODE,
+                 fallback=FALLBACK_PATH):
+        self.path = path
+        self.fallback = fallback
+        self.reload_interval = reload_interval
+        self.mmap_mode = mmap_mode
+        self._current = None
+        self._load_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher = None
+
+    @property
+    def version(self):
+        current = self._current
+        return current.version if current is not None else None
+
+    @property
+    def loaded(self):
+        return self._current is not None
+
+    def current(self, fresh=False):
+        """Return the resident LoadedModel, loading it on first use.
+
+        ``fresh=True`` forces a new load from disk (tests rely on this).
+        """
+        current = self._current
+        if current is None or fresh:
+            current = self._load(force=fresh)
+        return current
+
+    def get(self, fresh=False):
+        """Return the resident pipeline."""
+        return self.current(fresh).pipeline
+
+    def _source(self):
+        """Artifact to serve: ``path``, or ``fallback`` while ``path`` is missing."""
+        if self.fallback is not None and not os.path.exists(self.path):
+            return self.fallback
+        return self.path
+
+    def _read(self):
+        path = self._source()
+        if path != self.path:
+            logger.warning(f"{self.path} is missing; serving {path} instead.")
+        meta_file = artifact_file(path)
+        mtime = os.path.getmtime(meta_file)
+        version = file_digest(meta_file)[:12]
+        if meta_file != path:
+            from src.tree_engine import load_engine
+
+            with stage_timer("model_load"):
+                engine = load_engine(path, mmap_mode=self.mmap_mode)
+            warm_up(engine, engine)
+            return LoadedModel(engine, engine, version, mtime)
+        import joblib
+
+        with stage_timer("model_load"):
+            pipeline = configure_model_threads(joblib.load(path, mmap_mode=self.mmap_mode))
+        compiled = compile_pipeline(pipeline)
+        warm_up(pipeline, compiled)
+        return LoadedModel(pipeline, compiled, version, mtime)
+
+    def _load(self, force=False):
+        with self._load_lock:
+            if self._current is not None and not force:
+                return self._current
+            try:
+                self._current = self._read()
+            except Exception as e:
+                raise CustomException(e, f"Failed loading model from {self.path}")
+            logger.info(f"Loaded prediction pipeline version {self._current.version}.")
+            return self._current
+
+    def check_for_update(self):
+        """Reload the artifact if it changed on disk. Returns True on swap."""
+        current = self._current
+        if current is None:
+            self._load()
+            return True
+        try:
+            meta_file = artifact_file(self._source())
+            mtime = os.path.getmtime(meta_file)
+            if mtime == current.mtime:
+                return False
+            if file_digest(meta_file)[:12] == current.version:
+                # touched but not modified, remember the new mtime only
+                self._current = current._replace(mtime=mtime)
+                return False
+            with self._load_lock:
+                loaded = self._read()
+                self._current = loaded
+        except Exception as e:
+            logger.error(f"Model reload failed, keeping version {current.version}: {e}")
+            return False
+        logger.info(f"Swapped prediction pipeline {current.version} -> {loaded.version}.")
+        return True
+
+    def _watch(self):
+        while not self._stop.wait(self.reload_interval):
+            self.check_for_update()
+
+    def start(self):
+        """Load and warm up the model, then start the background watcher."""
+        self.get()
+        if self.reload_interval > 0 and self._watcher is None:
+            self._stop.clear()
+            self._watcher = threading.Thread(target=self._watch, name="model-watcher", daemon=True)
+            self._watcher.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=5)
+            self._watcher = None
+
+
+model_store = ModelStore()
@@ -0,0 +1,166 @@
+"""Out-of-core training for loan files larger than RAM.
+
+    cd api && python src/train.py --out-of-core [--chunk-rows 200000]
+
+The raw CSV/Parquet file is streamed in chunks of ``chunk_rows`` rows, read
+with the compact ``RAW_DTYPES`` and only the columns the model uses. Memory
+is bounded by the chunk size, not the row count:
+
+1. one pass fits the preprocessing statistics: ``StandardScaler.partial_fit``
+   for the numeric columns and the union of category vocabularies;
+2. XGBoost trains from an ``ExtMemQuantileDMatrix``, fed chunk by chunk
+   through a ``DataIter``; its quantised pages are cached on disk;
+3. a final pass scores the holdout rows and accumulates a binned ROC AUC.
+
+Rows are split into train/holdout with a per-chunk seeded draw rather than a
+stratified split, since the class counts are not known up front. The result
+is a regular ``Pipeline(preprocessor, XGBClassifier)``. It is saved, served
+and exported to the tree engine like the in-memory model.
+"""
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import xgboost as xgb
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from src.batch_score import iter_chunks
+from src.data_preprocessing import (
+    CATEGORICAL_COLS, NUMERIC_COLS, RAW_DTYPES, TARGET, create_preprocessor, engineer_features,
+)
+from src.utils.config import read_config
+from src.utils.logger import logger
+
+CHUNK_ROWS = int(os.environ.get("TRAIN_CHUNK_ROWS", "200000"))
+# histogram bins of the streaming AUC; the error is below 1 / AUC_BINS
+AUC_BINS = 1 << 16
+
+
+def split_chunks(path, chunk_rows=CHUNK_ROWS, test_size=0.2, seed=42):
+    """Yield (engineered chunk, holdout mask); the split is reproducible for a given ``chunk_rows``."""
+    for index, chunk in enumerate(iter_chunks(path, chunk_rows, RAW_DTYPES)):
+        rng = np.random.default_rng([seed, index])
+        yield engineer_features(chunk), rng.random(len(chunk)) < test_size
+
+
+def fit_preprocessor(path, chunk_rows=CHUNK_ROWS, test_size=0.2, seed=42):
+    """Fit the ColumnTransformer of ``create_preprocessor`` over the training rows, chunk by chunk.
+
+    Returns (preprocessor, training rows, holdout sample for engine verification).
+    """
+    scaler = StandardScaler()
+    vocab = {col: set() for col in CATEGORICAL_COLS}
+    rows, sample = 0, None
+    for df, holdout in split_chunks(path, chunk_rows, test_size, seed):
+        train = df[~holdout]
+        if not len(train):
+            continue
+        scaler.partial_fit(train[NUMERIC_COLS])
+        for col in CATEGORICAL_COLS:
+            vocab[col].update(train[col].dropna().unique())
+        rows += len(train)
+        if sample is None:
+            sample = df[holdout]
+
+    # fit the transformer on a small frame with fixed categories, then swap in
+    # the scaler fitted over every chunk
+    preprocessor = create_preprocessor()
+    preprocessor.set_params(cat__categories=[sorted(vocab[col]) for col in CATEGORICAL_COLS])
+    preprocessor.fit(sample if len(sample) else train)
+    preprocessor.transformers_ = [
+        (name, scaler if name == "num" else transformer, columns)
+        for name, transformer, columns in preprocessor.transformers_
+    ]
+    return preprocessor, rows, sample
+
+
+class ChunkIter(xgb.DataIter):
+    """Feeds the transformed training rows of every chunk to XGBoost."""
+
+    def __init__(self, path, preprocessor, chunk_rows, test_size, seed, cache_prefix):
+        self.args = (path, chunk_rows, test_size, seed)
+        self.preprocessor = preprocessor
+        self._chunks = None
+        super().__init__(cache_prefix=cache_prefix)
+
+    def next(self, input_data):
+        if self._chunks is None:
+            self._chunks = split_chunks(*self.args)
+        for df, holdout in self._chunks:
+            train = df[~holdout]
+            if len(train):
+                X = self.preprocessor.transform(train).astype(np.float32)
+                input_data(data=X, label=train[TARGET].to_numpy())
+                return True
+        return False
+
+    def reset(self):
+        self._chunks = None
+
+
+class StreamingAUC:
+    """ROC AUC from per-class histograms of the predicted probability."""
+
+    def __init__(self, bins=AUC_BINS):
+        self.bins = bins
+        self.pos = np.zeros(bins, dtype=np.int64)
+        self.neg = np.zeros(bins, dtype=np.int64)
+
+    def update(self, y, prob):
+        idx = np.minimum((np.asarray(prob) * self.bins).astype(np.int64), self.bins - 1)
+        y = np.asarray(y).astype(bool)
+        self.pos += np.bincount(idx[y], minlength=self.bins)
+        self.neg += np.bincount(idx[~y], minlength=self.bins)
+
+    def value(self):
+        n_pos, n_neg = self.pos.sum(), self.neg.sum()
+        if not n_pos or not n_neg:
+            return float("nan")
+        # positives ranked above the negatives in lower bins; ties count half
+        below = np.cumsum(self.neg) - self.neg
+        return float((self.pos * (below + 0.5 * self.neg)).sum() / (n_pos * n_neg))
+
+
+def booster_params(params):
+    """Native booster parameters for the sklearn-style ``models.xgboost`` config."""
+    params = dict(params)
+    rounds = params.pop("n_estimators", 100)
+    native = {k: v for k, v in xgb.XGBClassifier(**params).get_xgb_params().items() if v is not None}
+    # external-memory matrices only support the hist method
+    native["tree_method"] = "hist"
+    return native, rounds
+
+
+def train_out_of_core(path, chunk_rows=CHUNK_ROWS, params=None, test_size=0.2, seed=42):
+    """Train the XGBoost pipeline on ``path`` with bounded memory; returns (pipeline, holdout AUC, sample)."""
+    start = time.perf_counter()
+    if params is None:
+        params = (read_config("model").get("models") or {}).get("xgboost") or {}
+    native, rounds = booster_params({"random_state": seed, **params})
+
+    preprocessor, rows, sample = fit_preprocessor(path, chunk_rows, test_size, seed)
+    logger.info(f"Out-of-core preprocessor fitted on {rows} rows in {time.perf_counter() - start:.1f}s.")
+
+    cache_dir = tempfile.mkdtemp(prefix="xgb-extmem-")
+    try:
+        it = ChunkIter(path, preprocessor, chunk_rows, test_size, seed, os.path.join(cache_dir, "train"))
+        dtrain = xgb.ExtMemQuantileDMatrix(it, max_bin=native.get("max_bin", 256))
+        booster = xgb.train(native, dtrain, num_boost_round=rounds)
+        del dtrain
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    clf = xgb.XGBClassifier(**params)
+    clf.load_model(bytearray(booster.save_raw("json")))
+    pipeline = Pipeline([("preprocessor", preprocessor), ("clf", clf)])
+
+    auc = StreamingAUC()
+    for df, holdout in split_chunks(path, chunk_rows, test_size, seed):
+        test = df[holdout]
+        if len(test):
+            auc.update(test[TARGET].to_numpy(), pipeline.predict_proba(test)[:, 1])
+    logger.info(f"Out-of-core training finished in {time.perf_counter() - start:.1f}s: "
+                f"{rows} training rows, holdout AUC {auc.value():.4f}")
+    return pipeline, auc.value(), sample
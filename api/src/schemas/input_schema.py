@@ -37,4 +37,7 @@ class Config:
             "loan_intent": "Education",
             "product_type": "Personal Loan"
         }
-    }
\ No newline at end of file
+    }
+
+
+EXAMPLE_INPUT = Config.schema_extra["example"]
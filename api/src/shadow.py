@@ -0,0 +1,178 @@
+"""Shadow scoring: compare a candidate model with production on live traffic.
+
+With ``SHADOW_MODEL_PATH`` set, ``/predict`` offers each validated payload and
+the production result to a ShadowScorer once the response is known. The
+offer is a non-blocking put on a bounded queue and is dropped (and counted)
+when the queue is full, so the request never waits on the candidate. One
+background thread drains the queue in batches, scores them with the
+candidate's own ModelStore and records agreement and probability deltas
+(candidate minus production).
+"""
+import os
+import queue
+import random
+import threading
+
+from src.metrics import Counter, Histogram
+from src.model_store import RELOAD_INTERVAL, ModelStore
+from src.utils.logger import logger
+
+# pickled pipeline or tree-engine directory of the candidate; empty disables shadowing
+SHADOW_MODEL_PATH = os.environ.get("SHADOW_MODEL_PATH", "")
+SHADOW_QUEUE_SIZE = int(os.environ.get("SHADOW_QUEUE_SIZE", "1000"))
+SHADOW_BATCH_SIZE = int(os.environ.get("SHADOW_BATCH_SIZE", "256"))
+SHADOW_MAX_WAIT_MS = float(os.environ.get("SHADOW_MAX_WAIT_MS", "50"))
+# share of requests offered to the candidate
+SHADOW_SAMPLE_RATE = float(os.environ.get("SHADOW_SAMPLE_RATE", "1.0"))
+
+DELTA_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+SHADOW_REQUESTS = Counter(
+    "loan_shadow_requests_total", "Requests offered to the shadow model by outcome.", ("outcome",))
+SHADOW_DELTA = Histogram(
+    "loan_shadow_probability_delta", "Absolute probability difference, shadow vs production.",
+    buckets=DELTA_BUCKETS)
+
+
+class ShadowScorer:
+    """Score offered payloads with a candidate model off the request path.
+
+    ``candidate`` is a ModelStore; it is loaded by the background thread, so
+    a slow or broken candidate never delays startup or requests.
+    """
+
+    def __init__(self, candidate, queue_size=SHADOW_QUEUE_SIZE, batch_size=SHADOW_BATCH_SIZE,
+                 max_wait_ms=SHADOW_MAX_WAIT_MS, sample_rate=SHADOW_SAMPLE_RATE):
+        self.candidate = candidate
+        self.queue = queue.Queue(maxsize=max(1, queue_size))
+        self.batch_size = max(1, batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self.sample_rate = sample_rate
+        self.scored = 0
+        self.agreed = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+        self.delta_sum = 0.0
+        self.abs_delta_sum = 0.0
+        self.max_abs_delta = 0.0
+        self.compared = 0  # rows where both models returned a probability
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def offer(self, payload, result):
+        """Queue ``payload`` and its production ``result``; never blocks."""
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return False
+        try:
+            self.queue.put_nowait((payload, result))
+        except queue.Full:
+            # offer runs on many request threads; += is not atomic
+            with self._lock:
+                self.dropped += 1
+            SHADOW_REQUESTS.inc("dropped")
+            return False
+        return True
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="shadow-scorer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            try:
+                self.queue.put_nowait(None)
+            except queue.Full:
+                pass  # a full queue means the thread isn't waiting anyway
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.candidate.stop()
+
+    def _drain(self, block):
+        batch = []
+        try:
+            batch.append(self.queue.get(block, self.max_wait))
+            while len(batch) < self.batch_size:
+                batch.append(self.queue.get_nowait())
+        except queue.Empty:
+            pass
+        batch = [item for item in batch if item is not None]  # None wakes up stop()
+        if batch:
+            self.score(batch)
+        return len(batch)
+
+    def _run(self):
+        try:
+            self.candidate.start()
+        except Exception as e:
+            # _drain retries the load with every batch through candidate.current()
+            logger.error(f"Shadow model load failed: {e}")
+        while not self._stop.is_set():
+            self._drain(block=True)
+        while self._drain(block=False):
+            pass
+
+    def score(self, batch):
+        """Score ``[(payload, production_result), ...]`` and record the comparison."""
+        from src.predict import score_payloads
+
+        try:
+            results = score_payloads(self.candidate.current(), [payload for payload, _ in batch])
+        except Exception as e:
+            self.failed += len(batch)
+            SHADOW_REQUESTS.inc("failed", amount=len(batch))
+            logger.warning(f"Shadow batch of {len(batch)} failed: {e}")
+            return
+
+        agreed = 0
+        deltas = []
+        for (_, production), shadow in zip(batch, results):
+            agreed += shadow["prediction"] == production["prediction"]
+            if shadow["probability"] is not None and production["probability"] is not None:
+                deltas.append(shadow["probability"] - production["probability"])
+        with self._lock:
+            self.batches += 1
+            self.scored += len(batch)
+            self.agreed += agreed
+            self.compared += len(deltas)
+            self.delta_sum += sum(deltas)
+            self.abs_delta_sum += sum(abs(d) for d in deltas)
+            self.max_abs_delta = max([self.max_abs_delta] + [abs(d) for d in deltas])
+        SHADOW_REQUESTS.inc("agreed", amount=agreed)
+        SHADOW_REQUESTS.inc("disagreed", amount=len(batch) - agreed)
+        for delta in deltas:
+            SHADOW_DELTA.observe(abs(delta))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enabled": True,
+                "candidate_version": self.candidate.version,
+                "scored": self.scored,
+                "agreement": self.agreed / self.scored if self.scored else None,
+                "mean_delta": self.delta_sum / self.compared if self.compared else None,
+                "mean_abs_delta": self.abs_delta_sum / self.compared if self.compared else None,
+                "max_abs_delta": self.max_abs_delta,
+                "batches": self.batches,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "queued": self.queue.qsize(),
+            }
+
+    def render(self):
+        """Prometheus lines for ``/metrics``."""
+        return SHADOW_REQUESTS.render() + SHADOW_DELTA.render() + [
+            "# HELP loan_shadow_model_info Version of the shadow model.",
+            "# TYPE loan_shadow_model_info gauge",
+            f'loan_shadow_model_info{{version="{self.candidate.version or "none"}"}} 1',
+        ]
+
+
+def create_shadow_scorer(path=SHADOW_MODEL_PATH):
+    """Build the scorer from environment settings; None when disabled."""
+    if not path:
+        return None
+    return ShadowScorer(ModelStore(path=path, reload_interval=RELOAD_INTERVAL, fallback=None))
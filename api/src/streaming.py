@@ -0,0 +1,149 @@
+import asyncio
+import io
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from src.data_preprocessing import engineer_features
+from src.executor import INFERENCE_POOL, run_inference
+from src.model_store import model_store
+from src.metrics import stage_timer
+from src.predict import score_arrays
+from src.schemas.input_schema import LoanInput
+from src.utils.logger import logger
+
+STREAM_CHUNK_ROWS = int(os.environ.get("STREAM_CHUNK_ROWS", "10000"))
+# uploads above this size are spooled to a temporary file instead of memory
+STREAM_SPOOL_MAX_BYTES = int(os.environ.get("STREAM_SPOOL_MAX_BYTES", str(16 * 1024 * 1024)))
+
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+ID_COLS = ["customer_id"]
+
+
+def stream_format(content_type):
+    """Map a request Content-Type to "csv" / "ndjson", or None if unsupported."""
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    if content_type in ("text/csv", "application/csv"):
+        return "csv"
+    if content_type in ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/json-lines"):
+        return "ndjson"
+    return None
+
+
+def _field_rules():
+    rules = []
+    for name, field in LoanInput.model_fields.items():
+        bounds = {}
+        for meta in field.metadata:
+            for attr in ("ge", "le"):
+                if getattr(meta, attr, None) is not None:
+                    bounds[attr] = getattr(meta, attr)
+        rules.append((name, field.annotation, bounds))
+    return rules
+
+
+FIELD_RULES = _field_rules()
+
+
+def validate_chunk(df: pd.DataFrame):
+    """Vectorized LoanInput checks. Returns (coerced frame, per-row error or None)."""
+    errors = pd.Series(None, index=df.index, dtype=object)
+
+    def flag(mask, message):
+        mask = mask & errors.isna()
+        errors[mask] = message
+
+    for name, annotation, bounds in FIELD_RULES:
+        if name not in df.columns:
+            flag(pd.Series(True, index=df.index), f"{name}: field required")
+            continue
+        if annotation is str:
+            flag(df[name].isna(), f"{name}: field required")
+            df[name] = df[name].astype(str)
+            continue
+        values = pd.to_numeric(df[name], errors="coerce")
+        flag(values.isna(), f"{name}: invalid number")
+        if annotation is int:
+            flag(values.notna() & (values != np.floor(values)), f"{name}: must be an integer")
+        if "ge" in bounds:
+            flag(values < bounds["ge"], f"{name}: must be >= {bounds['ge']}")
+        if "le" in bounds:
+            flag(values > bounds["le"], f"{name}: must be <= {bounds['le']}")
+        df[name] = values
+    return df, errors
+
+
+def score_chunk(pipeline, df: pd.DataFrame) -> pd.DataFrame:
+    """Validate and score one chunk; invalid rows get an error instead of a score."""
+    with stage_timer("validation"):
+        df, errors = validate_chunk(df)
+    out = pd.DataFrame({"row": df.index})
+    for col in ID_COLS:
+        if col in df.columns:
+            out[col] = df[col].to_numpy()
+    out["prediction"] = pd.array([None] * len(df), dtype="Int64")
+    out["probability"] = np.nan
+    out["error"] = errors.to_numpy()
+
+    valid = errors.isna().to_numpy()
+    if valid.any():
+        with stage_timer("engineer_features"):
+            features = engineer_features(df[valid])
+        preds, probs = score_arrays(pipeline, features)
+        out.loc[valid, "prediction"] = preds.astype(int)
+        if probs is not None:
+            out.loc[valid, "probability"] = probs
+    return out
+
+
+def format_chunk(out: pd.DataFrame, fmt: str, header: bool) -> bytes:
+    if fmt == "csv":
+        return out.to_csv(index=False, header=header).encode()
+    records = out.astype(object).where(out.notna(), None).to_dict(orient="records")
+    return "".join(json.dumps(r) + "\n" for r in records).encode()
+
+
+def _read_chunks(fileobj, fmt, chunk_rows):
+    if fmt == "csv":
+        return pd.read_csv(fileobj, chunksize=chunk_rows)
+    text = io.TextIOWrapper(fileobj, encoding="utf-8")
+    return pd.read_json(text, lines=True, chunksize=chunk_rows, dtype=False)
+
+
+def score_and_format(chunk: pd.DataFrame, fmt: str, header: bool, pipeline=None) -> bytes:
+    """Score and encode one chunk; runs on the inference executor.
+
+    ``pipeline`` defaults to the resident model, which is what process-pool
+    workers use (they keep their own copy).
+    """
+    pipeline = pipeline if pipeline is not None else model_store.get()
+    return format_chunk(score_chunk(pipeline, chunk), fmt, header)
+
+
+async def stream_scores(fileobj, fmt, chunk_rows=STREAM_CHUNK_ROWS):
+    """Yield encoded result chunks for an uploaded CSV/NDJSON file, chunk by chunk.
+
+    Only ``chunk_rows`` rows are materialised at a time, so memory stays
+    constant regardless of the file size. Parsing the spooled upload runs in
+    the default threadpool and scoring on the dedicated inference executor,
+    so streams share the executor's sizing with the other endpoints. Closes
+    ``fileobj`` when done.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        # one model for the whole stream, even across a hot reload; a process
+        # pool can't receive the pipeline, so its workers use their own
+        pipeline = await run_inference(model_store.get) if INFERENCE_POOL == "thread" else None
+        reader = await loop.run_in_executor(None, _read_chunks, fileobj, fmt, chunk_rows)
+        rows = 0
+        while True:
+            chunk = await loop.run_in_executor(None, next, reader, None)
+            if chunk is None:
+                break
+            chunk.index = pd.RangeIndex(rows, rows + len(chunk))
+            yield await run_inference(score_and_format, chunk, fmt, rows == 0, pipeline)
+            rows += len(chunk)
+        logger.info(f"Streamed scores for {rows} rows.")
+    finally:
+        fileobj.close()
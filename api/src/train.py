@@ -1,108 +1,198 @@
 import os
-import joblib
+import time
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
 from sklearn.pipeline import Pipeline
 from sklearn.linear_model import LogisticRegression
 from sklearn.ensemble import RandomForestClassifier
 from xgboost import XGBClassifier
-from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report, roc_auc_score
-from data_preprocessing import create_preprocessor, engineer_features
+from src.data_preprocessing import RAW_DTYPES, TARGET
+from src.feature_cache import load_or_build, open_features
+from src.incremental import save_reference
+from src.ingest import PROCESSED_DATA_PATH, is_dataset, read_dataset
+from src.model_store import ENGINE_PATH, save_pipeline
+from src.tree_engine import export_engine
+from src.utils.config import read_config
 from src.utils.logger import logger
 from src.utils.exception import CustomException
 
 MODEL_PATH = "models/loan_model.pkl"
+RAW_DATA_PATH = "data/raw/Loan_approval_data_2025.csv"
 PREPROCESSOR_PATH = "models/preprocessor.joblib"
+# candidate models fitted concurrently; 0 means one process per candidate (capped at the core count)
+TRAIN_WORKERS = int(os.environ.get("TRAIN_WORKERS", "0"))
+
 
 
+def data_path():
+    """The ingested Parquet dataset (``python -m src.ingest``) if present, else the raw CSV."""
+    return PROCESSED_DATA_PATH if is_dataset(PROCESSED_DATA_PATH) else RAW_DATA_PATH
 
-def load_data(path="data/raw/Loan_approval_data_2025.csv"):
+
+def load_data(path=None):
+    path = path or data_path()
+    if is_dataset(path) or path.endswith(".parquet"):
+        # compact dtypes; only the columns the model uses are decoded
+        return read_dataset(path, columns=list(RAW_DTYPES))
     df = pd.read_csv(path)
     # Drop any one-hot dummies if present in raw file
     dummy_prefixes = ["occupation_status_", "product_type_", "loan_intent_"]
     drop_cols = [c for c in df.columns if any(c.startswith(p) for p in dummy_prefixes)]
-    df.drop('customer_id',axis=1,inplace=True)
+    df.drop('customer_id',axis=1,inplace=True,errors='ignore')
     df = df.drop(columns=drop_cols, errors="ignore")
     return df
 
 
 
 
-def train(save_artifacts: bool = True):
+ESTIMATORS = {
+    "log_reg": LogisticRegression,
+    "random_forest": RandomForestClassifier,
+    "xgboost": XGBClassifier,
+}
+# candidates whose fit is single-threaded regardless of n_jobs
+SERIAL_CANDIDATES = {"log_reg"}
+
+
+def build_candidates(n_jobs=None, params=None):
+    """Unfitted candidate classifiers.
+
+    ``params`` maps name -> estimator arguments and defaults to the ``models``
+    section of config/model.yaml; ``n_jobs`` maps name -> thread budget.
+    """
+    n_jobs = n_jobs or {}
+    if params is None:
+        params = read_config("model").get("models") or {}
+    candidates = {}
+    for name, estimator in ESTIMATORS.items():
+        kwargs = dict(params.get(name) or {})
+        if name in n_jobs and name not in SERIAL_CANDIDATES:
+            kwargs["n_jobs"] = n_jobs[name]
+        candidates[name] = estimator(**kwargs)
+    return candidates
+
+
+def thread_budget(names, cpus):
+    """Give serial candidates one core each and split the rest among the others."""
+    parallel = [n for n in names if n not in SERIAL_CANDIDATES]
+    spare = max(cpus - (len(names) - len(parallel)), len(parallel))
+    return {name: max(1, spare // len(parallel)) for name in parallel}
+
+
+def fit_candidate(name, clf, features):
+    """Fit one candidate on the cached matrices; returns (name, pipeline, auc, preds, seconds).
+
+    ``features`` is a FeatureSet or the path of a feature-cache entry (pool
+    workers memory-map the matrices instead of receiving a pickled copy).
+    The fitted preprocessor from the cache is put in front of the classifier,
+    which is what ``Pipeline.fit`` on the engineered frame would produce.
+    """
+    start = time.perf_counter()
+    if isinstance(features, str):
+        features = open_features(features)
+    clf.fit(features.X_train, features.y_train)
+    pipeline = Pipeline([
+        ("preprocessor", features.preprocessor),
+        ("clf", clf)
+    ])
+    preds = clf.predict(features.X_test)
+
+    try:
+        prob = clf.predict_proba(features.X_test)[:, 1]
+        auc = roc_auc_score(features.y_test, prob)
+    except Exception:
+        auc = 0
+    return name, pipeline, auc, preds, time.perf_counter() - start
+
+
+def fit_candidates(features, workers=TRAIN_WORKERS, params=None):
+    """Fit every candidate, concurrently in a process pool when ``workers`` > 1."""
+    cpus = os.cpu_count() or 1
+    names = list(ESTIMATORS)
+    workers = min(workers or cpus, len(names))
+
+    if workers <= 1:
+        # one after another, so each candidate may use every core
+        candidates = build_candidates(dict.fromkeys(names, cpus), params)
+        return [fit_candidate(name, clf, features) for name, clf in candidates.items()]
+    candidates = build_candidates(thread_budget(names, cpus), params)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(fit_candidate, name, clf, features.path) for name, clf in candidates.items()]
+        return [future.result() for future in futures]
+
+
+def train(save_artifacts: bool = True, workers=TRAIN_WORKERS, search=None):
+    """Fit the candidates and save the best one; ``search`` tunes XGBoost first
+    (defaults to ``search.enabled`` in config/model.yaml)."""
     try:
         os.makedirs("models", exist_ok=True)
-        df = load_data("data/raw/Loan_approval_data_2025.csv")
-        df = engineer_features(df)
-        target = "loan_status"
-        X = df.drop(columns=[target])
-        y = df[target]
-
-
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
-        
-        preprocessor = create_preprocessor()
-    
-        models = {
-        "log_reg": LogisticRegression(max_iter=500),
-        "random_forest": RandomForestClassifier(n_estimators=200, random_state=42),
-        "xgboost": XGBClassifier(
-                    eval_metric="logloss",
-                    n_estimators=300,
-                    learning_rate=0.05,
-                    max_depth=5
-            )
-        } 
-
-        best_model=None
-        best_auc=-1
-
-        for name, clf in models.items():
-            logger.info(f"Training model: {name}")
-            pipeline = Pipeline([
-            ("preprocessor", preprocessor),
-            ("clf", clf)
-            ])
-
-            pipeline.fit(X_train, y_train)
-            preds = pipeline.predict(X_test)
-
-
-            try:
-                prob = pipeline.predict_proba(X_test)[:,1]
-                auc = roc_auc_score(y_test, prob)
-            except:
-                auc = 0
-
-
-            logger.info(f"Model: {name} | AUC: {auc}")
+        # engineered + preprocessed matrices are cached by data hash, split and config
+        features = load_or_build(data_path(), load_data, seed=42, test_size=0.2)
+
+        config = read_config("model")
+        params = dict(config.get("models") or {})
+        if search is None:
+            search = bool((config.get("search") or {}).get("enabled"))
+        if search:
+            from src.tuning import search as run_search
+
+            best = run_search(features, config.get("search") or {}, params.get("xgboost"))
+            params["xgboost"] = {**(params.get("xgboost") or {}), **best.params,
+                                 "n_estimators": best.n_estimators}
+
+        start = time.perf_counter()
+        results = fit_candidates(features, workers, params)
+        logger.info(f"Trained {len(results)} candidates in {time.perf_counter() - start:.1f}s.")
+
+        best_model = None
+        best_auc = -1
+        best_preds = None
+        for name, pipeline, auc, preds, seconds in results:
+            logger.info(f"Model: {name} | AUC: {auc} | fit+eval {seconds:.1f}s")
             if auc > best_auc:
-                best_auc = auc
-                best_model = pipeline
+                best_auc, best_model, best_preds = auc, pipeline, preds
 
 
-        logger.info(f"Best model selected with AUC: {best_auc}")       
+        logger.info(f"Best model selected with AUC: {best_auc}")
 
+        # the winner was fitted on the same split already, no refit needed
         pipeline = best_model
-        pipeline.fit(X_train, y_train)
         logger.info("Model training completed.")
+        logger.info("Evaluation:" + classification_report(features.y_test, best_preds))
+
 
+        if save_artifacts:
+            save_model(pipeline, features.test_frame.assign(**{TARGET: features.y_test}))
 
-        preds = pipeline.predict(X_test)
-        logger.info("Evaluation:" + classification_report(y_test, preds))
 
+    except Exception as e:
+        raise CustomException(e, str(e))
 
-        try:
-            prob = pipeline.predict_proba(X_test)[:, 1]
-            logger.info(f"ROC AUC: {roc_auc_score(y_test, prob)}")
-        except:
-            logger.warning("Model has no predict_proba method.")
 
+def save_model(pipeline, holdout):
+    """Save the pipeline, its labelled ``holdout`` (the reference that gates
+    incremental updates) and the tree engine, verified on ``holdout``."""
+    save_pipeline(pipeline, MODEL_PATH)
+    save_reference(holdout)
+    try:
+        export_engine(pipeline, ENGINE_PATH, holdout)
+    except CustomException as e:
+        logger.warning(f"Tree engine not exported, serving the pickle: {e}")
+    logger.info(f"Saved trained pipeline to {MODEL_PATH}")
 
-        if save_artifacts:
-            joblib.dump(pipeline, MODEL_PATH)
-        logger.info(f"Saved trained pipeline to {MODEL_PATH}")
 
+def train_large(path=None, chunk_rows=None, save_artifacts: bool = True):
+    """Train XGBoost out of core on a file larger than RAM (see src.out_of_core)."""
+    from src.out_of_core import CHUNK_ROWS, train_out_of_core
 
+    try:
+        os.makedirs("models", exist_ok=True)
+        pipeline, auc, sample = train_out_of_core(path or data_path(), chunk_rows or CHUNK_ROWS)
+        if save_artifacts:
+            save_model(pipeline, sample)
+        return pipeline, auc
     except Exception as e:
         raise CustomException(e, str(e))
 
@@ -110,4 +200,17 @@ def train(save_artifacts: bool = True):
 
 
 if __name__ == "__main__":
-    train()
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Train the loan approval model.")
+    parser.add_argument("--search", action="store_true", default=None,
+                        help="tune XGBoost with the successive-halving search before training")
+    parser.add_argument("--out-of-core", action="store_true",
+                        help="stream the data in chunks and train XGBoost with bounded memory")
+    parser.add_argument("--data", default=None, help="CSV/Parquet file or dataset for --out-of-core")
+    parser.add_argument("--chunk-rows", type=int, default=None)
+    args = parser.parse_args()
+    if args.out_of_core:
+        train_large(args.data, args.chunk_rows)
+    else:
+        train(search=args.search)
\ No newline at end of file
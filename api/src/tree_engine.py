@@ -0,0 +1,339 @@
+"""Flat NumPy inference engine for the trained tree ensembles.
+
+    python -m src.tree_engine [--model models/loan_model.pkl] [--output models/loan_model_engine]
+
+A fitted XGBClassifier or RandomForestClassifier is flattened into contiguous
+per-node arrays (feature, threshold, child, missing direction, leaf value)
+that are evaluated level by level for a whole batch with NumPy gathers.
+Together with the preprocessor lookup tables the engine is saved as a
+directory of ``.npy`` files plus ``meta.json``; loading it memory-maps the
+arrays and needs neither sklearn nor xgboost objects to be unpickled.
+
+Every export is checked against the source pipeline's ``predict_proba``.
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+from src.data_preprocessing import feature_plan
+from src.fast_inference import CompiledPipeline, CompiledPreprocessor
+from src.utils.logger import logger
+from src.utils.exception import CustomException
+
+ENGINE_META = "meta.json"
+# rows x trees evaluated per block, bounds the scratch arrays to a few MB
+BLOCK_ELEMENTS = 1 << 18
+
+
+def _float32_at_most(threshold):
+    """Largest float32 <= ``threshold``, so ``x <= t`` is exact on float32 inputs."""
+    threshold = np.asarray(threshold, dtype=np.float64)
+    t32 = threshold.astype(np.float32)
+    over = t32.astype(np.float64) > threshold
+    t32[over] = np.nextafter(t32[over], np.float32(-np.inf))
+    return t32
+
+
+class FlatForest:
+    """A binary-classification tree ensemble stored as flat node arrays.
+
+    Nodes are renumbered so that the two children of a node are adjacent:
+    the next node is ``left[node] + (x > threshold[node])``. Leaves point to
+    themselves with a +inf threshold, so walking ``depth`` levels lands every
+    row on a leaf without per-tree branching. ``aggregate`` is "mean" (random
+    forest: average leaf probabilities) or "logistic" (boosting: sigmoid of
+    ``base_margin`` + summed leaf values).
+    """
+
+    ARRAYS = ("feature", "threshold", "left", "missing_left", "value", "roots")
+
+    def __init__(self, feature, threshold, left, missing_left, value, roots,
+                 depth, aggregate, base_margin=0.0, classes=(0, 1)):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.missing_left = missing_left
+        self.value = value
+        self.roots = roots
+        self.depth = int(depth)
+        self.aggregate = aggregate
+        self.base_margin = float(base_margin)
+        self.classes_ = np.asarray(classes)
+
+    @classmethod
+    def from_trees(cls, trees, aggregate, base_margin=0.0, classes=(0, 1)):
+        """Concatenate per-tree node arrays in sibling-adjacent order.
+
+        Each tree is a dict of per-node arrays (feature, threshold, left,
+        right, missing_left, value) in its own numbering, with ``left < 0``
+        marking leaves.
+        """
+        arrays = {name: [] for name in cls.ARRAYS if name != "roots"}
+        roots, offset, depth = [], 0, 0
+        for tree in trees:
+            left, right = tree["left"], tree["right"]
+            # breadth-first renumbering, children appended as a pair
+            order, level, new_left = [0], [0], {}
+            for i, node in enumerate(order):
+                if left[node] >= 0:
+                    new_left[node] = len(order)
+                    order.extend((left[node], right[node]))
+                    level.extend((level[i] + 1, level[i] + 1))
+            order = np.asarray(order)
+            leaf = left[order] < 0
+            children = np.asarray([new_left.get(node, i) for i, node in enumerate(order)])
+            arrays["feature"].append(np.where(leaf, 0, tree["feature"][order]).astype(np.int32))
+            arrays["threshold"].append(np.where(leaf, np.inf, tree["threshold"][order]).astype(np.float32))
+            arrays["left"].append((children + offset).astype(np.int32))
+            arrays["missing_left"].append(leaf | tree["missing_left"][order].astype(bool))
+            arrays["value"].append(tree["value"][order].astype(np.float64))
+            roots.append(offset)
+            offset += len(order)
+            depth = max(depth, max(level))
+        return cls(**{k: np.concatenate(v) for k, v in arrays.items()},
+                   roots=np.asarray(roots, dtype=np.int32), depth=depth,
+                   aggregate=aggregate, base_margin=base_margin, classes=classes)
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    def apply(self, X) -> np.ndarray:
+        """Return the (n_rows, n_trees) global leaf index reached by every row."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n, n_features = X.shape
+        leaves = np.empty((n, self.n_trees), dtype=np.int32)
+        block = max(1, BLOCK_ELEMENTS // max(self.n_trees, 1))
+        for start in range(0, n, block):
+            xb = X[start:start + block]
+            flat = xb.ravel()
+            row_base = (np.arange(len(xb), dtype=np.int32) * n_features)[:, None]
+            has_missing = np.isnan(flat).any()
+            node = np.broadcast_to(self.roots, (len(xb), self.n_trees))
+            for _ in range(self.depth):
+                x = flat.take(row_base + self.feature.take(node))
+                go_right = x > self.threshold.take(node)
+                if has_missing:
+                    go_right = np.where(np.isnan(x), ~self.missing_left.take(node), go_right)
+                node = self.left.take(node) + go_right
+            leaves[start:start + len(xb)] = node
+        return leaves
+
+    def predict_positive(self, X) -> np.ndarray:
+        """Probability of ``classes_[1]`` for every row of the transformed matrix."""
+        values = self.value[self.apply(X)]
+        if self.aggregate == "mean":
+            return values.mean(axis=1)
+        margin = values.sum(axis=1) + self.base_margin
+        return 1.0 / (1.0 + np.exp(-margin))
+
+    def predict_proba(self, X) -> np.ndarray:
+        positive = self.predict_positive(X)
+        return np.column_stack([1.0 - positive, positive])
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[(self.predict_positive(X) > 0.5).astype(np.intp)]
+
+
+def _sklearn_forest(clf):
+    trees = []
+    for estimator in clf.estimators_:
+        tree = estimator.tree_
+        value = tree.value[:, 0, :]
+        value = value / value.sum(axis=1, keepdims=True)
+        missing_left = getattr(tree, "missing_go_to_left", np.zeros(tree.node_count, dtype=bool))
+        trees.append({
+            "feature": tree.feature,
+            "threshold": _float32_at_most(tree.threshold),
+            "left": tree.children_left,
+            "right": tree.children_right,
+            "missing_left": np.asarray(missing_left),
+            "value": value[:, 1],
+        })
+    return FlatForest.from_trees(trees, "mean", classes=clf.classes_)
+
+
+def _xgboost_forest(clf):
+    booster = clf.get_booster()
+    learner = json.loads(booster.save_raw("json"))["learner"]
+    objective = learner["objective"]["name"]
+    if objective != "binary:logistic":
+        raise ValueError(f"Unsupported XGBoost objective '{objective}'")
+    gbm = learner["gradient_booster"]
+    if gbm["name"] != "gbtree":
+        raise ValueError(f"Unsupported XGBoost booster '{gbm['name']}'")
+    model = gbm["model"]
+    n_trees = len(model["trees"])
+    # predict_proba stops at the early-stopping best iteration, if there is one
+    best_iteration = booster.attr("best_iteration")
+    if best_iteration is not None:
+        n_trees = model["iteration_indptr"][int(best_iteration) + 1]
+
+    trees = []
+    for tree in model["trees"][:n_trees]:
+        if any(tree["split_type"]):
+            raise ValueError("Categorical XGBoost splits are not supported")
+        left = np.asarray(tree["left_children"], dtype=np.int64)
+        conditions = np.asarray(tree["split_conditions"], dtype=np.float32)
+        trees.append({
+            "feature": np.asarray(tree["split_indices"], dtype=np.int64),
+            # xgboost goes left on x < t; for float32 x that is x <= nextafter(t, -inf)
+            "threshold": np.nextafter(conditions, np.float32(-np.inf)),
+            "left": left,
+            "right": np.asarray(tree["right_children"], dtype=np.int64),
+            "missing_left": np.asarray(tree["default_left"], dtype=bool),
+            "value": np.where(left < 0, conditions, 0.0),
+        })
+    base_score = float(str(learner["learner_model_param"]["base_score"]).strip("[]"))
+    base_margin = np.log(base_score / (1.0 - base_score))
+    return FlatForest.from_trees(trees, "logistic", base_margin=base_margin, classes=clf.classes_)
+
+
+def flatten_ensemble(clf) -> FlatForest:
+    """Flatten a fitted binary XGBClassifier or sklearn forest classifier."""
+    if len(getattr(clf, "classes_", ())) != 2:
+        raise ValueError("Only binary classifiers are supported")
+    if hasattr(clf, "get_booster"):
+        return _xgboost_forest(clf)
+    from sklearn.ensemble._forest import ForestClassifier
+
+    if isinstance(clf, ForestClassifier):
+        return _sklearn_forest(clf)
+    raise ValueError(f"Unsupported classifier: {type(clf).__name__}")
+
+
+class EnginePipeline(CompiledPipeline):
+    """Compiled preprocessor + FlatForest, usable wherever a pipeline is scored.
+
+    ``predict_one`` / ``predict_many`` come from CompiledPipeline;
+    ``predict_proba`` / ``predict`` take an engineered DataFrame so
+    ``predict.score_arrays`` and the streaming paths work unchanged.
+    """
+
+    def __init__(self, preprocessor: CompiledPreprocessor, forest: FlatForest):
+        self.preprocessor = preprocessor
+        self.plan = feature_plan(preprocessor.input_columns)
+        self.clf = forest
+        self.has_proba = True
+
+    @property
+    def classes_(self):
+        return self.clf.classes_
+
+    def predict_proba(self, df) -> np.ndarray:
+        return self.clf.predict_proba(self.preprocessor.transform_frame(df))
+
+    def predict(self, df) -> np.ndarray:
+        return self.clf.predict(self.preprocessor.transform_frame(df))
+
+
+def compile_engine(pipeline) -> EnginePipeline:
+    """Build an EnginePipeline from a fitted ``Pipeline([preprocessor, clf])``."""
+    compiled = CompiledPipeline(pipeline)
+    return EnginePipeline(compiled.preprocessor, flatten_ensemble(compiled.clf))
+
+
+def verify_engine(engine, pipeline, df, tolerance=1e-5) -> float:
+    """Compare probabilities with ``pipeline.predict_proba`` on ``df``; returns the max error."""
+    expected = pipeline.predict_proba(df)[:, 1]
+    actual = engine.predict_proba(df)[:, 1]
+    error = float(np.max(np.abs(expected - actual))) if len(df) else 0.0
+    if error > tolerance:
+        raise ValueError(f"Engine probabilities differ from predict_proba by {error:.3g} (> {tolerance:g})")
+    return error
+
+
+def save_engine(engine: EnginePipeline, directory):
+    """Write the engine as ``<name>.npy`` arrays + meta.json and swap it in atomically."""
+    forest = engine.clf
+    digest = hashlib.sha256()
+    tmp_dir = f"{directory}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    for name in FlatForest.ARRAYS:
+        array = np.ascontiguousarray(getattr(forest, name))
+        digest.update(array.tobytes())
+        np.save(os.path.join(tmp_dir, f"{name}.npy"), array)
+    meta = {
+        "aggregate": forest.aggregate,
+        "base_margin": forest.base_margin,
+        "depth": forest.depth,
+        "classes": forest.classes_.tolist(),
+        "preprocessor": engine.preprocessor.to_dict(),
+        "digest": digest.hexdigest(),
+    }
+    with open(os.path.join(tmp_dir, ENGINE_META), "w") as f:
+        json.dump(meta, f)
+
+    # a new directory inode, so readers with the old arrays mapped keep them
+    old_dir = f"{directory}.old-{os.getpid()}"
+    if os.path.exists(directory):
+        os.replace(directory, old_dir)
+    os.replace(tmp_dir, directory)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+
+def load_engine(directory, mmap_mode="r") -> EnginePipeline:
+    """Load a saved engine; arrays are memory-mapped unless ``mmap_mode`` is None."""
+    with open(os.path.join(directory, ENGINE_META)) as f:
+        meta = json.load(f)
+    arrays = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode)
+              for name in FlatForest.ARRAYS}
+    forest = FlatForest(**arrays, depth=meta["depth"], aggregate=meta["aggregate"],
+                        base_margin=meta["base_margin"], classes=meta["classes"])
+    return EnginePipeline(CompiledPreprocessor.from_dict(meta["preprocessor"]), forest)
+
+
+def remove_engine(directory):
+    """Take a saved engine out of service; readers that have it mapped keep their arrays."""
+    if not os.path.exists(directory):
+        return
+    old_dir = f"{directory}.old-{os.getpid()}"
+    os.replace(directory, old_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+
+def export_engine(pipeline, directory, verify_df, tolerance=1e-5) -> EnginePipeline:
+    """Compile ``pipeline``, verify it on ``verify_df`` and save it to ``directory``.
+
+    If the export fails, an engine already at ``directory`` is removed: it was
+    built from an earlier model, and ModelStore falls back to the pickle.
+    """
+    try:
+        engine = compile_engine(pipeline)
+        error = verify_engine(engine, pipeline, verify_df, tolerance)
+        save_engine(engine, directory)
+    except Exception as e:
+        remove_engine(directory)
+        raise CustomException(e, f"Could not export tree engine to {directory}")
+    logger.info(f"Exported {engine.clf.n_trees}-tree engine to {directory} "
+                f"(max probability error {error:.2g} on {len(verify_df)} rows).")
+    return engine
+
+
+def main(argv=None):
+    import joblib
+    import pandas as pd
+    from src.data_preprocessing import engineer_features
+    from src.model_store import ENGINE_PATH, MODEL_PATH
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--output", default=ENGINE_PATH)
+    parser.add_argument("--data", default="data/raw/Loan_approval_data_2025.csv",
+                        help="labelled CSV used to verify the engine against predict_proba")
+    parser.add_argument("--verify-rows", type=int, default=10_000)
+    parser.add_argument("--tolerance", type=float, default=1e-5)
+    args = parser.parse_args(argv)
+
+    pipeline = joblib.load(args.model)
+    df = engineer_features(pd.read_csv(args.data, nrows=args.verify_rows))
+    engine = export_engine(pipeline, args.output, df, args.tolerance)
+    print(f"exported {engine.clf.n_trees} trees ({len(engine.clf.feature):,} nodes) to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
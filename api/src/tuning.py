@@ -0,0 +1,225 @@
+"""Successive-halving search over the XGBoost hyperparameters.
+
+The search is configured by the ``search`` section of ``config/model.yaml``:
+
+- ``n_configs`` configurations are sampled from ``space``;
+- every rung trains the surviving configurations for up to ``rounds`` boosting
+  rounds (``min_resource``, then times ``eta`` up to ``max_resource``), with
+  early stopping on a validation split of the training matrices;
+- the best ``1/eta`` of each rung are promoted to the next one.
+
+Trials run concurrently in a process pool. Each finished trial is appended to
+a JSON-lines store in ``store_dir``. Sampling is seeded, so rerunning an
+interrupted search regenerates the same trials and reuses the stored results
+instead of refitting them. When ``budget_seconds`` runs out, queued trials are
+dropped and the best trial so far wins.
+
+    cd api && python -m src.tuning
+"""
+import hashlib
+import json
+import math
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, TimeoutError, as_completed
+
+import numpy as np
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import train_test_split
+from xgboost import XGBClassifier
+from src.feature_cache import open_features
+from src.utils.config import read_config
+from src.utils.exception import CustomException
+from src.utils.logger import logger
+
+SEARCH_DEFAULTS = {
+    "seed": 42,
+    "n_configs": 27,
+    "min_resource": 50,
+    "max_resource": 1350,
+    "eta": 3,
+    "early_stopping_rounds": 25,
+    "validation_size": 0.2,
+    "budget_seconds": 900,
+    "workers": 0,
+    "store_dir": "models/search",
+    "space": {},
+}
+# estimator arguments owned by the search itself
+SEARCH_OWNED = {"n_estimators", "n_jobs", "eval_metric", "early_stopping_rounds", "random_state"}
+
+SearchResult = namedtuple("SearchResult", ["params", "n_estimators", "score", "trials", "fitted", "seconds"])
+
+
+def sample_value(spec, rng):
+    """Draw one value: a list is a set of choices, a dict a (log-)uniform int/float range."""
+    if isinstance(spec, list):
+        return spec[int(rng.integers(len(spec)))]
+    low, high = spec["low"], spec["high"]
+    if spec.get("type") == "int" and not spec.get("log"):
+        return int(rng.integers(low, high + 1))
+    if spec.get("log"):
+        value = math.exp(rng.uniform(math.log(low), math.log(high)))
+    else:
+        value = rng.uniform(low, high)
+    return int(round(value)) if spec.get("type") == "int" else round(float(value), 6)
+
+
+def sample_configs(space, n, seed):
+    rng = np.random.default_rng(seed)
+    return [{name: sample_value(spec, rng) for name, spec in space.items()} for _ in range(n)]
+
+
+def rungs(min_resource, max_resource, eta):
+    """Boosting rounds per rung, e.g. 50, 150, 450, 1350."""
+    resources = []
+    rounds = min_resource
+    while rounds < max_resource:
+        resources.append(int(rounds))
+        rounds *= eta
+    return resources + [int(max_resource)]
+
+
+class TrialStore:
+    """Append-only JSON-lines record of finished trials."""
+
+    def __init__(self, path):
+        self.path = path
+        self.trials = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line of an interrupted write
+                    self.trials[record["key"]] = record
+
+    @staticmethod
+    def key(**spec):
+        return hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:16]
+
+    def get(self, key):
+        return self.trials.get(key)
+
+    def add(self, record):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.trials[record["key"]] = record
+
+
+def run_trial(features, params, rounds, early_stopping_rounds, validation_size, seed, n_jobs):
+    """Fit one configuration for up to ``rounds`` rounds; returns its validation AUC and best iteration."""
+    start = time.perf_counter()
+    if isinstance(features, str):
+        features = open_features(features)
+    X_fit, X_val, y_fit, y_val = train_test_split(
+        features.X_train, features.y_train, test_size=validation_size, random_state=seed,
+        stratify=features.y_train)
+    clf = XGBClassifier(**params, n_estimators=rounds, early_stopping_rounds=early_stopping_rounds,
+                        eval_metric="auc", random_state=seed, n_jobs=n_jobs)
+    clf.fit(X_fit, y_fit, eval_set=[(X_val, y_val)], verbose=False)
+    # predict_proba stops at the best iteration after early stopping
+    score = roc_auc_score(y_val, clf.predict_proba(X_val)[:, 1])
+    return {"score": float(score), "best_iteration": int(clf.best_iteration),
+            "seconds": time.perf_counter() - start}
+
+
+def _run_trials(pool, features, jobs, deadline, **fit_args):
+    """Yield (job, result) as trials finish; trials not started by ``deadline`` are dropped."""
+    if pool is None:
+        for job in jobs:
+            if time.perf_counter() >= deadline:
+                return
+            yield job, run_trial(features, job["params"], job["rounds"], **fit_args)
+        return
+    futures = {pool.submit(run_trial, features.path, job["params"], job["rounds"], **fit_args): job
+               for job in jobs}
+    try:
+        for future in as_completed(futures, timeout=max(0, deadline - time.perf_counter())):
+            yield futures[future], future.result()
+    except TimeoutError:
+        # running trials are kept, queued ones are dropped
+        running = [f for f in futures if not f.cancel()]
+        for future in as_completed(running):
+            yield futures[future], future.result()
+
+
+def search(features, config=None, base_params=None, workers=None) -> SearchResult:
+    """Run (or resume) the successive-halving search on a feature-cache entry."""
+    start = time.perf_counter()
+    model_config = read_config("model")
+    if config is None:
+        config = model_config.get("search") or {}
+    config = {**SEARCH_DEFAULTS, **config}
+    if not config["space"]:
+        raise CustomException(ValueError("empty search space"), "config/model.yaml search.space")
+    if base_params is None:
+        base_params = (model_config.get("models") or {}).get("xgboost") or {}
+    base_params = {k: v for k, v in base_params.items() if k not in SEARCH_OWNED}
+
+    deadline = start + config["budget_seconds"]
+    fit_args = {
+        "early_stopping_rounds": config["early_stopping_rounds"],
+        "validation_size": config["validation_size"],
+        "seed": config["seed"],
+    }
+    data_key = os.path.basename(os.path.normpath(features.path))
+    store = TrialStore(os.path.join(config["store_dir"], f"{data_key}.jsonl"))
+
+    configs = sample_configs(config["space"], config["n_configs"], config["seed"])
+    cpus = os.cpu_count() or 1
+    workers = min(workers or config["workers"] or cpus, len(configs))
+    n_jobs = max(1, cpus // workers)
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+
+    finished, fitted = [], 0
+    try:
+        survivors = configs
+        for rounds in rungs(config["min_resource"], config["max_resource"], config["eta"]):
+            rung, jobs, sampled_by_key = [], [], {}
+            for sampled in survivors:
+                params = {**base_params, **sampled}
+                key = store.key(data=data_key, params=params, rounds=rounds, **fit_args)
+                sampled_by_key[key] = sampled
+                record = store.get(key)
+                if record is None:
+                    jobs.append({"key": key, "params": params, "rounds": rounds})
+                else:
+                    rung.append((record, sampled))
+            for job, result in _run_trials(pool, features, jobs, deadline, n_jobs=n_jobs, **fit_args):
+                record = {**job, **result}
+                store.add(record)
+                rung.append((record, sampled_by_key[job["key"]]))
+                fitted += 1
+            finished.extend(record for record, _ in rung)
+            logger.info(f"Search rung {rounds} rounds: {len(rung)}/{len(survivors)} trials, "
+                        f"best AUC {max((r['score'] for r, _ in rung), default=float('nan')):.4f}")
+            if len(rung) < len(survivors):
+                logger.warning(f"Search budget of {config['budget_seconds']}s exhausted.")
+                break
+            rung.sort(key=lambda item: item[0]["score"], reverse=True)
+            survivors = [sampled for _, sampled in rung[:max(1, len(rung) // config["eta"])]]
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    if not finished:
+        raise CustomException(TimeoutError("no trial finished"), "search budget too small")
+    best = max(finished, key=lambda r: r["score"])
+    result = SearchResult(params=best["params"], n_estimators=best["best_iteration"] + 1, score=best["score"],
+                          trials=len(finished), fitted=fitted, seconds=time.perf_counter() - start)
+    logger.info(f"Search finished in {result.seconds:.1f}s: {result.trials} trials ({fitted} fitted), "
+                f"best validation AUC {result.score:.4f} with {result.n_estimators} rounds {result.params}")
+    return result
+
+
+if __name__ == "__main__":
+    from src.feature_cache import load_or_build
+    from src.train import data_path, load_data
+
+    print(search(load_or_build(data_path(), load_data)))
@@ -0,0 +1,18 @@
+import os
+
+import yaml
+
+# repository-level config/ directory (api/src/utils/config.py -> config/)
+CONFIG_DIR = os.environ.get(
+    "CONFIG_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "config"),
+)
+
+
+def read_config(name, config_dir=None) -> dict:
+    """Parsed ``config/<name>.yaml``; a missing or empty file reads as ``{}``."""
+    path = os.path.join(config_dir or CONFIG_DIR, f"{name}.yaml")
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return yaml.safe_load(f) or {}
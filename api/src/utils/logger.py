@@ -1,16 +1,227 @@
+import atexit
+import json
 import logging
+import multiprocessing
 import os
-from datetime import datetime
+import queue
+import random
+import threading
+import time
+from logging.handlers import QueueHandler, RotatingFileHandler
 
-LOG_DIR = "logs"
-os.makedirs(LOG_DIR, exist_ok=True)
+LOG_DIR = os.environ.get("LOG_DIR", "logs")
+LOG_FILE = os.path.join(LOG_DIR, "app.log")
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "text")  # "text" or "json"
+LOG_ROTATE_BYTES = int(os.environ.get("LOG_ROTATE_BYTES", str(50 * 1024 * 1024)))
+LOG_ROTATE_SECONDS = float(os.environ.get("LOG_ROTATE_SECONDS", str(24 * 3600)))
+LOG_BACKUP_COUNT = int(os.environ.get("LOG_BACKUP_COUNT", "14"))
+LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", "10000"))
+LOG_FLUSH_RECORDS = int(os.environ.get("LOG_FLUSH_RECORDS", "256"))
+LOG_FLUSH_SECONDS = float(os.environ.get("LOG_FLUSH_SECONDS", "1.0"))
+# per-level sampling, e.g. "DEBUG=0.01,INFO=0.1"; unlisted levels are kept
+LOG_SAMPLE_RATES = os.environ.get("LOG_SAMPLE_RATES", "")
 
-LOG_FILE = f"{LOG_DIR}/app_{datetime.now().strftime('%Y_%m_%d')}.log"
+TEXT_FORMAT = "[%(asctime)s] %(levelname)s - %(name)s - %(message)s"
+_RECORD_ATTRS = set(logging.makeLogRecord({}).__dict__) | {"message", "asctime"}
 
-logging.basicConfig(
-    filename=LOG_FILE,
-    format="[%(asctime)s] %(levelname)s - %(name)s - %(message)s",
-    level=logging.INFO
-)
 
-logger = logging.getLogger("loan_approval")
\ No newline at end of file
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; ``extra=`` fields are kept as top-level keys."""
+
+    def format(self, record):
+        data = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                data[key] = value
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(data, default=str)
+
+
+def parse_sample_rates(spec):
+    rates = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        level, _, rate = part.partition("=")
+        rates[logging.getLevelName(level.strip().upper())] = float(rate)
+    return rates
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a fraction ``rates[level]`` of the records of each listed level.
+
+    Levels without a rate, and rates of 1 or more, keep every record.
+    """
+
+    def __init__(self, rates):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record):
+        rate = self.rates.get(record.levelno, 1.0)
+        return rate >= 1.0 or random.random() < rate
+
+
+class RotatingBufferedFileHandler(RotatingFileHandler):
+    """Size- and time-based rotation; writes are flushed by the listener in batches."""
+
+    def __init__(self, filename, max_bytes, rotate_seconds, backup_count):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count,
+                         encoding="utf-8", delay=True)
+        self.rotate_seconds = rotate_seconds
+        self.rollover_at = time.time() + rotate_seconds
+
+    def _open(self):
+        # the log directory is only created once the first record is written,
+        # so importing the package never touches the filesystem
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+    def flush(self):
+        # StreamHandler.emit flushes after every record; the listener calls
+        # flush_now() once per batch instead.
+        pass
+
+    def flush_now(self):
+        super().flush()
+
+    def shouldRollover(self, record):
+        if self.rotate_seconds > 0 and time.time() >= self.rollover_at:
+            return True
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        super().doRollover()
+        self.rollover_at = time.time() + self.rotate_seconds
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Enqueue without ever blocking the caller; drop and count when full."""
+
+    dropped = 0
+
+    def prepare(self, record):
+        # merge args now (they may be mutated later) but leave formatting,
+        # timestamps and tracebacks to the listener thread
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            NonBlockingQueueHandler.dropped += 1
+
+
+class BatchingListener:
+    """Background thread draining the log queue and flushing once per batch."""
+
+    def __init__(self, log_queue, handler, batch_size=LOG_FLUSH_RECORDS, flush_seconds=LOG_FLUSH_SECONDS):
+        self.queue = log_queue
+        self.handler = handler
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="log-listener", daemon=True)
+        self._thread.start()
+
+    def _drain(self, block):
+        batch = []
+        try:
+            batch.append(self.queue.get(block, self.flush_seconds))
+            while len(batch) < self.batch_size:
+                batch.append(self.queue.get_nowait())
+        except queue.Empty:
+            pass
+        for record in batch:
+            if record is not None:  # None is the wake-up sentinel from stop()
+                self.handler.handle(record)
+        if batch:
+            self.handler.flush_now()
+        return len(batch)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._drain(block=True)
+        while self._drain(block=False):
+            pass
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            try:
+                self.queue.put_nowait(None)
+            except queue.Full:
+                pass  # a full queue means the thread isn't waiting anyway
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.handler.flush_now()
+
+
+def process_log_file(log_file=LOG_FILE, worker=None):
+    """``app.log`` for a standalone process, ``app-<pid>.log`` for a worker process.
+
+    Rotation renames the file, so several processes rotating the same file
+    lose or split records; each worker writes its own file instead.
+    ``worker`` defaults to whether this process was started by multiprocessing
+    (uvicorn --workers, serve.py, process pools).
+    """
+    if worker is None:
+        worker = multiprocessing.parent_process() is not None
+    if not worker:
+        return log_file
+    root, ext = os.path.splitext(log_file)
+    return f"{root}-{os.getpid()}{ext}"
+
+
+def setup_logging(target, log_file=LOG_FILE, level=LOG_LEVEL, fmt=LOG_FORMAT,
+                  sample_rates=LOG_SAMPLE_RATES, queue_size=LOG_QUEUE_SIZE):
+    """Attach a non-blocking queue handler to ``target``; returns (handler, listener)."""
+    file_handler = RotatingBufferedFileHandler(log_file, LOG_ROTATE_BYTES, LOG_ROTATE_SECONDS, LOG_BACKUP_COUNT)
+    file_handler.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT))
+
+    log_queue = queue.Queue(maxsize=queue_size)
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(parse_sample_rates(sample_rates)))
+
+    listener = BatchingListener(log_queue, file_handler)
+    listener.start()
+    target.addHandler(queue_handler)
+    target.setLevel(level)
+    return queue_handler, listener
+
+
+def _flush_before_fork():
+    # written-but-unflushed records would otherwise be flushed again by the child
+    _listener.handler.flush_now()
+
+
+def _restart_after_fork():
+    # the listener thread doesn't survive fork() and the old queue's lock may
+    # be held, so forked workers get a fresh queue, listener and their own file
+    global _listener
+    parent = _listener.handler
+    handler = RotatingBufferedFileHandler(process_log_file(worker=True), LOG_ROTATE_BYTES,
+                                          LOG_ROTATE_SECONDS, LOG_BACKUP_COUNT)
+    handler.setFormatter(parent.formatter)
+    _queue_handler.queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    _listener = BatchingListener(_queue_handler.queue, handler)
+    _listener.start()
+
+
+_root = logging.getLogger()
+_queue_handler, _listener = setup_logging(_root, log_file=process_log_file())
+os.register_at_fork(before=_flush_before_fork, after_in_child=_restart_after_fork)
+atexit.register(lambda: _listener.stop())
+
+logger = logging.getLogger("loan_approval")
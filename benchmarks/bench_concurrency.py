@@ -0,0 +1,67 @@
+"""Concurrency vs throughput for inference pool size and model intra-op threads.
+
+    python benchmarks/bench_concurrency.py [--requests 2000] [--batch-rows 256]
+
+For every (pool workers, model nthread) pair, drives single-row predictions
+and small batches through the dedicated executor at several client
+concurrency levels and prints requests/s. Use it to pick INFERENCE_WORKERS
+and MODEL_NTHREAD for a given host.
+"""
+import argparse
+import asyncio
+import os
+import time
+import warnings
+
+from common import setup_api_path, synthetic_applications
+
+setup_api_path()
+warnings.filterwarnings("ignore")
+
+from src.executor import configure_model_threads, create_executor  # noqa: E402
+from src.model_store import model_store  # noqa: E402
+from src.predict import predict_batch, predict_from_dict  # noqa: E402
+
+
+async def throughput(executor, fn, items, concurrency):
+    loop = asyncio.get_running_loop()
+    queue = iter(items)
+
+    async def worker():
+        for item in queue:
+            await loop.run_in_executor(executor, fn, item)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return len(items) / (time.perf_counter() - start)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--batch-rows", type=int, default=256)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    args = parser.parse_args()
+
+    cpus = os.cpu_count() or 1
+    sizes = sorted({1, 2, cpus, 2 * cpus})
+    threads = sorted({1, cpus})
+    payloads = synthetic_applications(args.requests)
+    batches = [payloads[i:i + args.batch_rows] for i in range(0, len(payloads), args.batch_rows)]
+    pipeline = model_store.get()
+
+    print(f"cpus={cpus}")
+    print(f"{'workers':>7} {'nthread':>7} {'clients':>7} {'single req/s':>13} {'batch rows/s':>13}")
+    for workers in sizes:
+        for nthread in threads:
+            configure_model_threads(pipeline, nthread)
+            executor = create_executor("thread", workers)
+            for concurrency in args.concurrency:
+                single = await throughput(executor, predict_from_dict, payloads, concurrency)
+                batch = await throughput(executor, predict_batch, batches, concurrency) * args.batch_rows
+                print(f"{workers:>7} {nthread:>7} {concurrency:>7} {single:>13.0f} {batch:>13.0f}")
+            executor.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
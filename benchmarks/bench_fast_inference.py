@@ -0,0 +1,49 @@
+"""Single-row latency: sklearn DataFrame path vs the compiled NumPy fast path.
+
+    python benchmarks/bench_fast_inference.py [--n 2000]
+"""
+import argparse
+import warnings
+
+import numpy as np
+
+from common import setup_api_path, summarize, synthetic_applications, time_calls
+
+setup_api_path()
+warnings.filterwarnings("ignore")
+
+import pandas as pd  # noqa: E402
+from src.data_preprocessing import engineer_features, engineer_features_row  # noqa: E402
+from src.fast_inference import CompiledPipeline  # noqa: E402
+from src.predict import load_pipeline, score_frame  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=2000)
+    args = parser.parse_args()
+
+    pipeline = load_pipeline()
+    compiled = CompiledPipeline(pipeline)
+    payloads = synthetic_applications(args.n)
+
+    def sklearn_path(payload):
+        return score_frame(pipeline, engineer_features(pd.DataFrame([payload])))[0]
+
+    # outputs must match bit for bit before timings mean anything
+    pre = pipeline.named_steps["preprocessor"]
+    for payload in payloads:
+        expected = pre.transform(engineer_features(pd.DataFrame([payload])))
+        got = compiled.preprocessor.transform_one(engineer_features_row(payload))
+        assert np.array_equal(expected, got), payload
+        assert sklearn_path(payload) == compiled.predict_one(payload), payload
+    print(f"verified {len(payloads)} rows: identical features and predictions")
+
+    calls = [(p,) for p in payloads]
+    for name, fn in [("sklearn + pandas", sklearn_path), ("compiled numpy", compiled.predict_one)]:
+        stats = summarize(time_calls(fn, calls))
+        print(f"{name:>17}: " + "  ".join(f"{k}={v:.3f}" for k, v in stats.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""End-to-end HTTP load test of the API.
+
+    python benchmarks/bench_http_load.py [--concurrency 1 8 32] [--duration 10]
+    python benchmarks/bench_http_load.py --compare benchmarks/results/baseline.json
+
+Starts ``uvicorn main:app`` locally as a subprocess (no external services),
+then drives ``/predict``, ``/predict/batch`` and ``/predict/stream`` with
+synthetic applications at fixed client concurrency levels. Throughput and
+p50/p95/p99 latency per (endpoint, concurrency) are printed and written to a
+JSON file. With ``--compare`` the run is checked against an earlier result
+file and the script exits non-zero if any scenario regressed by more than
+``--threshold`` percent.
+"""
+import argparse
+import asyncio
+import csv
+import io
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+from common import API_DIR, ROOT_DIR, summarize, synthetic_applications
+
+RESULTS_DIR = os.path.join(ROOT_DIR, "benchmarks", "results")
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port, env_overrides, timeout=120):
+    env = dict(os.environ, **env_overrides)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [API_DIR, env.get("PYTHONPATH")]))
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=API_DIR, env=env,
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited with code {proc.returncode}")
+        try:
+            # /health answers before the model is loaded; /ready only once it is warm
+            if httpx.get(f"http://127.0.0.1:{port}/ready", timeout=1).status_code == 200:
+                return proc
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("server did not become ready in time")
+
+
+def _to_csv(rows):
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=list(rows[0]))
+    writer.writeheader()
+    writer.writerows(rows)
+    return buf.getvalue().encode()
+
+
+def build_scenarios(payloads, batch_rows, stream_rows):
+    """Return {name: (rows per request, request factory)} for each endpoint."""
+    batches = [payloads[i:i + batch_rows] for i in range(0, len(payloads) - batch_rows + 1, batch_rows)]
+    stream_body = _to_csv((payloads * (stream_rows // len(payloads) + 1))[:stream_rows])
+    return {
+        "predict": (1, lambda i: ("POST", "/predict", {"json": payloads[i % len(payloads)]})),
+        "predict_batch": (batch_rows, lambda i: ("POST", "/predict/batch", {"json": batches[i % len(batches)]})),
+        "predict_stream": (stream_rows, lambda i: ("POST", "/predict/stream", {
+            "content": stream_body, "headers": {"Content-Type": "text/csv"}})),
+    }
+
+
+async def run_load(base_url, make_request, concurrency, duration, warmup):
+    """Closed-loop load: ``concurrency`` clients send back-to-back requests."""
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        counter = iter(range(sys.maxsize))
+        timings, errors = [], 0
+        measuring = False
+
+        async def client_loop(stop_at):
+            nonlocal errors
+            while time.perf_counter() < stop_at:
+                method, path, kwargs = make_request(next(counter))
+                start = time.perf_counter()
+                response = await client.request(method, path, **kwargs)
+                elapsed = time.perf_counter() - start
+                if measuring:
+                    if response.status_code == 200:
+                        timings.append(elapsed)
+                    else:
+                        errors += 1
+
+        await asyncio.gather(*(client_loop(time.perf_counter() + warmup) for _ in range(concurrency)))
+        measuring = True
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(start + duration) for _ in range(concurrency)))
+        return timings, errors, time.perf_counter() - start
+
+
+def compare(current, baseline, threshold):
+    """Return a list of regression messages (throughput drop or p99 increase).
+
+    A scenario whose baseline measured nothing (0 req/s or 0 ms p99, e.g. a
+    failed run) can't be compared and is reported as n/a.
+    """
+    previous = {(r["endpoint"], r["concurrency"]): r for r in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        old = previous.get((result["endpoint"], result["concurrency"]))
+        if old is None:
+            continue
+        name = f"{result['endpoint']} c={result['concurrency']}"
+        if old["requests_per_s"] <= 0 or old["p99_ms"] <= 0:
+            print(f"{name}: n/a (baseline has no successful requests)")
+            continue
+        drop = (old["requests_per_s"] - result["requests_per_s"]) / old["requests_per_s"] * 100
+        if drop > threshold:
+            regressions.append(f"{name}: throughput {old['requests_per_s']:.0f} -> "
+                               f"{result['requests_per_s']:.0f} req/s (-{drop:.1f}%)")
+        rise = (result["p99_ms"] - old["p99_ms"]) / old["p99_ms"] * 100
+        if rise > threshold:
+            regressions.append(f"{name}: p99 {old['p99_ms']:.2f} -> {result['p99_ms']:.2f} ms (+{rise:.1f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoints", nargs="+", default=["predict", "predict_batch", "predict_stream"])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--duration", type=float, default=10.0, help="measured seconds per scenario")
+    parser.add_argument("--warmup", type=float, default=2.0, help="unmeasured seconds per scenario")
+    parser.add_argument("--batch-rows", type=int, default=100)
+    parser.add_argument("--stream-rows", type=int, default=10_000)
+    parser.add_argument("--env", nargs="*", default=[], metavar="KEY=VALUE",
+                        help="extra environment for the server, e.g. PREDICT_MICROBATCH=1")
+    parser.add_argument("--output", help="result file (default: benchmarks/results/http_load-<time>.json)")
+    parser.add_argument("--compare", help="earlier result file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=10.0, help="allowed regression in percent")
+    args = parser.parse_args()
+
+    # distinct payloads so the prediction cache doesn't turn the run into a cache benchmark
+    env = {"PREDICTION_CACHE_SIZE": "0", **dict(kv.split("=", 1) for kv in args.env)}
+    scenarios = build_scenarios(synthetic_applications(5000), args.batch_rows, args.stream_rows)
+    port = _free_port()
+    server = start_server(port, env)
+    results = []
+    try:
+        print(f"{'endpoint':>15} {'clients':>7} {'req/s':>9} {'rows/s':>10} {'p50 ms':>8} "
+              f"{'p95 ms':>8} {'p99 ms':>8} {'errors':>6}")
+        for endpoint in args.endpoints:
+            rows, make_request = scenarios[endpoint]
+            for concurrency in args.concurrency:
+                timings, errors, elapsed = asyncio.run(run_load(
+                    f"http://127.0.0.1:{port}", make_request, concurrency, args.duration, args.warmup))
+                stats = summarize(timings) if timings else dict.fromkeys(("mean_ms", "p50_ms", "p95_ms", "p99_ms"), 0.0)
+                result = {
+                    "endpoint": endpoint,
+                    "concurrency": concurrency,
+                    "requests": len(timings),
+                    "errors": errors,
+                    "requests_per_s": len(timings) / elapsed,
+                    "rows_per_s": len(timings) * rows / elapsed,
+                    **stats,
+                }
+                results.append(result)
+                print(f"{endpoint:>15} {concurrency:>7} {result['requests_per_s']:>9.0f} "
+                      f"{result['rows_per_s']:>10.0f} {result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} "
+                      f"{result['p99_ms']:>8.2f} {errors:>6}")
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    run = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "host": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "config": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        "server_env": env,
+        "results": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"http_load-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(run, f, indent=2)
+    print(f"results written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(run, json.load(f), args.threshold)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions beyond {args.threshold:.0f}% against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Overhead of the per-stage latency instrumentation.
+
+    python benchmarks/bench_metrics_overhead.py [--n 3000]
+
+Times predict_from_dict (compiled path) and predict_batch with metrics
+enabled and disabled, plus the raw cost of one ``stage_timer`` block.
+"""
+import argparse
+import time
+import warnings
+
+from common import setup_api_path, summarize, synthetic_applications, time_calls
+
+setup_api_path()
+warnings.filterwarnings("ignore")
+
+from src import metrics  # noqa: E402
+from src.model_store import model_store  # noqa: E402
+from src.predict import predict_batch, predict_from_dict  # noqa: E402
+
+
+def timer_cost(n=200_000):
+    start = time.perf_counter()
+    for _ in range(n):
+        with metrics.stage_timer("bench"):
+            pass
+    return (time.perf_counter() - start) / n
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=3000)
+    args = parser.parse_args()
+
+    model_store.get()
+    payloads = synthetic_applications(args.n)
+    single = [(p,) for p in payloads]
+    batches = [(payloads[i:i + 100],) for i in range(0, len(payloads), 100)]
+
+    print(f"stage_timer block: {timer_cost() * 1e9:.0f} ns")
+    for name, fn, calls in [("predict_from_dict", predict_from_dict, single),
+                            ("predict_batch x100", predict_batch, batches)]:
+        results = {}
+        for enabled in (False, True, False, True):
+            metrics.METRICS_ENABLED = enabled
+            results.setdefault(enabled, []).extend(time_calls(fn, calls))
+        off, on = summarize(results[False]), summarize(results[True])
+        overhead = (on["p50_ms"] - off["p50_ms"]) / off["p50_ms"] * 100
+        print(f"{name:>18}: p50 off={off['p50_ms']:.3f}ms on={on['p50_ms']:.3f}ms ({overhead:+.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Throughput of concurrent single-row predictions with and without micro-batching.
+
+    python benchmarks/bench_microbatch.py [--requests 4000] [--concurrency 64]
+
+Runs in-process (no HTTP) so it isolates the effect of coalescing model calls.
+"""
+import argparse
+import asyncio
+import time
+import warnings
+
+from common import setup_api_path, summarize, synthetic_applications
+
+setup_api_path()
+warnings.filterwarnings("ignore")
+
+from src.batching import MicroBatcher  # noqa: E402
+from src.model_store import model_store  # noqa: E402
+from src.predict import predict_from_dict, predict_payloads  # noqa: E402
+
+
+async def drive(call, payloads, concurrency):
+    latencies = []
+    queue = iter(payloads)
+
+    async def worker():
+        for payload in queue:
+            start = time.perf_counter()
+            await call(payload)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return len(payloads) / (time.perf_counter() - start), latencies
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    model_store.get()
+    payloads = synthetic_applications(args.requests)
+    loop = asyncio.get_running_loop()
+
+    async def direct(payload):
+        return await loop.run_in_executor(None, predict_from_dict, payload)
+
+    batcher = MicroBatcher(predict_payloads, args.max_batch_size, args.max_wait_ms)
+    batcher.start()
+
+    for name, call in [("per-request", direct), ("micro-batched", batcher.submit)]:
+        rps, latencies = await drive(call, payloads, args.concurrency)
+        stats = summarize(latencies)
+        print(f"{name:>14}: {rps:8.0f} req/s  " + "  ".join(f"{k}={v:.2f}" for k, v in stats.items()))
+    print(f"mean batch size: {batcher.items / max(batcher.batches, 1):.1f}")
+    await batcher.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,172 @@
+"""Time and peak memory of the core pipeline functions at several input sizes.
+
+    python benchmarks/bench_pipeline_functions.py [--sizes 1 1000 100000 1000000]
+    python benchmarks/bench_pipeline_functions.py --only engineer_features load_data
+    python benchmarks/bench_pipeline_functions.py --output after.json --compare before.json
+
+Every function is timed over repeated calls (median of repeats) and then run
+once more under ``tracemalloc`` to record the peak memory allocated by the
+call itself (setup data is allocated beforehand and not counted). Row-at-a-
+time functions (``LoanInput`` validation, ``predict_from_dict``) are called
+once per row and skipped above ``--max-row-calls`` rows.
+
+Use it before and after an optimization: ``--compare`` prints the change in
+time and peak memory for every (function, size) pair.
+"""
+import argparse
+import gc
+import json
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+import warnings
+
+from common import setup_api_path, synthetic_frame
+
+setup_api_path()
+warnings.filterwarnings("ignore")
+
+from src.data_preprocessing import create_preprocessor, engineer_features  # noqa: E402
+from src.model_store import model_store  # noqa: E402
+from src.predict import predict_batch, predict_from_dict  # noqa: E402
+from src.schemas.input_schema import LoanInput  # noqa: E402
+from src.train import load_data  # noqa: E402
+
+
+def _features(frame):
+    return frame.drop(columns=["customer_id", "loan_status"])
+
+
+def bench_engineer_features(frame, tmpdir):
+    features = _features(frame)
+    return lambda: engineer_features(features)
+
+
+def bench_transformer_fit(frame, tmpdir):
+    X = engineer_features(_features(frame))
+    return lambda: create_preprocessor().fit(X)
+
+
+def bench_transformer_transform(frame, tmpdir):
+    X = engineer_features(_features(frame))
+    preprocessor = create_preprocessor().fit(X)
+    return lambda: preprocessor.transform(X)
+
+
+def bench_loan_input(frame, tmpdir):
+    payloads = _features(frame).to_dict(orient="records")
+    return lambda: [LoanInput(**p) for p in payloads]
+
+
+def bench_predict_from_dict(frame, tmpdir):
+    payloads = _features(frame).to_dict(orient="records")
+    return lambda: [predict_from_dict(p) for p in payloads]
+
+
+def bench_predict_batch(frame, tmpdir):
+    payloads = _features(frame).to_dict(orient="records")
+    return lambda: predict_batch(payloads)
+
+
+def bench_load_data(frame, tmpdir):
+    path = os.path.join(tmpdir, f"loans_{len(frame)}.csv")
+    if not os.path.exists(path):
+        frame.to_csv(path, index=False)
+    return lambda: load_data(path)
+
+
+# name -> (setup(frame, tmpdir) -> zero-arg callable, called once per row)
+BENCHMARKS = {
+    "engineer_features": (bench_engineer_features, False),
+    "column_transformer_fit": (bench_transformer_fit, False),
+    "column_transformer_transform": (bench_transformer_transform, False),
+    "loan_input_validation": (bench_loan_input, True),
+    "predict_from_dict": (bench_predict_from_dict, True),
+    "predict_batch": (bench_predict_batch, False),
+    "load_data": (bench_load_data, False),
+}
+
+
+def measure(fn, min_time=0.5, max_repeats=50):
+    """Return (median seconds per call, repeats, peak traced bytes of one call)."""
+    start = time.perf_counter()
+    fn()
+    first = time.perf_counter() - start
+    # the first call doubles as warm-up; slow calls aren't worth repeating
+    timings = [first] if first >= min_time else []
+    while len(timings) < max_repeats and sum(timings) < min_time:
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return statistics.median(timings), len(timings), peak
+
+
+def _fmt_bytes(n):
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024 or unit == "GB":
+            return f"{n:.0f}{unit}" if unit == "B" else f"{n:.1f}{unit}"
+        n /= 1024
+
+
+def print_comparison(results, baseline):
+    previous = {(r["function"], r["rows"]): r for r in baseline["results"]}
+    print(f"\n{'function':>28} {'rows':>9} {'time':>18} {'peak memory':>24}")
+    for r in results:
+        old = previous.get((r["function"], r["rows"]))
+        if old is None:
+            continue
+        time_change = (r["seconds"] - old["seconds"]) / old["seconds"] * 100
+        mem_change = (r["peak_bytes"] - old["peak_bytes"]) / max(old["peak_bytes"], 1) * 100
+        print(f"{r['function']:>28} {r['rows']:>9} {old['seconds'] * 1e3:>8.2f}->{r['seconds'] * 1e3:.2f}ms "
+              f"({time_change:+.0f}%) {_fmt_bytes(old['peak_bytes']):>8}->{_fmt_bytes(r['peak_bytes'])} "
+              f"({mem_change:+.0f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 1000, 100_000, 1_000_000])
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument("--max-row-calls", type=int, default=10_000,
+                        help="skip row-at-a-time functions above this many rows")
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds of repeats per measurement")
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--compare", help="earlier JSON result to compare against")
+    args = parser.parse_args()
+
+    model_store.get()
+    results = []
+    print(f"{'function':>28} {'rows':>9} {'time/call':>12} {'rows/s':>12} {'peak mem':>10} {'repeats':>7}")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for rows in args.sizes:
+            frame = synthetic_frame(rows)
+            for name in args.only:
+                setup, per_row = BENCHMARKS[name]
+                if per_row and rows > args.max_row_calls:
+                    print(f"{name:>28} {rows:>9} {'skipped':>12}")
+                    continue
+                seconds, repeats, peak = measure(setup(frame, tmpdir), args.min_time)
+                results.append({"function": name, "rows": rows, "seconds": seconds,
+                                "rows_per_s": rows / seconds, "peak_bytes": peak, "repeats": repeats})
+                print(f"{name:>28} {rows:>9} {seconds * 1e3:>10.3f}ms {rows / seconds:>12,.0f} "
+                      f"{_fmt_bytes(peak):>10} {repeats:>7}")
+            del frame
+            gc.collect()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "results": results}, f, indent=2)
+        print(f"results written to {args.output}")
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Cold-start time of the API.
+
+    python benchmarks/bench_startup.py [--repeats 5] [--backends sklearn numpy]
+
+For each repeat a fresh interpreter is started and timed for:
+
+- ``import main``: importing the app module (no server);
+- ``/health``: spawning ``uvicorn main:app`` until the liveness probe answers;
+- ``/ready``: until the model is loaded and warmed up.
+
+The ``numpy`` backend needs an exported engine (``python -m src.tree_engine``)
+and is skipped when ``MODEL_ENGINE_PATH`` doesn't exist.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+from common import API_DIR
+from bench_http_load import _free_port
+
+
+def time_import(env):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import main"], cwd=API_DIR, env=env, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def time_server(env, timeout=120):
+    """Return seconds from spawn until /health and /ready first answer 200."""
+    port = _free_port()
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=API_DIR, env=env, stderr=subprocess.DEVNULL,
+    )
+    times = {}
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=1) as client:
+            while len(times) < 2 and time.perf_counter() - start < timeout:
+                if proc.poll() is not None:
+                    raise RuntimeError(f"server exited with code {proc.returncode}")
+                for probe in ("health", "ready"):
+                    if probe in times:
+                        continue
+                    try:
+                        if client.get(f"/{probe}").status_code == 200:
+                            times[probe] = time.perf_counter() - start
+                    except httpx.HTTPError:
+                        break
+                time.sleep(0.005)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+    if len(times) < 2:
+        raise RuntimeError("server did not become ready in time")
+    return times["health"], times["ready"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--backends", nargs="+", default=["sklearn", "numpy"])
+    args = parser.parse_args()
+
+    print(f"{'backend':>8} {'import main':>12} {'/health':>9} {'/ready':>9}   (median of {args.repeats}, seconds)")
+    for backend in args.backends:
+        env = dict(os.environ, MODEL_BACKEND=backend, MODEL_RELOAD_INTERVAL="0")
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [API_DIR, env.get("PYTHONPATH")]))
+        engine_path = os.path.join(API_DIR, env.get("MODEL_ENGINE_PATH", "models/loan_model_engine"))
+        if backend == "numpy" and not os.path.isdir(engine_path):
+            print(f"{backend:>8} skipped: no engine at {engine_path}")
+            continue
+        imports, health, ready = [], [], []
+        for _ in range(args.repeats):
+            imports.append(time_import(env))
+            h, r = time_server(env)
+            health.append(h)
+            ready.append(r)
+        print(f"{backend:>8} {statistics.median(imports):>12.2f} {statistics.median(health):>9.2f} "
+              f"{statistics.median(ready):>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Per-worker memory of N API workers under different model loading strategies.
+
+    python benchmarks/bench_worker_rss.py [--workers 4] [--model models/loan_model.pkl]
+
+Strategies:
+  independent   each worker unpickles its own copy (plain ``uvicorn --workers``)
+  mmap          each worker loads with joblib ``mmap_mode="r"``
+  fork-preload  the parent loads once (mmap) and forks workers (``api/serve.py``)
+
+RSS double counts shared pages; PSS splits them between the processes that
+share them, so the PSS total is what the host actually pays. Linux only.
+"""
+import argparse
+import multiprocessing
+import os
+import warnings
+
+from common import setup_api_path
+
+setup_api_path()
+warnings.filterwarnings("ignore")
+
+
+def _memory_kb(pid):
+    stats = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss"):
+                stats[key] = int(rest.split()[0])
+    return stats
+
+
+def _import_libs():
+    import joblib  # noqa: F401
+    import pandas  # noqa: F401
+    import sklearn.ensemble  # noqa: F401
+    import xgboost  # noqa: F401
+    from src.model_store import warm_up  # noqa: F401
+
+
+def _worker(model_path, mmap_mode, model, ready, stop):
+    warnings.filterwarnings("ignore")
+    _import_libs()
+    from src.model_store import warm_up
+    if model is None and model_path is not None:
+        import joblib
+        model = joblib.load(model_path, mmap_mode=mmap_mode)
+    if model is not None:
+        warm_up(model)
+    ready.release()
+    stop.wait()
+
+
+def measure(strategy, model_path, workers):
+    if strategy == "fork-preload":
+        import gc
+        import joblib
+        from src.model_store import warm_up
+        ctx = multiprocessing.get_context("fork")
+        model = joblib.load(model_path, mmap_mode="r")
+        warm_up(model)
+        gc.freeze()
+        args = (None, None, model)
+    else:
+        ctx = multiprocessing.get_context("spawn")
+        mmap_mode = "r" if strategy == "mmap" else None
+        path = None if strategy == "libs-only" else model_path
+        args = (path, mmap_mode, None)
+
+    ready, stop = ctx.Semaphore(0), ctx.Event()
+    procs = [ctx.Process(target=_worker, args=args + (ready, stop)) for _ in range(workers)]
+    for p in procs:
+        p.start()
+    for _ in procs:
+        ready.acquire()
+    stats = [_memory_kb(p.pid) for p in procs]
+    stop.set()
+    for p in procs:
+        p.join()
+    if strategy == "fork-preload":
+        import gc
+        gc.unfreeze()
+    return {
+        "rss_mb": sum(s["Rss"] for s in stats) / len(stats) / 1024,
+        "pss_mb": sum(s["Pss"] for s in stats) / len(stats) / 1024,
+        "pss_total_mb": sum(s["Pss"] for s in stats) / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--model", default="models/loan_model.pkl")
+    args = parser.parse_args()
+
+    print(f"model={args.model} ({os.path.getsize(args.model) / 1e6:.1f} MB on disk), workers={args.workers}")
+    print(f"{'strategy':>13} {'RSS/worker':>11} {'PSS/worker':>11} {'PSS total':>10}")
+    for strategy in ["libs-only", "independent", "mmap", "fork-preload"]:
+        m = measure(strategy, args.model, args.workers)
+        print(f"{strategy:>13} {m['rss_mb']:>9.0f}MB {m['pss_mb']:>9.0f}MB {m['pss_total_mb']:>8.0f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Shared helpers for the benchmark scripts.
+
+Benchmarks are plain scripts, run from the repository root, e.g.::
+
+    python benchmarks/bench_fast_inference.py
+
+They chdir into ``api/`` so relative paths such as ``models/loan_model.pkl``
+resolve the same way they do for the service.
+"""
+import os
+import random
+import statistics
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+API_DIR = os.path.join(ROOT_DIR, "api")
+
+OCCUPATIONS = ["Employed", "Self-Employed", "Student"]
+INTENTS = ["Business", "Debt Consolidation", "Education", "Home Improvement", "Medical", "Personal"]
+PRODUCTS = ["Credit Card", "Line of Credit", "Personal Loan"]
+
+
+def setup_api_path():
+    """Make ``src`` importable and run from ``api/`` like the service does."""
+    for path in (API_DIR, os.path.join(API_DIR, "src")):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+    os.chdir(API_DIR)
+
+
+def synthetic_application(rng: random.Random) -> dict:
+    """Return one random but schema-valid LoanInput payload."""
+    income = round(rng.uniform(15000, 250000), 2)
+    return {
+        "age": rng.randint(18, 75),
+        "years_employed": round(rng.uniform(0, 40), 1),
+        "annual_income": income,
+        "credit_score": rng.randint(300, 850),
+        "credit_history_years": round(rng.uniform(0, 30), 1),
+        "savings_assets": round(rng.uniform(0, 100000), 2),
+        "current_debt": round(rng.uniform(0, income), 2),
+        "defaults_on_file": rng.choice([0, 0, 0, 1]),
+        "delinquencies_last_2yrs": rng.choice([0, 0, 1, 2]),
+        "derogatory_marks": rng.choice([0, 0, 0, 1]),
+        "loan_amount": round(rng.uniform(500, 100000), 2),
+        "interest_rate": round(rng.uniform(3, 25), 2),
+        "occupation_status": rng.choice(OCCUPATIONS),
+        "loan_intent": rng.choice(INTENTS),
+        "product_type": rng.choice(PRODUCTS),
+    }
+
+
+def synthetic_applications(n: int, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    return [synthetic_application(rng) for _ in range(n)]
+
+
+def synthetic_frame(n: int, seed: int = 42):
+    """Vectorized counterpart of synthetic_applications laid out like the raw CSV.
+
+    Includes ``customer_id`` and a ``loan_status`` label so the frame can stand
+    in for ``data/raw/Loan_approval_data_2025.csv`` at any size.
+    """
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    income = rng.uniform(15000, 250000, n).round(2)
+    df = pd.DataFrame({
+        "customer_id": [f"CUST{i}" for i in range(100000, 100000 + n)],
+        "age": rng.integers(18, 76, n),
+        "occupation_status": rng.choice(OCCUPATIONS, n),
+        "years_employed": rng.uniform(0, 40, n).round(1),
+        "annual_income": income,
+        "credit_score": rng.integers(300, 851, n),
+        "credit_history_years": rng.uniform(0, 30, n).round(1),
+        "savings_assets": rng.uniform(0, 100000, n).round(2),
+        "current_debt": (rng.uniform(0, 1, n) * income).round(2),
+        "defaults_on_file": rng.choice([0, 0, 0, 1], n),
+        "delinquencies_last_2yrs": rng.choice([0, 0, 1, 2], n),
+        "derogatory_marks": rng.choice([0, 0, 0, 1], n),
+        "product_type": rng.choice(PRODUCTS, n),
+        "loan_intent": rng.choice(INTENTS, n),
+        "loan_amount": rng.uniform(500, 100000, n).round(2),
+        "interest_rate": rng.uniform(3, 25, n).round(2),
+    })
+    df["loan_status"] = (df["credit_score"] + rng.normal(0, 80, n) > 620).astype(int)
+    return df
+
+
+def time_calls(fn, args_list, warmup=10):
+    """Call ``fn`` once per item of ``args_list`` and return per-call seconds."""
+    for args in args_list[:warmup]:
+        fn(*args)
+    timings = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    if not ordered:
+        return float("nan")
+    idx = min(len(ordered) - 1, max(0, int(round(q / 100 * (len(ordered) - 1)))))
+    return ordered[idx]
+
+
+def summarize(timings):
+    """Return mean/p50/p95/p99 in milliseconds."""
+    return {
+        "mean_ms": statistics.fmean(timings) * 1000,
+        "p50_ms": percentile(timings, 50) * 1000,
+        "p95_ms": percentile(timings, 95) * 1000,
+        "p99_ms": percentile(timings, 99) * 1000,
+    }
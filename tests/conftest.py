@@ -1,4 +1,5 @@
 import pandas as pd
+import numpy as np
 import os
 import pytest
 import joblib
@@ -43,12 +44,55 @@ SAMPLE_DF = pd.DataFrame([
     }
 ])
 
+def make_loan_frame(n=400, seed=0):
+    """Random raw loan rows (schema-valid) with a loan_status label."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "age": rng.integers(18, 75, n),
+        "years_employed": rng.uniform(0, 40, n).round(1),
+        "annual_income": rng.uniform(15000, 250000, n).round(2),
+        "credit_score": rng.integers(300, 850, n),
+        "credit_history_years": rng.uniform(0, 30, n).round(1),
+        "savings_assets": rng.uniform(0, 100000, n).round(2),
+        "current_debt": rng.uniform(0, 50000, n).round(2),
+        "defaults_on_file": rng.integers(0, 2, n),
+        "delinquencies_last_2yrs": rng.integers(0, 3, n),
+        "derogatory_marks": rng.integers(0, 2, n),
+        "loan_amount": rng.uniform(500, 100000, n).round(2),
+        "interest_rate": rng.uniform(3, 25, n).round(2),
+        "occupation_status": rng.choice(["Employed", "Self-Employed", "Student"], n),
+        "loan_intent": rng.choice(["Business", "Education", "Medical"], n),
+        "product_type": rng.choice(["Credit Card", "Personal Loan"], n),
+    })
+    df["loan_status"] = (df["credit_score"] + rng.normal(0, 60, n) > 600).astype(int)
+    return df
+
+
+@pytest.fixture
+def make_loans():
+    """Factory fixture for raw loan frames: ``make_loans(n, seed)``."""
+    return make_loan_frame
+
+
+@pytest.fixture
+def training_frame():
+    """Engineered features and labels for fitting small pipelines."""
+    from src.data_preprocessing import engineer_features
+
+    df = engineer_features(make_loan_frame())
+    return df.drop(columns=["loan_status"]), df["loan_status"]
+
+
 @pytest.fixture(scope="session")
 def sample_df(tmp_path_factory):
-    """Create a small CSV file for tests and return its path."""
+    """Create a small CSV file for tests and return its path.
+
+    Training splits it stratified and fits every candidate, so it needs
+    enough rows of both classes.
+    """
     tmpdir = tmp_path_factory.mktemp("data")
     path = tmpdir / "test_loan_data.csv"
-    SAMPLE_DF.to_csv(path, index=False)
+    make_loan_frame(200, seed=1).to_csv(path, index=False)
     return str(path)
 
 @pytest.fixture(autouse=True)
@@ -68,10 +112,13 @@ def ensure_models_dir(tmp_path, monkeypatch, sample_df):
     # monkeypatch src.train.load_data to read our sample csv instead of real dataset
     import src.train as train_mod
     
-    def _load_data_patch(path=str(sample_df)):
-        return pd.read_csv(path)
+    def _load_data_patch(path=None):
+        return pd.read_csv(path or sample_df)
     
-    monkeypatch.setattr(train_mod, "load_data", lambda path=None: _load_data_patch(path))
+    monkeypatch.setattr(train_mod, "load_data", _load_data_patch)
+    monkeypatch.setattr(train_mod, "data_path", lambda: sample_df)
+    # feature cache entries go to the test's tmp dir, not data/processed/features
+    monkeypatch.setattr("src.feature_cache.FEATURE_CACHE_DIR", str(tmp_path / "features"))
 
 
     yield
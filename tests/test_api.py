@@ -1,3 +1,4 @@
+import pytest
 from fastapi.testclient import TestClient
 from api.main import app
 
@@ -32,4 +33,115 @@ def test_api_predict_endpoint():
     assert resp.status_code == 200
     body = resp.json()
     assert body.get("success") is True
-    assert "result" in body
\ No newline at end of file
+    assert "result" in body
+
+def test_api_predict_batch_endpoint():
+    good = {
+        "age": 30,
+        "years_employed": 4,
+        "annual_income": 50000,
+        "credit_score": 700,
+        "credit_history_years": 6,
+        "savings_assets": 10000,
+        "current_debt": 5000,
+        "defaults_on_file": 0,
+        "delinquencies_last_2yrs": 0,
+        "derogatory_marks": 0,
+        "loan_amount": 10000,
+        "interest_rate": 10.5,
+        "occupation_status": "Salaried",
+        "loan_intent": "Education",
+        "product_type": "Personal Loan"
+    }
+    bad = dict(good, age=15)
+
+    resp = client.post("/predict/batch", json=[good, bad, good])
+    assert resp.status_code == 200
+    results = resp.json()["results"]
+    assert [r["index"] for r in results] == [0, 1, 2]
+    assert [r["success"] for r in results] == [True, False, True]
+    assert results[1]["errors"][0]["loc"] == ["age"]
+    assert results[0]["result"] == resp.json()["results"][2]["result"]
+
+
+def test_api_predict_stream_csv_and_ndjson():
+    import io
+    import json
+    import pandas as pd
+
+    row = {
+        "customer_id": "C1", "age": 30, "years_employed": 4, "annual_income": 50000,
+        "credit_score": 700, "credit_history_years": 6, "savings_assets": 10000,
+        "current_debt": 5000, "defaults_on_file": 0, "delinquencies_last_2yrs": 0,
+        "derogatory_marks": 0, "loan_amount": 10000, "interest_rate": 10.5,
+        "occupation_status": "Employed", "loan_intent": "Education", "product_type": "Personal Loan"
+    }
+    rows = [row, dict(row, customer_id="C2", credit_score=100), dict(row, customer_id="C3")]
+
+    csv_body = pd.DataFrame(rows).to_csv(index=False)
+    resp = client.post("/predict/stream", content=csv_body, headers={"content-type": "text/csv"})
+    assert resp.status_code == 200
+    out = pd.read_csv(io.StringIO(resp.text))
+    assert list(out["customer_id"]) == ["C1", "C2", "C3"]
+    assert out["error"].isna().tolist() == [True, False, True]
+    assert out.loc[1, "error"].startswith("credit_score")
+
+    ndjson_body = "".join(json.dumps(r) + "\n" for r in rows)
+    resp = client.post("/predict/stream", content=ndjson_body, headers={"content-type": "application/x-ndjson"})
+    records = [json.loads(line) for line in resp.text.splitlines()]
+    assert [r["row"] for r in records] == [0, 1, 2]
+    assert records[0]["probability"] == pytest.approx(out.loc[0, "probability"])
+    assert records[1]["prediction"] is None
+
+    resp = client.post("/predict/stream", content="x", headers={"content-type": "text/plain"})
+    assert resp.status_code == 415
+
+
+def test_api_ready_turns_200_once_model_is_warm():
+    import time
+
+    with TestClient(app) as started:
+        deadline = time.monotonic() + 60
+        resp = started.get("/ready")
+        while resp.status_code == 503 and time.monotonic() < deadline:
+            assert resp.json()["status"] == "loading"
+            time.sleep(0.05)
+            resp = started.get("/ready")
+        assert resp.status_code == 200
+        assert resp.json()["model_version"]
+        assert started.get("/health").json()["status"] == "ok"
+
+
+def test_api_import_does_not_load_heavy_modules():
+    import os
+    import subprocess
+    import sys
+
+    api_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "api")
+    code = ("import sys, main; "
+            "print(','.join(m for m in ('pandas', 'sklearn', 'xgboost', 'joblib') if m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", code], cwd=api_dir, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == ""
+
+
+def test_api_predict_stream_scores_on_the_inference_executor(monkeypatch):
+    import threading
+    import src.streaming as streaming
+
+    threads = []
+    score_chunk = streaming.score_chunk
+
+    def recording_score_chunk(pipeline, df):
+        threads.append(threading.current_thread().name)
+        return score_chunk(pipeline, df)
+
+    monkeypatch.setattr(streaming, "score_chunk", recording_score_chunk)
+    header = "age,years_employed,annual_income,credit_score,credit_history_years,savings_assets,current_debt," \
+             "defaults_on_file,delinquencies_last_2yrs,derogatory_marks,loan_amount,interest_rate," \
+             "occupation_status,loan_intent,product_type\n"
+    row = "30,4,50000,700,6,10000,5000,0,0,0,10000,10.5,Employed,Education,Personal Loan\n"
+
+    resp = client.post("/predict/stream", content=header + row * 5, headers={"content-type": "text/csv"})
+    assert resp.status_code == 200
+    assert len(resp.text.splitlines()) == 6
+    assert threads and all(name.startswith("inference") for name in threads)
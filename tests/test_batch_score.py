@@ -0,0 +1,51 @@
+import os
+import pandas as pd
+from src.batch_score import score_file
+from tests.conftest import SAMPLE_DF
+
+
+def test_score_file_partitions_and_resumes(tmp_path, capsys):
+    src_path = tmp_path / "portfolio.csv"
+    df = pd.concat([SAMPLE_DF.drop(columns=["loan_status"])] * 3, ignore_index=True)
+    df.loc[1, "credit_score"] = 10  # invalid row is reported, not fatal
+    df.to_csv(src_path, index=False)
+    out_dir = tmp_path / "scores"
+
+    assert score_file(str(src_path), str(out_dir), chunk_rows=4, workers=1) == 6
+    parts = sorted(p for p in os.listdir(out_dir) if p.startswith("part-"))
+    assert parts == ["part-00000.csv", "part-00001.csv"]
+
+    out = pd.concat(pd.read_csv(out_dir / p) for p in parts)
+    assert out["row"].tolist() == list(range(6))
+    assert out["error"].notna().tolist() == [False, True, False, False, False, False]
+
+    # a resumed run only rescores the partition that is missing
+    os.remove(out_dir / "part-00001.csv")
+    progress = []
+    assert score_file(str(src_path), str(out_dir), chunk_rows=4, workers=1,
+                      progress=lambda *args: progress.append(args)) == 2
+    assert progress[-1][:2] == (2, 4)
+    # progress goes to the callback; the library itself prints nothing
+    assert capsys.readouterr().out == ""
+
+
+def test_score_file_refuses_to_resume_with_another_model(tmp_path):
+    import shutil
+    import pytest
+    from src.model_store import MODEL_PATH
+    from src.utils.exception import CustomException
+
+    src_path = tmp_path / "portfolio.csv"
+    SAMPLE_DF.drop(columns=["loan_status"]).to_csv(src_path, index=False)
+    model_path = tmp_path / "loan_model.pkl"
+    shutil.copy(MODEL_PATH, model_path)
+    out_dir = tmp_path / "scores"
+    assert score_file(str(src_path), str(out_dir), str(model_path), chunk_rows=1, workers=1) == 2
+
+    # a swapped model must not append its scores to the first model's output
+    os.remove(out_dir / "part-00001.csv")
+    with open(model_path, "ab") as f:
+        f.write(b"\0")
+    with pytest.raises(CustomException, match="model_digest changed"):
+        score_file(str(src_path), str(out_dir), str(model_path), chunk_rows=1, workers=1)
+    assert not (out_dir / "part-00001.csv").exists()
@@ -0,0 +1,92 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from src.batching import MicroBatcher
+
+
+def test_micro_batcher_coalesces_concurrent_requests():
+    calls = []
+
+    def score(payloads):
+        calls.append(len(payloads))
+        return [p * 10 for p in payloads]
+
+    async def run():
+        batcher = MicroBatcher(score, max_batch_size=8, max_wait_ms=20)
+        batcher.start()
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(20)))
+        await batcher.stop()
+        return results
+
+    results = asyncio.run(run())
+    # every caller gets its own answer, in fewer model calls than requests
+    assert results == [i * 10 for i in range(20)]
+    assert sum(calls) == 20
+    assert len(calls) < 20
+    assert max(calls) <= 8
+
+
+def test_micro_batcher_propagates_errors():
+    def score(payloads):
+        raise ValueError("boom")
+
+    async def run():
+        batcher = MicroBatcher(score, max_batch_size=4, max_wait_ms=1)
+        batcher.start()
+        try:
+            await batcher.submit({"a": 1})
+        finally:
+            await batcher.stop()
+
+    with pytest.raises(ValueError):
+        asyncio.run(run())
+
+
+def test_micro_batcher_scores_batches_concurrently_up_to_the_cap():
+    lock = threading.Lock()
+    running, peak = [0], [0]
+
+    def score(payloads):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+        return payloads
+
+    async def run():
+        with ThreadPoolExecutor(4) as executor:
+            batcher = MicroBatcher(score, max_batch_size=1, max_wait_ms=0, executor=executor, max_concurrent=3)
+            batcher.start()
+            results = await asyncio.gather(*(batcher.submit(i) for i in range(12)))
+            await batcher.stop()
+        return results
+
+    assert asyncio.run(run()) == list(range(12))
+    assert peak[0] == 3
+
+
+def test_micro_batcher_stop_fails_queued_requests():
+    release = threading.Event()
+
+    def score(payloads):
+        release.wait(5)
+        return payloads
+
+    async def run():
+        batcher = MicroBatcher(score, max_batch_size=1, max_wait_ms=0, max_concurrent=1)
+        batcher.start()
+        submitted = [asyncio.ensure_future(batcher.submit(i)) for i in range(3)]
+        await asyncio.sleep(0.05)  # the first is scoring, the others wait for its slot
+        threading.Timer(0.05, release.set).start()
+        await batcher.stop()
+        return await asyncio.gather(*submitted, return_exceptions=True)
+
+    first, *queued = asyncio.run(asyncio.wait_for(run(), 10))
+    # the batch in flight still completes; nobody is left waiting
+    assert first == 0
+    assert all(isinstance(r, RuntimeError) for r in queued)
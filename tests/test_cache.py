@@ -0,0 +1,146 @@
+import time
+
+from src.cache import MemoryBackend, PredictionCache, SqliteBackend, cache_key
+
+PAYLOAD = {"age": 30, "annual_income": 50000.0, "occupation_status": "Employed"}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_cache_key_is_canonical_and_versioned():
+    reordered = dict(reversed(list(PAYLOAD.items())))
+    assert cache_key(PAYLOAD, "v1") == cache_key(reordered, "v1")
+    assert cache_key(PAYLOAD, "v1") != cache_key(PAYLOAD, "v2")
+
+
+def test_memory_backend_lru_and_ttl():
+    clock = FakeClock()
+    backend = MemoryBackend(max_entries=2, ttl=10, clock=clock)
+    backend.set("a", 1)
+    backend.set("b", 2)
+    backend.get("a")
+    backend.set("c", 3)  # evicts least recently used "b"
+    assert backend.get("b") is None
+    assert backend.get("a") == 1
+
+    clock.now = 11
+    assert backend.get("a") is None
+
+
+def test_prediction_cache_counts_and_invalidates_on_model_version():
+    cache = PredictionCache(MemoryBackend())
+    assert cache.get(PAYLOAD, "v1") is None
+    cache.set(PAYLOAD, "v1", {"prediction": 1, "probability": 0.9})
+    assert cache.get(PAYLOAD, "v1") == {"prediction": 1, "probability": 0.9}
+    assert cache.get(PAYLOAD, "v2") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_shared_backend_is_reused_across_caches(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    first = PredictionCache(MemoryBackend(), SqliteBackend(path))
+    second = PredictionCache(MemoryBackend(), SqliteBackend(path))
+
+    first.set(PAYLOAD, "v1", {"prediction": 0, "probability": 0.1})
+    assert second.get(PAYLOAD, "v1") == {"prediction": 0, "probability": 0.1}
+    assert second.stats()["shared_hits"] == 1
+
+
+def test_shared_tier_lookup_and_store_run_off_the_event_loop(monkeypatch):
+    import asyncio
+    import threading
+
+    import api.main as main
+    from src.model_store import model_store
+    from src.schemas.input_schema import EXAMPLE_INPUT, LoanInput
+
+    class SlowBackend(MemoryBackend):
+        """Shared tier stuck on a lock for 0.3 s per call."""
+
+        def __init__(self):
+            super().__init__()
+            self.threads = set()
+
+        def get(self, key):
+            self.threads.add(threading.current_thread().name)
+            time.sleep(0.3)
+            return super().get(key)
+
+        def set(self, key, value):
+            self.threads.add(threading.current_thread().name)
+            super().set(key, value)
+
+    shared = SlowBackend()
+    cache = PredictionCache(MemoryBackend(), shared)
+    monkeypatch.setattr(main, "prediction_cache", cache)
+    model_store.get()
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        first = await main.predict_payload(LoanInput(**EXAMPLE_INPUT).model_dump())
+        task.cancel()
+        cache.close()  # waits for the background shared-tier write
+        return first, ticks
+
+    first, ticks = asyncio.run(run())
+    assert first["success"] is True
+    # the loop kept running while the shared tier was busy
+    assert ticks >= 10
+    assert shared.threads and all(name.startswith("cache-io") for name in shared.threads)
+    assert len(shared) == 1 and cache.stats()["misses"] == 1
+
+
+def test_prediction_cache_counts_every_lookup_across_threads():
+    import threading
+
+    cache = PredictionCache(MemoryBackend())
+    cache.set(PAYLOAD, "v1", {"prediction": 1})
+    hit, miss = cache_key(PAYLOAD, "v1"), cache_key(PAYLOAD, "v2")
+
+    def lookup():
+        for _ in range(5000):
+            cache.lookup_local(hit)
+            cache.lookup_local(miss)
+
+    threads = [threading.Thread(target=lookup) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert cache.stats()["hits"] == cache.stats()["misses"] == 40000
+
+
+def test_predict_caches_under_the_version_that_scored(monkeypatch):
+    import asyncio
+
+    import api.main as main
+    from src.model_store import model_store
+    from src.schemas.input_schema import EXAMPLE_INPUT, LoanInput
+
+    cache = PredictionCache(MemoryBackend())
+    monkeypatch.setattr(main, "prediction_cache", cache)
+    model_store.get()
+    old = model_store.version
+    # the model is hot-swapped between the cache lookup and inference
+    monkeypatch.setattr(main, "predict_payloads_versioned",
+                        lambda payloads: [({"prediction": 1, "probability": 0.75}, "new-version")])
+
+    result = asyncio.run(main.predict_payload(LoanInput(**EXAMPLE_INPUT).model_dump()))["result"]
+    payload = LoanInput(**EXAMPLE_INPUT).model_dump()
+    assert cache.local.get(cache_key(payload, "new-version")) == result
+    assert cache.local.get(cache_key(payload, old)) is None
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+from Streamlit_app.data_cube import build_cube
+
+
+@pytest.fixture
+def loans(make_loans):
+    df = make_loans(600, seed=4)
+    df.loc[::50, "loan_intent"] = None
+    df.loc[::70, "annual_income"] = np.nan
+    return df
+
+
+def test_cube_answers_match_pandas_under_filters(loans):
+    cube = build_cube(loans)
+    assert {"occupation_status", "loan_intent", "product_type", "loan_status", "defaults_on_file"} <= set(cube.dims)
+    assert "annual_income" not in cube.dims and "annual_income" in cube.measures
+
+    filters = {"occupation_status": ["Employed", "Student"], "product_type": [],
+               "loan_status": (1.0, 1.0), "age": (18.0, 74.0)}
+    cells = cube.mask(filters)
+    rows = loans[loans["occupation_status"].isin(["Employed", "Student"])
+                 & loans["loan_status"].between(1, 1) & loans["age"].between(18, 74)]
+
+    assert cube.rows(cells) == len(rows)
+    assert cube.missing_values(cells) == int(rows.isna().sum().sum())
+    pd.testing.assert_series_equal(cube.value_counts("loan_intent", cells),
+                                   rows["loan_intent"].value_counts(), check_index_type=False)
+    assert cube.nunique("loan_intent", cells) == rows["loan_intent"].nunique()
+    pd.testing.assert_series_equal(cube.group_mean("loan_intent", "annual_income", cells),
+                                   rows.groupby("loan_intent")["annual_income"].mean(), check_index_type=False)
+    pd.testing.assert_frame_equal(cube.crosstab("loan_intent", "product_type", cells, normalize="index"),
+                                  pd.crosstab(rows["loan_intent"], rows["product_type"], normalize="index"),
+                                  check_index_type=False, check_column_type=False)
+
+    summary = cube.summary("annual_income", cells)
+    assert summary["mean"] == pytest.approx(rows["annual_income"].mean())
+    assert summary["std"] == pytest.approx(rows["annual_income"].std())
+    expected = rows[cube.measures].describe().T[["count", "mean", "std", "min", "max"]]
+    pd.testing.assert_frame_equal(cube.describe(cells), expected, check_dtype=False)
+
+    edges, counts = cube.histogram("credit_score", cells)
+    assert len(edges) == len(counts) + 1 and counts.sum() == len(rows)
+    assert list(counts) == list(np.histogram(rows["credit_score"], bins=edges)[0])
+
+
+def test_cube_defers_narrow_continuous_filters_to_the_rows(loans):
+    cube = build_cube(loans)
+    full = (float(loans["credit_score"].min()), float(loans["credit_score"].max()))
+
+    assert cube.mask({"credit_score": full}) is not None
+    assert cube.mask({"credit_score": (full[0] + 1, full[1])}) is None
+    # a full range still drops the missing incomes, which only the rows know about
+    income = (float(loans["annual_income"].min()), float(loans["annual_income"].max()))
+    assert cube.mask({"annual_income": income}) is None
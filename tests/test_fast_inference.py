@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+from src.data_preprocessing import engineer_features, engineer_features_row
+from src.fast_inference import CompiledPipeline, compile_pipeline
+from src.predict import load_pipeline, score_frame
+
+SAMPLE = {
+    "age": 30,
+    "years_employed": 4,
+    "annual_income": 50000,
+    "credit_score": 700,
+    "credit_history_years": 6,
+    "savings_assets": 10000,
+    "current_debt": 5000,
+    "defaults_on_file": 0,
+    "delinquencies_last_2yrs": 0,
+    "derogatory_marks": 0,
+    "loan_amount": 10000,
+    "interest_rate": 10.5,
+    "occupation_status": "Employed",
+    "loan_intent": "Education",
+    "product_type": "Personal Loan"
+}
+
+
+def test_compiled_pipeline_matches_sklearn_bit_for_bit():
+    pipeline = load_pipeline()
+    compiled = CompiledPipeline(pipeline)
+    pre = pipeline.named_steps["preprocessor"]
+
+    # second payload uses a category the encoder never saw
+    for payload in [SAMPLE, dict(SAMPLE, occupation_status="Salaried", annual_income=0)]:
+        df = engineer_features(pd.DataFrame([payload]))
+        expected = pre.transform(df)
+        got = compiled.preprocessor.transform_one(engineer_features_row(payload))
+        assert np.array_equal(expected, got)
+        assert compiled.predict_one(payload) == score_frame(pipeline, df)[0]
+
+
+def test_compile_pipeline_rejects_unknown_layouts():
+    assert compile_pipeline(object()) is None
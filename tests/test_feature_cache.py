@@ -0,0 +1,52 @@
+import os
+
+import numpy as np
+import pandas as pd
+from src.feature_cache import load_or_build, prune
+
+
+def test_feature_cache_builds_once_then_hits(tmp_path, make_loans):
+    raw = tmp_path / "loans.csv"
+    make_loans(300).to_csv(raw, index=False)
+    cache_dir = str(tmp_path / "features")
+    calls = []
+
+    def load(path):
+        calls.append(path)
+        return pd.read_csv(path)
+
+    first = load_or_build(str(raw), load, cache_dir=cache_dir)
+    second = load_or_build(str(raw), load, cache_dir=cache_dir)
+    assert len(calls) == 1
+    assert second.path == first.path
+    assert isinstance(second.X_train, np.memmap)
+    assert np.array_equal(second.X_test, second.preprocessor.transform(second.test_frame))
+    assert len(second.y_train) + len(second.y_test) == 300
+
+    # a different split or different data is a different entry
+    assert load_or_build(str(raw), load, seed=7, cache_dir=cache_dir).path != first.path
+    make_loans(300, seed=1).to_csv(raw, index=False)
+    assert load_or_build(str(raw), load, cache_dir=cache_dir).path != first.path
+    assert len(calls) == 3
+
+
+def test_prune_keeps_most_recent_entries(tmp_path):
+    cache_dir = tmp_path / "features"
+    for i, name in enumerate(["a", "b", "c"]):
+        os.makedirs(cache_dir / name)
+        meta = cache_dir / name / "meta.json"
+        meta.write_text("{}")
+        os.utime(meta, (i, i))
+    prune(str(cache_dir), keep=2)
+    assert sorted(os.listdir(cache_dir)) == ["b", "c"]
+
+
+def test_feature_cache_keys_on_the_loaded_frame_without_a_file(tmp_path, make_loans):
+    frames = {"a": make_loans(300), "b": make_loans(300, seed=1)}
+    missing = str(tmp_path / "not-there.csv")
+
+    # the loader reads from elsewhere, so the key comes from what it returned
+    first = load_or_build(missing, lambda path: frames["a"])
+    assert os.path.dirname(first.path) == str(tmp_path / "features")  # conftest's FEATURE_CACHE_DIR
+    assert load_or_build(missing, lambda path: frames["a"].copy()).path == first.path
+    assert load_or_build(missing, lambda path: frames["b"]).path != first.path
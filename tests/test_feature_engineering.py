@@ -14,4 +14,49 @@ def test_engineer_features_creates_ratios():
     assert "loan_to_income_ratio" in out.columns
     # numeric correctness
     assert out.loc[0, "debt_to_income_ratio"] == pytest.approx(15000 / 60000)
-    assert out.loc[0, "loan_to_income_ratio"] == pytest.approx(20000 / 60000)
\ No newline at end of file
+    assert out.loc[0, "loan_to_income_ratio"] == pytest.approx(20000 / 60000)
+
+def test_engineer_features_leaves_input_unchanged_and_widens_compact_columns():
+    df = pd.DataFrame({
+        "annual_income": pd.Series([60000, 0], dtype="float32"),
+        "current_debt": [15000, 10],
+        "loan_amount": [20000, 5],
+    })
+    before = df.copy()
+
+    out = engineer_features(df)
+    assert df.equals(before)
+    assert out["annual_income"].dtype == "float64"
+    assert out.loc[1, "debt_to_income_ratio"] == pytest.approx(10 / 1e-9)
+
+
+def test_feature_plan_runs_the_same_on_rows_and_batches():
+    from src.data_preprocessing import engineer_features_row
+    from src.schemas.input_schema import EXAMPLE_INPUT
+
+    batch = engineer_features(pd.DataFrame([EXAMPLE_INPUT] * 3)).iloc[0].to_dict()
+    row = engineer_features_row(EXAMPLE_INPUT)
+    assert row.keys() == batch.keys()
+    for col in ("debt_to_income_ratio", "loan_to_income_ratio"):
+        assert row[col] == batch[col]
+
+
+def test_feature_plan_computes_only_requested_features_in_dependency_order():
+    from src.data_preprocessing import FeaturePlan
+
+    registry = {
+        "total_debt": {"op": "product", "inputs": ["current_debt", "months"]},
+        "debt_ratio": {"op": "ratio", "inputs": ["total_debt", "annual_income"], "eps": 0},
+        "unused": {"op": "log1p", "inputs": ["loan_amount"]},
+    }
+    plan = FeaturePlan(["debt_ratio", "age"], registry)
+    assert [step[0] for step in plan.steps] == ["total_debt", "debt_ratio"]
+    assert plan.inputs == ["age", "annual_income", "current_debt", "months"]
+
+    row = plan.apply_row({"current_debt": 10, "months": 3, "annual_income": 60, "age": 30})
+    assert row["debt_ratio"] == 0.5 and "unused" not in row
+
+    with pytest.raises(ValueError, match="depends on itself"):
+        FeaturePlan(["a"], {"a": {"op": "log1p", "inputs": ["b"]}, "b": {"op": "log1p", "inputs": ["a"]}})
+    with pytest.raises(ValueError, match="Unknown op"):
+        FeaturePlan(["a"], {"a": {"op": "sqrt", "inputs": ["b"]}})
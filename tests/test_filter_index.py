@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from Streamlit_app.filter_index import build_filter_index
+
+
+def apply_filters(df, filters):
+    """The dashboard's original chain of boolean masks."""
+    out = df.copy()
+    for col, val in filters.items():
+        if isinstance(val, list):
+            if len(val) > 0:
+                out = out[out[col].isin(val)]
+        else:
+            out = out[(out[col] >= val[0]) & (out[col] <= val[1])]
+    return out
+
+
+@pytest.fixture
+def loans(make_loans):
+    df = make_loans(1000, seed=5)
+    df["annual_income"] = df["annual_income"].astype(np.float32)
+    df["credit_score"] = df["credit_score"].astype(np.int16)
+    df.loc[::40, "loan_intent"] = None
+    df.loc[::90, "interest_rate"] = np.nan
+    return df
+
+
+def test_filter_index_matches_the_mask_chain(loans):
+    index = build_filter_index(loans)
+    assert index.options["product_type"] == sorted(loans["product_type"].unique())
+    assert "annual_income" in index.bounds and "annual_income" not in index.options
+
+    income = float(loans["annual_income"].iloc[7])
+    cases = [
+        {"occupation_status": ["Employed", "Student"]},
+        {"loan_intent": index.options["loan_intent"]},  # keeping every value still drops missing ones
+        {"annual_income": (income, 200000.0), "credit_score": (450.5, 800.0), "product_type": []},
+        {"annual_income": (income + 1e-3, income + 1e-3)},
+        {"interest_rate": index.bounds["interest_rate"], "loan_status": (1.0, 1.0),
+         "occupation_status": ["Self-Employed"]},
+    ]
+    for filters in cases:
+        rows = index.select(filters)
+        assert list(rows) == list(np.flatnonzero(loans.index.isin(apply_filters(loans, filters).index)))
+
+
+def test_filter_index_skips_no_op_filters_and_memoizes(loans):
+    index = build_filter_index(loans)
+    everything = {col: list(values) for col, values in index.options.items() if not index.has_nan[col]}
+    everything.update({col: bounds for col, bounds in index.bounds.items() if not index.has_nan[col]})
+    assert index.select(everything) is None
+
+    narrowed = dict(everything, credit_score=(600.0, 850.0))
+    rows = index.select(narrowed)
+    assert index.select(dict(reversed(list(narrowed.items())))) is rows
+    assert len(rows) == (loans["credit_score"] >= 600).sum()
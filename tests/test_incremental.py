@@ -0,0 +1,111 @@
+import json
+
+import joblib
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from xgboost import XGBClassifier
+from src.data_preprocessing import create_preprocessor
+from src.incremental import main, save_reference, update_model
+from src.model_store import ModelStore, file_digest, save_pipeline
+from src.train import load_data
+from src.tree_engine import compile_engine, save_engine
+
+
+@pytest.fixture
+def saved_model(tmp_path, training_frame):
+    def save(clf):
+        df, y = training_frame
+        pipeline = Pipeline([("preprocessor", create_preprocessor()), ("clf", clf)]).fit(df, y)
+        path = tmp_path / "loan_model.pkl"
+        save_pipeline(pipeline, str(path))
+        return str(path)
+    return save
+
+
+def test_xgboost_update_continues_boosting_and_writes_a_version(tmp_path, saved_model, make_loans):
+    model_path = saved_model(XGBClassifier(n_estimators=20, max_depth=3, eval_metric="logloss"))
+    parent = file_digest(model_path)[:12]
+    versions = tmp_path / "versions"
+
+    result = update_model(make_loans(300, seed=1), model_path, rounds=10, tolerance=1.0,
+                          versions_dir=str(versions), engine_path=str(tmp_path / "engine"))
+
+    assert result.promoted and result.parent == parent
+    assert result.pipeline[-1].get_booster().num_boosted_rounds() == 30
+    assert result.pipeline[-1].n_estimators == 30
+    assert (versions / f"loan_model-{result.version}.pkl").exists()
+    # the promoted model is swapped in; the API store reports the same version
+    assert ModelStore(path=model_path, reload_interval=0).current().version == result.version
+    history = [json.loads(line) for line in open(versions / "history.jsonl")]
+    assert history[-1]["parent"] == parent and history[-1]["version"] == result.version
+
+
+def test_forest_update_adds_trees_fitted_on_new_rows(tmp_path, saved_model, make_loans):
+    model_path = saved_model(RandomForestClassifier(n_estimators=10, random_state=0))
+
+    result = update_model(make_loans(300, seed=1), model_path, rounds=5, tolerance=1.0,
+                          versions_dir=str(tmp_path / "versions"), engine_path=str(tmp_path / "engine"))
+
+    assert len(result.pipeline[-1].estimators_) == 15
+    assert len(joblib.load(model_path)[-1].estimators_) == 15
+
+
+def test_update_below_the_auc_bar_is_not_promoted(tmp_path, saved_model, make_loans):
+    model_path = saved_model(XGBClassifier(n_estimators=20, max_depth=3, eval_metric="logloss"))
+    before = file_digest(model_path)
+
+    # a negative tolerance demands an AUC gain no update can reach
+    result = update_model(make_loans(300, seed=1), model_path, rounds=10, tolerance=-1.0,
+                          versions_dir=str(tmp_path / "versions"), engine_path=str(tmp_path / "engine"))
+
+    assert not result.promoted and result.version is None
+    assert file_digest(model_path) == before
+    assert not list((tmp_path / "versions").glob("*.pkl"))
+
+
+def test_update_that_regresses_on_the_reference_is_not_promoted(tmp_path, saved_model, training_frame, make_loans):
+    model_path = saved_model(XGBClassifier(n_estimators=20, max_depth=3, eval_metric="logloss"))
+    df, y = training_frame
+    reference = tmp_path / "reference.parquet"
+    save_reference(df.assign(loan_status=y), str(reference))
+    # the batch follows the opposite rule: the update learns it and unlearns the history
+    batch = make_loans(600, seed=1)
+    batch["loan_status"] = 1 - batch["loan_status"]
+    kwargs = dict(rounds=30, tolerance=0.01, versions_dir=str(tmp_path / "versions"),
+                  engine_path=str(tmp_path / "engine"))
+
+    result = update_model(batch, model_path, reference_path=str(reference), **kwargs)
+    assert result.auc > result.parent_auc
+    assert result.reference_auc < result.parent_reference_auc - 0.01
+    assert not result.promoted
+    history = [json.loads(line) for line in open(tmp_path / "versions" / "history.jsonl")]
+    assert history[-1]["reference_auc"] == result.reference_auc
+
+    # the batch holdout alone would have let it through
+    assert update_model(batch, model_path, reference_path=str(tmp_path / "missing.parquet"), **kwargs).promoted
+
+
+def test_promoted_update_removes_an_engine_it_cannot_export(tmp_path, saved_model, make_loans):
+    engine = tmp_path / "engine"
+    save_engine(compile_engine(joblib.load(saved_model(RandomForestClassifier(n_estimators=5, random_state=0)))),
+                str(engine))
+    model_path = saved_model(LogisticRegression(max_iter=500))
+
+    result = update_model(make_loans(300, seed=1), model_path, tolerance=1.0,
+                          versions_dir=str(tmp_path / "versions"), engine_path=str(engine))
+
+    assert result.promoted
+    # the engine of the earlier forest must not keep serving
+    assert not engine.exists()
+
+
+def test_cli_updates_from_a_csv_without_customer_id(tmp_path, saved_model, make_loans, monkeypatch):
+    model_path = saved_model(XGBClassifier(n_estimators=20, max_depth=3, eval_metric="logloss"))
+    batch = tmp_path / "new_outcomes.csv"
+    make_loans(300, seed=1).to_csv(batch, index=False)
+    monkeypatch.setattr("src.train.load_data", load_data)  # the real loader, not the conftest one
+    monkeypatch.chdir(tmp_path)  # versions, engine and reference paths are relative
+
+    assert main([str(batch), "--model", model_path, "--rounds", "5", "--tolerance", "1.0"]) == 0
@@ -0,0 +1,66 @@
+import json
+
+import numpy as np
+import pandas as pd
+from src.feature_cache import cache_key
+from src.ingest import MANIFEST, ingest, read_dataset
+from src.train import load_data
+
+
+def test_ingest_writes_compact_partitioned_dataset(tmp_path, make_loans):
+    raw = make_loans(500)
+    raw.insert(0, "customer_id", [f"CUST{i}" for i in range(len(raw))])
+    source = tmp_path / "loans.csv"
+    raw.to_csv(source, index=False)
+    out = tmp_path / "processed"
+
+    manifest = ingest(str(source), str(out), chunk_rows=200)
+
+    assert manifest["rows"] == 500
+    assert sorted(p.name for p in out.iterdir()) == [
+        MANIFEST, "part-00000.parquet", "part-00001.parquet", "part-00002.parquet"]
+    assert json.loads((out / MANIFEST).read_text()) == manifest
+
+    df = read_dataset(str(out), columns=["defaults_on_file", "annual_income", "loan_intent"])
+    assert list(df.columns) == ["defaults_on_file", "annual_income", "loan_intent"]
+    assert df["defaults_on_file"].dtype == np.int8
+    assert df["annual_income"].dtype == np.float32
+    assert isinstance(df["loan_intent"].dtype, pd.CategoricalDtype)
+    assert set(df["loan_intent"]) == set(raw["loan_intent"])
+
+    # train.load_data reads the model columns only, with the same values as the CSV
+    loaded = load_data(str(out))
+    assert "customer_id" not in loaded.columns
+    csv = load_data(str(source))
+    for col in loaded.columns:
+        if pd.api.types.is_numeric_dtype(loaded[col]):
+            assert np.allclose(loaded[col], csv[col], rtol=1e-6)
+        else:
+            assert list(loaded[col].astype(str)) == list(csv[col])
+
+    # the feature cache keys an ingested dataset by its manifest
+    key = cache_key(str(out), 42, 0.2)
+    ingest(str(source), str(out), chunk_rows=200)
+    assert cache_key(str(out), 42, 0.2) == key
+
+
+def test_ingest_round_trips_every_value_exactly(tmp_path, make_loans):
+    raw = make_loans(500)
+    raw.insert(0, "customer_id", [f"CUST{i}" for i in range(len(raw))])
+    money = ["annual_income", "savings_assets", "current_debt", "loan_amount"]
+    raw[money] = raw[money].round()  # the loan file holds whole dollars
+    raw["debt_to_income_ratio"] = (raw["current_debt"] / raw["annual_income"]).round(4)
+    raw["loan_to_income_ratio"] = (raw["loan_amount"] / raw["annual_income"]).round(4)
+    raw["payment_to_income_ratio"] = (raw["loan_to_income_ratio"] / 12).round(4)
+    source = tmp_path / "loans.csv"
+    raw.to_csv(source, index=False)
+    out = tmp_path / "processed"
+    ingest(str(source), str(out), chunk_rows=200)
+
+    stored, csv = read_dataset(str(out)), pd.read_csv(source)
+    assert list(stored.columns) == list(csv.columns)
+    for col in csv.columns:
+        if pd.api.types.is_numeric_dtype(csv[col]):
+            assert np.array_equal(stored[col].to_numpy(np.float64), csv[col].to_numpy(np.float64)), col
+        else:
+            assert list(stored[col].astype(str)) == list(csv[col]), col
@@ -0,0 +1,68 @@
+import json
+import logging
+from src.utils.logger import setup_logging
+
+
+def _make_logger(tmp_path, name, **kwargs):
+    target = logging.getLogger(name)
+    target.propagate = False
+    log_file = tmp_path / "logs" / "app.log"
+    handler, listener = setup_logging(target, log_file=str(log_file), **kwargs)
+    return target, handler, listener, log_file
+
+
+def test_json_records_are_written_in_background(tmp_path):
+    target, handler, listener, log_file = _make_logger(tmp_path, "test_json", fmt="json", level="INFO")
+    try:
+        target.info("scored %s rows", 3, extra={"request_id": "abc"})
+        target.debug("below level")
+    finally:
+        listener.stop()
+        target.removeHandler(handler)
+
+    records = [json.loads(line) for line in log_file.read_text().splitlines()]
+    assert len(records) == 1
+    assert records[0]["message"] == "scored 3 rows"
+    assert records[0]["request_id"] == "abc"
+    assert records[0]["level"] == "INFO"
+
+
+def test_per_level_sampling(tmp_path):
+    target, handler, listener, log_file = _make_logger(
+        tmp_path, "test_sampling", fmt="text", level="DEBUG", sample_rates="DEBUG=0,INFO=1")
+    try:
+        for i in range(50):
+            target.debug("noisy %d", i)
+        target.warning("kept")
+    finally:
+        listener.stop()
+        target.removeHandler(handler)
+
+    lines = log_file.read_text().splitlines()
+    assert len(lines) == 1
+    assert "WARNING" in lines[0] and "kept" in lines[0]
+
+
+def _log_in_child(message):
+    from src.utils import logger as logger_module
+
+    logger_module.logger.warning(message)
+    logger_module._listener.stop()
+
+
+def test_worker_processes_write_their_own_log_file(tmp_path, monkeypatch):
+    import multiprocessing
+    import os
+    from src.utils import logger as logger_module
+
+    monkeypatch.chdir(tmp_path)
+    ctx = multiprocessing.get_context("fork")
+    child = ctx.Process(target=_log_in_child, args=("from the worker",))
+    child.start()
+    child.join(timeout=30)
+    assert child.exitcode == 0
+
+    # the forked worker logged to logs/app-<pid>.log, not to the parent's file
+    worker_file = tmp_path / logger_module.process_log_file(worker=True).replace(str(os.getpid()), str(child.pid))
+    assert "from the worker" in worker_file.read_text()
+    assert logger_module.process_log_file(worker=False) == logger_module.LOG_FILE
@@ -0,0 +1,76 @@
+from fastapi.testclient import TestClient
+from api.main import app
+from src.metrics import ERRORS, Histogram, stage_timer, STAGE_SECONDS
+from src.utils.exception import CustomException
+
+client = TestClient(app)
+
+
+def test_histogram_renders_cumulative_buckets():
+    hist = Histogram("demo_seconds", "Demo.", ("stage",), buckets=(0.1, 1.0))
+    hist.observe(0.05, "a")
+    hist.observe(0.5, "a")
+    hist.observe(5, "a")
+    lines = hist.render()
+    assert 'demo_seconds_bucket{stage="a",le="0.1"} 1' in lines
+    assert 'demo_seconds_bucket{stage="a",le="1.0"} 2' in lines
+    assert 'demo_seconds_bucket{stage="a",le="+Inf"} 3' in lines
+    assert 'demo_seconds_count{stage="a"} 3' in lines
+
+
+def test_stage_timer_records_duration():
+    before = STAGE_SECONDS.count("unit_test_stage")
+    with stage_timer("unit_test_stage"):
+        pass
+    assert STAGE_SECONDS.count("unit_test_stage") == before + 1
+
+
+def test_metrics_endpoint_and_error_counts(monkeypatch):
+    import src.predict as predict_mod
+
+    def broken(payloads):
+        raise CustomException(KeyError("annual_income"), "Batch prediction failed")
+
+    monkeypatch.setattr(predict_mod, "predict_batch", broken)
+    before = ERRORS.value("KeyError")
+    resp = client.post("/predict/batch", json=[{"age": 30}, {"age": 40}])
+    assert resp.status_code == 500
+    assert resp.json() == {"success": False, "detail": "Batch prediction failed"}
+    assert ERRORS.value("KeyError") == before + 1
+
+    body = client.get("/metrics").text
+    assert 'loan_http_requests_total{method="POST",path="/predict/batch",status="500"}' in body
+    assert "loan_model_info{version=" in body
+
+
+def test_predict_times_validation_and_rejects_invalid_payloads():
+    from src.schemas.input_schema import EXAMPLE_INPUT
+
+    before = STAGE_SECONDS.count("validation")
+    assert client.post("/predict", json=EXAMPLE_INPUT).status_code == 200
+    resp = client.post("/predict", json={**EXAMPLE_INPUT, "age": "old"})
+    assert resp.status_code == 422
+    assert resp.json()["detail"][0]["loc"] == ["body", "age"]
+    assert STAGE_SECONDS.count("validation") == before + 2
+    assert client.post("/predict", content=b"{", headers={"Content-Type": "application/json"}).status_code == 422
+    assert "LoanInput" in str(client.get("/openapi.json").json()["paths"]["/predict"]["post"]["requestBody"])
+
+
+def timed_in_worker(x):
+    with stage_timer("unit_test_worker_stage"):
+        return x * 2
+
+
+def test_stage_timings_from_process_pool_reach_the_parent():
+    import asyncio
+    from concurrent.futures import ProcessPoolExecutor
+
+    from src.executor import run_inference
+
+    async def run():
+        with ProcessPoolExecutor(1) as pool:
+            return [await run_inference(timed_in_worker, i, executor=pool) for i in range(3)]
+
+    before = STAGE_SECONDS.count("unit_test_worker_stage")
+    assert asyncio.run(run()) == [0, 2, 4]
+    assert STAGE_SECONDS.count("unit_test_worker_stage") == before + 3
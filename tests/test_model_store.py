@@ -0,0 +1,48 @@
+import os
+import shutil
+from src.model_store import ModelStore, MODEL_PATH
+
+
+def test_model_store_keeps_pipeline_resident(tmp_path):
+    path = tmp_path / "loan_model.pkl"
+    shutil.copy(MODEL_PATH, path)
+    store = ModelStore(path=str(path), reload_interval=0)
+
+    first = store.get()
+    assert store.get() is first
+    assert store.version is not None
+    # tests can always force a fresh load
+    assert store.get(fresh=True) is not first
+
+
+def test_model_store_swaps_on_content_change(tmp_path):
+    path = tmp_path / "loan_model.pkl"
+    shutil.copy(MODEL_PATH, path)
+    store = ModelStore(path=str(path), reload_interval=0)
+    store.get()
+    version = store.version
+
+    # touching without changing content keeps the current version
+    os.utime(path, (0, 12345))
+    assert store.check_for_update() is False
+    assert store.version == version
+
+    with open(path, "ab") as f:
+        f.write(b"\0")
+    os.utime(path, (0, 67890))
+    assert store.check_for_update() is True
+    assert store.version != version
+
+
+def test_save_pipeline_writes_mmap_loadable_artifact(tmp_path):
+    from src.model_store import save_pipeline
+
+    out_dir = tmp_path / "artifacts"
+    out_dir.mkdir()
+    path = out_dir / "loan_model.pkl"
+    pipeline = ModelStore(path=MODEL_PATH, reload_interval=0, mmap_mode=None).get()
+    save_pipeline(pipeline, str(path))
+
+    assert os.listdir(out_dir) == ["loan_model.pkl"]
+    store = ModelStore(path=str(path), reload_interval=0, mmap_mode="r")
+    assert store.get() is not None
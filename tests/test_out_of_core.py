@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.metrics import roc_auc_score
+from src.data_preprocessing import NUMERIC_COLS, engineer_features
+from src.out_of_core import StreamingAUC, split_chunks, train_out_of_core
+from src.tree_engine import compile_engine, verify_engine
+
+PARAMS = {"n_estimators": 20, "max_depth": 3, "learning_rate": 0.3}
+
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet"])
+def test_chunked_training_matches_whole_file_statistics(tmp_path, make_loans, fmt):
+    raw = make_loans(1000)
+    path = str(tmp_path / f"loans.{fmt}")
+    if fmt == "csv":
+        raw.to_csv(path, index=False)
+    else:
+        raw.to_parquet(path)
+
+    pipeline, auc, sample = train_out_of_core(path, chunk_rows=128, params=PARAMS)
+
+    # the incrementally fitted scaler equals one fitted on all training rows at once
+    train_rows = pd.concat(df[~holdout] for df, holdout in split_chunks(path, 128))
+    scaler = pipeline[0].named_transformers_["num"]
+    assert scaler.n_samples_seen_ == len(train_rows)
+    assert np.allclose(scaler.mean_, train_rows[NUMERIC_COLS].mean().to_numpy())
+    assert np.allclose(scaler.var_, train_rows[NUMERIC_COLS].var(ddof=0).to_numpy())
+
+    assert 0.5 < auc <= 1
+    assert pipeline.predict_proba(engineer_features(raw.drop(columns=["loan_status"]))).shape == (1000, 2)
+    assert verify_engine(compile_engine(pipeline), pipeline, sample) <= 1e-5
+
+
+def test_chunked_features_equal_the_features_the_api_computes(tmp_path, make_loans):
+    raw = make_loans(500)
+    money = ["annual_income", "savings_assets", "current_debt", "loan_amount"]
+    raw[money] = raw[money].round()  # the loan file holds whole dollars
+    path = str(tmp_path / "loans.csv")
+    raw.to_csv(path, index=False)
+
+    chunked = pd.concat(df for df, _ in split_chunks(path, 128))
+    expected = engineer_features(pd.read_csv(path))
+    for col in NUMERIC_COLS:
+        assert np.array_equal(chunked[col].to_numpy(np.float64), expected[col].to_numpy(np.float64)), col
+
+
+def test_streaming_auc_matches_exact_auc():
+    rng = np.random.default_rng(0)
+    y = rng.integers(0, 2, 5000)
+    prob = np.clip(y * 0.3 + rng.random(5000) * 0.7, 0, 1)
+    auc = StreamingAUC()
+    for part in np.array_split(np.arange(5000), 7):
+        auc.update(y[part], prob[part])
+    assert auc.value() == pytest.approx(roc_auc_score(y, prob), abs=1e-4)
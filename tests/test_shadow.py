@@ -0,0 +1,80 @@
+import threading
+import time
+
+from fastapi.testclient import TestClient
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from src.data_preprocessing import create_preprocessor
+from src.model_store import MODEL_PATH, ModelStore, save_pipeline
+from src.predict import score_payloads
+from src.schemas.input_schema import EXAMPLE_INPUT
+from src.shadow import ShadowScorer
+
+
+def test_shadow_scorer_compares_candidate_with_production(tmp_path, training_frame, make_loans):
+    df, y = training_frame
+    path = tmp_path / "candidate.pkl"
+    save_pipeline(Pipeline([("preprocessor", create_preprocessor()), ("clf", LogisticRegression(max_iter=500))])
+                  .fit(df, y), str(path))
+    candidate = ModelStore(path=str(path), reload_interval=0)
+    payloads = make_loans(20, seed=3).drop(columns=["loan_status"]).to_dict("records")
+    production = score_payloads(candidate.current(), payloads)
+    # a production model that is always 0.1 less confident and rejects everything
+    production = [{"prediction": 0, "probability": r["probability"] - 0.1} for r in production]
+
+    shadow = ShadowScorer(candidate, batch_size=8)
+    shadow.score(list(zip(payloads, production)))
+    stats = shadow.stats()
+
+    assert stats["scored"] == 20 and stats["batches"] == 1
+    positives = sum(r["prediction"] for r in score_payloads(candidate.current(), payloads))
+    assert stats["agreement"] == (20 - positives) / 20
+    assert abs(stats["mean_delta"] - 0.1) < 1e-9 and abs(stats["max_abs_delta"] - 0.1) < 1e-9
+
+
+def test_shadow_offer_drops_when_the_queue_is_full(tmp_path):
+    shadow = ShadowScorer(ModelStore(path=str(tmp_path / "missing.pkl"), reload_interval=0), queue_size=2)
+
+    assert [shadow.offer({}, {}) for _ in range(3)] == [True, True, False]
+    assert shadow.stats()["dropped"] == 1
+
+    # a candidate that cannot load fails its batches, not the caller
+    assert shadow._drain(block=False) == 2
+    assert shadow.stats()["failed"] == 2 and shadow.stats()["scored"] == 0
+
+
+def test_shadow_offer_counts_every_drop_across_threads(tmp_path):
+    shadow = ShadowScorer(ModelStore(path=str(tmp_path / "missing.pkl"), reload_interval=0), queue_size=1)
+    shadow.offer({}, {})
+    results = []
+
+    def offer_many():
+        results.extend(shadow.offer({}, {}) for _ in range(2000))
+
+    threads = [threading.Thread(target=offer_many) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not any(results) and shadow.stats()["dropped"] == len(results) == 16000
+
+
+def test_api_predict_feeds_the_shadow_scorer(monkeypatch):
+    import api.main as main
+
+    monkeypatch.setattr(main, "create_shadow_scorer",
+                        lambda: ShadowScorer(ModelStore(path=MODEL_PATH, reload_interval=0), max_wait_ms=5))
+    with TestClient(main.app) as client:
+        for _ in range(3):
+            assert client.post("/predict", json=EXAMPLE_INPUT).status_code == 200
+        deadline = time.monotonic() + 30
+        stats = client.get("/shadow/stats").json()
+        while stats["scored"] < 3 and time.monotonic() < deadline:
+            time.sleep(0.05)
+            stats = client.get("/shadow/stats").json()
+
+        # the candidate is the production artifact, so the two always agree
+        assert stats["scored"] == 3 and stats["agreement"] == 1.0
+        assert stats["max_abs_delta"] < 1e-6
+        assert 'loan_shadow_requests_total{outcome="agreed"}' in client.get("/metrics").text
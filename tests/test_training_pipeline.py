@@ -3,6 +3,40 @@ from src.train import train
 
 
 def test_train_creates_model(tmp_path, monkeypatch):
-    # run training (conftest monkeypatches train.load_data to use sample csv)
+    # run training (conftest monkeypatches train.load_data to use sample csv);
+    # artifacts land under tmp_path instead of the checked-in models/
+    monkeypatch.chdir(tmp_path)
     train(save_artifacts=True)
-    assert os.path.exists("models/loan_model.pkl")
\ No newline at end of file
+    assert os.path.exists("models/loan_model.pkl")
+
+def test_thread_budget_splits_cores_between_parallel_candidates():
+    from src.train import thread_budget
+
+    names = ["log_reg", "random_forest", "xgboost"]
+    assert thread_budget(names, 8) == {"random_forest": 3, "xgboost": 3}
+    assert thread_budget(names, 1) == {"random_forest": 1, "xgboost": 1}
+
+
+def test_fit_candidates_in_pool_matches_pipeline_fit(tmp_path, make_loans):
+    import numpy as np
+    import pandas as pd
+    from sklearn.base import clone
+    from sklearn.pipeline import Pipeline
+    from src.data_preprocessing import create_preprocessor
+    from src.feature_cache import build_features
+    from src.train import build_candidates, fit_candidates
+
+    features = build_features(make_loans(), str(tmp_path / "entry"))
+    results = fit_candidates(features, workers=2)
+
+    assert [r[0] for r in results] == ["log_reg", "random_forest", "xgboost"]
+    train_frame = pd.read_parquet(tmp_path / "entry" / "train.parquet")
+    for name, pipeline, auc, preds, seconds in results:
+        assert 0 <= auc <= 1
+        assert np.array_equal(preds, pipeline.predict(features.test_frame))
+        # same result as fitting the whole pipeline on the engineered frame
+        reference = Pipeline([("preprocessor", create_preprocessor()),
+                              ("clf", clone(build_candidates()[name]))])
+        reference.fit(train_frame, features.y_train)
+        assert np.allclose(reference.predict_proba(features.test_frame),
+                           pipeline.predict_proba(features.test_frame))
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from xgboost import XGBClassifier
+from src.data_preprocessing import create_preprocessor, engineer_features
+from src.model_store import ModelStore, save_pipeline
+from src.predict import load_pipeline, score_frame
+from src.schemas.input_schema import EXAMPLE_INPUT as SAMPLE
+from src.tree_engine import EnginePipeline, compile_engine, export_engine, load_engine, save_engine, verify_engine
+from src.utils.exception import CustomException
+
+
+@pytest.mark.parametrize("clf", [
+    XGBClassifier(n_estimators=30, max_depth=4, learning_rate=0.1, eval_metric="logloss"),
+    RandomForestClassifier(n_estimators=15, random_state=0),
+])
+def test_engine_matches_predict_proba(clf, training_frame):
+    df, y = training_frame
+    pipeline = Pipeline([("preprocessor", create_preprocessor()), ("clf", clf)]).fit(df, y)
+    engine = compile_engine(pipeline)
+
+    assert verify_engine(engine, pipeline, df, tolerance=1e-6) <= 1e-6
+    assert np.array_equal(engine.predict(df), pipeline.predict(df))
+    single = engineer_features(pd.DataFrame([SAMPLE]))
+    expected = score_frame(pipeline, single)[0]
+    got = engine.predict_one(SAMPLE)
+    assert got["prediction"] == expected["prediction"]
+    assert got["probability"] == pytest.approx(expected["probability"], abs=1e-6)
+
+
+def test_engine_follows_xgboost_missing_value_directions(training_frame):
+    df, y = training_frame
+    pipeline = Pipeline([
+        ("preprocessor", create_preprocessor()),
+        ("clf", XGBClassifier(n_estimators=20, max_depth=3, eval_metric="logloss")),
+    ]).fit(df, y)
+    engine = compile_engine(pipeline)
+    X = pipeline[:-1].transform(df)
+    X[::3, -5:] = np.nan
+
+    expected = pipeline[-1].predict_proba(X)[:, 1]
+    assert np.max(np.abs(engine.clf.predict_proba(X)[:, 1] - expected)) <= 1e-6
+
+
+def test_saved_engine_is_memory_mapped_and_served_by_model_store(tmp_path):
+    pipeline = load_pipeline()
+    out_dir = tmp_path / "loan_model_engine"
+    save_engine(compile_engine(pipeline), str(out_dir))
+
+    loaded = load_engine(str(out_dir))
+    assert isinstance(loaded.clf.feature, np.memmap)
+
+    store = ModelStore(path=str(out_dir), reload_interval=0)
+    model = store.current()
+    assert isinstance(model.pipeline, EnginePipeline)
+    assert model.compiled is model.pipeline
+    assert store.version is not None
+
+    single = engineer_features(pd.DataFrame([SAMPLE]))
+    expected = score_frame(pipeline, single)[0]
+    assert model.compiled.predict_one(SAMPLE)["prediction"] == expected["prediction"]
+    # the DataFrame path (streaming, batch) scores through the engine as well
+    got = score_frame(model.pipeline, single)[0]
+    assert got["prediction"] == expected["prediction"]
+    assert got["probability"] == pytest.approx(expected["probability"], abs=1e-6)
+
+
+def test_failed_export_removes_the_stale_engine(tmp_path, training_frame):
+    df, y = training_frame
+    engine_dir = tmp_path / "loan_model_engine"
+    save_engine(compile_engine(load_pipeline()), str(engine_dir))
+    # the retrained model has no trees, so its export fails
+    log_reg = Pipeline([("preprocessor", create_preprocessor()), ("clf", LogisticRegression(max_iter=500))]).fit(df, y)
+    pickle_path = tmp_path / "loan_model.pkl"
+    save_pipeline(log_reg, str(pickle_path))
+
+    with pytest.raises(CustomException):
+        export_engine(log_reg, str(engine_dir), df)
+    assert not engine_dir.exists()
+
+    store = ModelStore(path=str(engine_dir), reload_interval=0, fallback=str(pickle_path))
+    model = store.current()
+    assert not isinstance(model.pipeline, EnginePipeline)
+    assert model.pipeline.named_steps["clf"].__class__ is LogisticRegression
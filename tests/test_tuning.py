@@ -0,0 +1,63 @@
+import json
+
+from src.feature_cache import build_features
+from src.train import build_candidates
+from src.tuning import rungs, search
+
+SMALL_SEARCH = {
+    "n_configs": 4,
+    "min_resource": 5,
+    "max_resource": 20,
+    "eta": 2,
+    "early_stopping_rounds": 3,
+    "space": {
+        "max_depth": {"type": "int", "low": 2, "high": 4},
+        "learning_rate": {"type": "float", "low": 0.05, "high": 0.3, "log": True},
+        "tree_method": ["hist"],
+    },
+}
+
+
+def test_rungs_grow_by_eta_up_to_max_resource():
+    assert rungs(50, 1350, 3) == [50, 150, 450, 1350]
+    assert rungs(5, 20, 2) == [5, 10, 20]
+
+
+def test_search_halves_configs_and_resumes_from_store(tmp_path, make_loans):
+    features = build_features(make_loans(), str(tmp_path / "entry"))
+    config = {**SMALL_SEARCH, "store_dir": str(tmp_path / "search")}
+
+    first = search(features, config, workers=1)
+    # 4 configs at 5 rounds, 2 at 10, 1 at 20
+    assert (first.trials, first.fitted) == (7, 7)
+    assert 1 <= first.n_estimators <= 20
+    assert 2 <= first.params["max_depth"] <= 4
+    records = [json.loads(line) for line in open(tmp_path / "search" / "entry.jsonl")]
+    assert sorted(r["rounds"] for r in records) == [5, 5, 5, 5, 10, 10, 20]
+
+    # an interrupted search loses its last trial; a rerun only fits that one
+    with open(tmp_path / "search" / "entry.jsonl", "w") as f:
+        f.writelines(json.dumps(r) + "\n" for r in records[:-1])
+        f.write('{"key": "torn')
+    resumed = search(features, config, workers=1)
+    assert (resumed.trials, resumed.fitted) == (7, 1)
+    assert resumed.params == first.params and resumed.score == first.score
+
+
+def test_search_stops_at_budget_with_best_trial_so_far(tmp_path, make_loans):
+    features = build_features(make_loans(), str(tmp_path / "entry"))
+    config = {**SMALL_SEARCH, "store_dir": str(tmp_path / "search")}
+    first = search(features, config, workers=1)
+
+    # one more rung, but no time left to fit it: stored trials decide
+    result = search(features, {**config, "max_resource": 40, "budget_seconds": 0}, workers=1)
+    assert (result.trials, result.fitted) == (7, 0)
+    assert result.params == first.params
+
+
+def test_candidates_come_from_model_config():
+    candidates = build_candidates()
+    assert candidates["xgboost"].max_depth == 5
+    assert candidates["random_forest"].n_estimators == 200
+    tuned = build_candidates(params={"xgboost": {"max_depth": 7}})
+    assert tuned["xgboost"].max_depth == 7